@@ -0,0 +1,111 @@
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+from common.game import Game, GameState
+from common.network_protocol import (
+    MessageType,
+    Codec,
+    JsonCodec,
+    OrjsonCodec,
+    orjson,
+)
+from common.binary_codec import BinaryCodec
+from common.player import Player
+
+
+class LegacyJsonCodec(Codec):
+    # What the server did before codecs: default separators and a str payload
+    name = "json (legacy)"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return json.dumps(message)
+
+    def decode(self, data) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+def record_game_states(players: int, turns: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    game = Game(seed=seed)
+    for index in range(players):
+        game.add_player(Player(f"player-{index}", f"Player {index}"))
+    game.start_game()
+
+    messages = []
+    for seq in range(turns):
+        if game.state != GameState.PLAYING:
+            break
+        player = game.current_player
+        state = game.get_game_state()
+        state["your_hand"] = [card.to_dict() for card in player.hand]
+        messages.append(
+            {
+                "type": MessageType.GAME_STATE.name,
+                "room_id": game.game_id,
+                "seq": seq,
+                "state": state,
+            }
+        )
+
+        valid_plays = player.get_valid_plays(
+            game._discard_pile[-1], game._current_color
+        )
+        if valid_plays:
+            card = rng.choice(valid_plays)
+            game.play_card(player.player_id, card, game.current_color)
+        else:
+            game.draw_card(player.player_id)
+    return messages
+
+
+def bench(codec: Codec, messages: List[Dict[str, Any]], rounds: int) -> None:
+    encoded = [codec.encode(message) for message in messages]
+    decoded = [codec.decode(payload) for payload in encoded]
+    if decoded != json.loads(json.dumps(messages)):
+        raise AssertionError(f"{codec.name} does not round-trip the recorded messages")
+    total_bytes = sum(len(payload) for payload in encoded)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            codec.encode(message)
+    encode_rate = rounds * len(messages) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in encoded:
+            codec.decode(payload)
+    decode_rate = rounds * len(messages) / (time.perf_counter() - start)
+
+    print(
+        f"{codec.name:<14} {total_bytes / len(messages):>9.1f} B/msg "
+        f"{encode_rate:>12,.0f} enc/s {decode_rate:>12,.0f} dec/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wire codec benchmark")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=447)
+    args = parser.parse_args()
+
+    messages = record_game_states(args.players, args.turns, args.seed)
+    print(f"{len(messages)} recorded GAME_STATE messages")
+
+    codecs: List[Codec] = [LegacyJsonCodec(), JsonCodec()]
+    if orjson:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson not installed; skipping the orjson backend")
+    codecs.append(BinaryCodec())
+
+    for codec in codecs:
+        bench(codec, messages, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Tuple
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import Frame, Opcode
+from common.binary_codec import BinaryCodec
+from common.compression import CompressionConfig, SelectiveDeflate
+from common.game import Game, GameState
+from common.network_protocol import DEFAULT_CODEC, Codec, MessageType
+from common.player import Player
+from common.state_delta import diff_hand, diff_public_state
+
+CHAT_LINES = ["gg", "uno!", "nice one", "who has the blue?", "brb", "lol", "wp"]
+
+
+def record_session(
+    players: int, turns: int, rooms: int, seed: int
+) -> List[Dict[str, Any]]:
+    # What one seated client receives over a run of games: a snapshot per
+    # game, then a delta per turn, with some chat and the occasional room
+    # list refresh mixed in
+    rng = random.Random(seed)
+    room_list = [
+        {
+            "room_id": f"room-{index:05d}",
+            "player_count": rng.randint(1, 4),
+            "max_players": Game.MAX_PLAYERS,
+            "state": rng.choice(["WAITING", "PLAYING"]),
+        }
+        for index in range(rooms)
+    ]
+
+    messages: List[Dict[str, Any]] = []
+    seq = 0
+    while seq < turns:
+        game = Game(seed=rng.getrandbits(64))
+        for index in range(players):
+            game.add_player(Player(f"player-{index}", f"Player {index}"))
+        game.start_game()
+        viewer = game.players[0]
+
+        def snapshot() -> Dict[str, Any]:
+            state = game.get_game_state()
+            state["your_hand"] = [card.to_dict() for card in viewer.hand]
+            return state
+
+        previous = snapshot()
+        messages.append(
+            {
+                "type": MessageType.GAME_STARTED.name,
+                "room_id": game.game_id,
+                "seq": seq,
+                "state": previous,
+            }
+        )
+        while game.state == GameState.PLAYING and seq < turns:
+            seq += 1
+            player = game.current_player
+            valid_plays = game.get_valid_plays()
+            if valid_plays:
+                game.play_card(
+                    player.player_id, rng.choice(valid_plays), game.current_color
+                )
+            else:
+                game.draw_card(player.player_id)
+
+            current = snapshot()
+            hand_added, hand_removed = diff_hand(
+                previous.pop("your_hand"), current["your_hand"]
+            )
+            public = {k: v for k, v in current.items() if k != "your_hand"}
+            messages.append(
+                {
+                    "type": MessageType.GAME_STATE_DELTA.name,
+                    "room_id": game.game_id,
+                    "seq": seq,
+                    "base_seq": seq - 1,
+                    **diff_public_state(previous, public),
+                    "hand_added": hand_added,
+                    "hand_removed": hand_removed,
+                }
+            )
+            previous = current
+
+            if rng.random() < 0.3:
+                messages.append(
+                    {
+                        "type": MessageType.CHAT_MESSAGE.name,
+                        "room_id": game.game_id,
+                        "player_id": player.player_id,
+                        "player_name": player.name,
+                        "content": rng.choice(CHAT_LINES),
+                        "timestamp": 1_700_000_000 + seq * 1.5,
+                    }
+                )
+            if seq % 25 == 0:
+                messages.append(
+                    {
+                        "type": MessageType.ROOM_LIST.name,
+                        "rooms": room_list,
+                        "next_cursor": None,
+                    }
+                )
+    return messages
+
+
+def load_messages(path: str) -> List[Dict[str, Any]]:
+    # One recorded message per line, as JSON
+    with open(path) as recording:
+        return [json.loads(line) for line in recording if line.strip()]
+
+
+def bench(
+    label: str,
+    config: CompressionConfig,
+    frames: List[Tuple[str, Frame]],
+    rounds: int,
+) -> None:
+    raw_bytes = sum(len(frame.data) for _, frame in frames)
+    if not config.enabled:
+        print(f"{label:<28} {raw_bytes / len(frames):>9.1f} B/msg")
+        return
+
+    wire_bytes = 0
+    cpu = 0.0
+    for _ in range(rounds):
+        # Fresh endpoints per round: a connection starts with an empty window
+        encoder = SelectiveDeflate(
+            False,
+            False,
+            config.window_bits,
+            config.window_bits,
+            {"memLevel": config.mem_level},
+            min_size=config.min_size,
+        )
+        decoder = PerMessageDeflate(False, False, config.window_bits, 15)
+        encoded = []
+        start = time.process_time()
+        for message_type, frame in frames:
+            encoder.compress_next = config.should_compress(
+                message_type, len(frame.data)
+            )
+            encoded.append(encoder.encode(frame))
+        cpu += time.process_time() - start
+        wire_bytes = encoder.wire_bytes
+
+        for (_, frame), sent in zip(frames, encoded):
+            if bytes(decoder.decode(sent).data) != frame.data:
+                raise AssertionError(f"{label} does not round-trip")
+
+    saved = raw_bytes - wire_bytes
+    cpu_us = cpu / rounds / len(frames) * 1e6
+    print(
+        f"{label:<28} {wire_bytes / len(frames):>9.1f} B/msg "
+        f"{saved / raw_bytes:>7.1%} {cpu_us:>8.2f} us/msg "
+        f"{cpu / rounds * 1e6 / max(saved / 1024, 1e-9):>8.1f} us/KiB saved"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="permessage-deflate bytes saved vs CPU spent, per setting"
+    )
+    parser.add_argument("--messages", help="JSON-lines file of recorded messages")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=447)
+    args = parser.parse_args()
+
+    if args.messages:
+        messages = load_messages(args.messages)
+    else:
+        messages = record_session(args.players, args.turns, args.rooms, args.seed)
+    print(f"{len(messages)} recorded messages")
+
+    everything = {"type_policy": {}, "min_size": 0}
+    configs = [
+        ("off", CompressionConfig(enabled=False)),
+        ("all messages", CompressionConfig(**everything)),
+        (
+            "all, window 9 mem 1",
+            CompressionConfig(window_bits=9, mem_level=1, **everything),
+        ),
+        (
+            "all, window 15 mem 8",
+            CompressionConfig(window_bits=15, mem_level=8, **everything),
+        ),
+        ("min size 128", CompressionConfig(min_size=128, type_policy={})),
+        ("min size 1024", CompressionConfig(min_size=1024, type_policy={})),
+        ("default", CompressionConfig()),
+    ]
+    codecs: List[Codec] = [DEFAULT_CODEC, BinaryCodec()]
+    for codec in codecs:
+        opcode = Opcode.BINARY if codec.name == "binary" else Opcode.TEXT
+        frames = [
+            (message["type"], Frame(opcode, bytes(codec.encode(message))))
+            for message in messages
+        ]
+        print(f"\n{codec.name} wire format")
+        for label, config in configs:
+            bench(label, config, frames, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
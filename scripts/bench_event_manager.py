@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import time
+from server.event_manager import EventManager
+
+
+def on_sync(client_id: str, message: dict) -> None:
+    pass
+
+
+async def on_async(client_id: str, message: dict) -> None:
+    pass
+
+
+async def measure(event_manager: EventManager, event: str, iterations: int) -> float:
+    message = {"type": "PLAY_CARD", "room_id": "room", "player_id": "player"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await event_manager.emit(event, "client", message)
+    return iterations / (time.perf_counter() - start)
+
+
+async def run_benchmark(iterations: int):
+    event_manager = EventManager()
+    event_manager.on("sync", on_sync)
+    event_manager.on("async", on_async)
+    event_manager.on("mixed", on_sync)
+    event_manager.on("mixed", on_async)
+    event_manager.on("blocking", on_sync, blocking=True)
+
+    for event, count in [
+        ("sync", iterations),
+        ("async", iterations),
+        ("mixed", iterations),
+        ("blocking", iterations // 10),
+        ("unhandled", iterations),
+    ]:
+        rate = await measure(event_manager, event, count)
+        print(f"{event:<10} {rate:>14,.0f} emits/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventManager.emit throughput")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+from common.game import Game, GameState
+from common.player import Player
+from common.simulator import PLAYABLE_COLORS, WILD_TYPES
+from server.room_store import RoomStore
+
+
+def new_game(rng: random.Random, players: int) -> Game:
+    game = Game(seed=rng.getrandbits(64))
+    for index in range(players):
+        game.add_player(Player(f"player-{index}", f"Player {index}"))
+    game.start_game()
+    return game
+
+
+def step(game: Game, rng: random.Random) -> None:
+    player = game.current_player
+    valid_plays = game.get_valid_plays()
+    if valid_plays:
+        card = rng.choice(valid_plays)
+        chosen_color = rng.choice(PLAYABLE_COLORS) if card.type in WILD_TYPES else None
+        game.play_card(player.player_id, card, chosen_color)
+    else:
+        game.draw_card(player.player_id)
+
+
+async def drive(
+    store: Optional[RoomStore], rooms: int, players: int, turns: int, seed: int
+) -> Tuple[Dict[str, Game], float]:
+    # One action per room per round, as if every room were busy at once;
+    # finished games close their room and a new one opens. Returns the live
+    # games and the event loop thread's CPU time per action.
+    rng = random.Random(seed)
+    games = {}
+    for _ in range(rooms):
+        game = new_game(rng, players)
+        games[game.game_id] = game
+        if store:
+            store.record(game.game_id, game, {})
+
+    record_time = 0.0
+    loop_cpu = 0.0
+    started_at = time.perf_counter()
+    for _ in range(turns):
+        round_started_at = time.thread_time()
+        for room_id, game in list(games.items()):
+            if game.state != GameState.PLAYING:
+                del games[room_id]
+                if store:
+                    store.drop(room_id)
+                game = new_game(rng, players)
+                room_id = game.game_id
+                games[room_id] = game
+            else:
+                step(game, rng)
+
+            if store:
+                recorded_at = time.perf_counter()
+                store.record(room_id, game, {})
+                record_time += time.perf_counter() - recorded_at
+        loop_cpu += time.thread_time() - round_started_at
+        # The writer picks up whatever this round queued as one batch
+        await asyncio.sleep(0)
+    if store:
+        await store.flush()
+    elapsed = time.perf_counter() - started_at
+
+    actions = rooms * turns
+    line = (
+        f"{actions / elapsed:>9,.0f} actions/s, "
+        f"loop {loop_cpu / actions * 1e6:5.2f} us/action"
+    )
+    if store:
+        metrics = store.get_metrics()
+        line += (
+            f" ({record_time / actions * 1e6:.2f} in record), "
+            f"{metrics['avg_batch_records']:.0f} records/batch, "
+            f"{metrics['avg_write_ms']:.1f} ms/batch, "
+            f"{metrics['bytes_written'] / actions:.0f} B/action"
+        )
+    print(line)
+    return games, loop_cpu / actions
+
+
+async def main_async(args) -> None:
+    print(f"{args.rooms} rooms, {args.turns} rounds of one action per room")
+    print(f"{'no store':<24}", end=" ")
+    _, baseline = await drive(None, args.rooms, args.players, args.turns, args.seed)
+
+    configs = [
+        ("fsync, snapshot 200", 200, True),
+        ("fsync, snapshot 50", 50, True),
+        ("fsync, snapshot 1000", 1000, True),
+        ("no fsync, snapshot 200", 200, False),
+    ]
+    for label, interval, fsync in configs:
+        with tempfile.TemporaryDirectory(dir=args.data_dir) as directory:
+            store = RoomStore(directory, snapshot_interval=interval, fsync=fsync)
+            print(f"{label:<24}", end=" ")
+            games, loop_cpu = await drive(
+                store, args.rooms, args.players, args.turns, args.seed
+            )
+            await store.close()
+
+            started_at = time.perf_counter()
+            recovered = RoomStore(directory).load()
+            elapsed = time.perf_counter() - started_at
+            mismatches = [
+                room.room_id
+                for room in recovered
+                if room.game.to_dict() != games[room.room_id].to_dict()
+            ]
+            if len(recovered) != len(games) or mismatches:
+                raise AssertionError(f"{label}: recovery differs for {mismatches}")
+            print(
+                f"{'':<24} +{(loop_cpu - baseline) * 1e6:.2f} us/action on the "
+                f"loop; recovered {len(recovered)} rooms in "
+                f"{elapsed * 1000:.1f} ms, all identical"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Room persistence overhead per action, and recovery time"
+    )
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=447)
+    parser.add_argument(
+        "--data-dir", help="Where to put the store (a temporary directory by default)"
+    )
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
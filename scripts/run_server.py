@@ -1,26 +1,206 @@
+import argparse
 import asyncio
 import logging
 import os
+from typing import Optional
 from server.game_server import GameServer
+from server.rate_limiter import RateLimitConfig
+from server.room_store import RoomStore
+from server.sharding import ShardRouter, start_shards
+from server.shutdown import STOP_SIGNALS, wait_for_signal
+from common.binary_codec import DEFAULT_WIRE_FORMAT, WIRE_FORMATS
+from common.compression import CompressionConfig
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-async def run_server():
+async def run_server(
+    bot_workers: int,
+    bot_budget: float,
+    compression: CompressionConfig,
+    rate_limit: RateLimitConfig,
+    store: Optional[RoomStore],
+    resume_grace: float,
+    wire_format: str,
+):
     port = int(os.environ.get("PORT", 5000))
-    server = GameServer(host="0.0.0.0", port=port)
+    server = GameServer(
+        host="0.0.0.0",
+        port=port,
+        bot_workers=bot_workers,
+        bot_budget=bot_budget,
+        compression=compression,
+        rate_limit=rate_limit,
+        store=store,
+        resume_grace=resume_grace,
+        wire_format=wire_format,
+    )
     await server.start()
     try:
-        while True:
-            await asyncio.sleep(0.1)
-    except KeyboardInterrupt:
+        await wait_for_signal(*STOP_SIGNALS)
+    finally:
         await server.stop()
 
 
+async def run_sharded_server(
+    shards: int,
+    shard_base_port: int,
+    compression: CompressionConfig,
+    rate_limit: RateLimitConfig,
+    data_dir: Optional[str],
+    snapshot_interval: int,
+    wire_format: str,
+):
+    port = int(os.environ.get("PORT", 5000))
+    processes = start_shards(
+        shards,
+        "127.0.0.1",
+        shard_base_port,
+        data_dir,
+        snapshot_interval,
+        rate_limit,
+        wire_format,
+    )
+    router = ShardRouter(
+        host="0.0.0.0",
+        port=port,
+        shard_urls=[
+            f"ws://127.0.0.1:{shard_base_port + shard_index}"
+            for shard_index in range(shards)
+        ],
+        compression=compression,
+    )
+    try:
+        await router.start()
+        await wait_for_signal(*STOP_SIGNALS)
+    finally:
+        # Shards stop, and save their rooms, on SIGTERM. They go first: once
+        # the router drops its connections to them, their players have left.
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            await asyncio.to_thread(process.join, 10)
+        await router.stop()
+
+
 def main():
-    asyncio.run(run_server())
+    parser = argparse.ArgumentParser(description="BI-TEK UNO server")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=int(os.environ.get("SHARDS", 0)),
+        help="Number of worker processes owning rooms (0 runs a single process)",
+    )
+    parser.add_argument(
+        "--shard-base-port",
+        type=int,
+        default=int(os.environ.get("SHARD_BASE_PORT", 6000)),
+        help="Port of the first shard; shard N listens on base port + N",
+    )
+    parser.add_argument(
+        "--bot-workers",
+        type=int,
+        default=int(os.environ.get("BOT_WORKERS", 1)),
+        help="Processes evaluating bot moves, started on the first bot move "
+        "(0 thinks on a single thread)",
+    )
+    parser.add_argument(
+        "--bot-budget-ms",
+        type=float,
+        default=float(os.environ.get("BOT_BUDGET_MS", 50)),
+        help="CPU time a rollout bot may spend choosing one move",
+    )
+    parser.add_argument(
+        "--wire-format",
+        choices=list(WIRE_FORMATS),
+        default=os.environ.get("WIRE_FORMAT", DEFAULT_WIRE_FORMAT),
+        help="Format used with clients that accept it: binary frames are smaller, "
+        f"JSON is cheaper to encode with orjson (default: {DEFAULT_WIRE_FORMAT})",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="Do not offer permessage-deflate to clients",
+    )
+    parser.add_argument(
+        "--compression-min-size",
+        type=int,
+        default=256,
+        help="Messages smaller than this many bytes are sent uncompressed",
+    )
+    parser.add_argument("--compression-window-bits", type=int, default=12)
+    parser.add_argument("--compression-mem-level", type=int, default=5)
+    parser.add_argument(
+        "--data-dir",
+        default=os.environ.get("DATA_DIR"),
+        help="Persist rooms here and recover them on startup (off when unset)",
+    )
+    parser.add_argument(
+        "--snapshot-interval",
+        type=int,
+        default=200,
+        help="Log records per room between snapshots",
+    )
+    parser.add_argument(
+        "--resume-grace",
+        type=float,
+        default=float(os.environ.get("RESUME_GRACE", 30)),
+        help="Seconds a dropped player's seat is held for them to resume (0 disables)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=float(os.environ.get("RATE_LIMIT", 20)),
+        help="Message cost a connection may spend per second (0 disables limits)",
+    )
+    parser.add_argument(
+        "--rate-burst",
+        type=float,
+        default=60,
+        help="Message cost a connection may spend at once after being idle",
+    )
+    args = parser.parse_args()
+
+    compression = CompressionConfig(
+        enabled=not args.no_compression,
+        window_bits=args.compression_window_bits,
+        mem_level=args.compression_mem_level,
+        min_size=args.compression_min_size,
+    )
+    rate_limit = RateLimitConfig(
+        enabled=args.rate_limit > 0, rate=args.rate_limit, burst=args.rate_burst
+    )
+    if args.shards > 0:
+        asyncio.run(
+            run_sharded_server(
+                args.shards,
+                args.shard_base_port,
+                compression,
+                rate_limit,
+                args.data_dir,
+                args.snapshot_interval,
+                args.wire_format,
+            )
+        )
+    else:
+        store = (
+            RoomStore(args.data_dir, snapshot_interval=args.snapshot_interval)
+            if args.data_dir
+            else None
+        )
+        asyncio.run(
+            run_server(
+                args.bot_workers,
+                args.bot_budget_ms / 1000,
+                compression,
+                rate_limit,
+                store,
+                args.resume_grace,
+                args.wire_format,
+            )
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import time
+from common.simulator import POLICIES, SimulationReport, run_simulation
+
+
+def run_vector(args, policy_names) -> SimulationReport:
+    from common.vector_engine import POLICY_NAME, VectorEngine, cross_check
+
+    if set(policy_names) != {POLICY_NAME}:
+        sys.exit(f"The vector engine only implements the '{POLICY_NAME}' policy")
+
+    start = time.perf_counter()
+    engine = VectorEngine(range(args.seed, args.seed + args.games), len(policy_names))
+    result = engine.run(args.max_turns)
+    report = result.to_report(time.perf_counter() - start)
+
+    if args.cross_check:
+        mismatches = cross_check(result, args.cross_check, args.max_turns)
+        if mismatches:
+            sys.exit(f"Vector engine disagrees with Game for seeds: {mismatches}")
+        print(f"cross-check: {args.cross_check} sampled games match Game exactly")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless UNO game simulation")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument(
+        "--policies",
+        default="random,random",
+        help=f"Comma-separated policy per seat, from: {', '.join(POLICIES)}",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-turns",
+        type=int,
+        default=1000,
+        help="Turn cap after which a game is counted as unfinished",
+    )
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument(
+        "--engine",
+        choices=["scalar", "vector"],
+        default="scalar",
+        help="vector steps all games in lockstep with NumPy (first policy only)",
+    )
+    parser.add_argument(
+        "--cross-check",
+        type=int,
+        default=0,
+        help="Replay this many sampled vector games through Game and compare",
+    )
+    args = parser.parse_args()
+
+    policy_names = [name.strip() for name in args.policies.split(",")]
+    if args.engine == "vector":
+        report = run_vector(args, policy_names)
+        mode = "vector engine"
+    else:
+        report = run_simulation(
+            args.games,
+            policy_names,
+            workers=args.workers,
+            seed=args.seed,
+            max_turns=args.max_turns,
+            chunk_size=args.chunk_size,
+        )
+        mode = f"{args.workers} workers"
+
+    print(
+        f"{report.games} games in {report.elapsed:.2f}s "
+        f"({report.games_per_second:,.0f} games/s, {mode})"
+    )
+    print(f"average turns: {report.average_turns:.1f}")
+    print(f"hit turn cap:  {report.capped_games}")
+    for seat, rate in report.win_rates().items():
+        print(f"seat {seat} ({policy_names[seat]:<7}) win rate: {rate:6.1%}")
+    percentiles = report.score_percentiles([10, 25, 50, 75, 90, 99])
+    if percentiles:
+        print(
+            "winner points: "
+            + ", ".join(f"p{pct}={score}" for pct, score in percentiles.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ setup(
         "websockets",
         "asyncio",
     ],
+    extras_require={
+        "fast": ["orjson"],
+        "sim": ["numpy"],
+    },
     scripts=[
         "scripts/run_client.py",
         "scripts/run_server.py",
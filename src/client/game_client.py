@@ -13,9 +13,20 @@ from common.network_protocol import (
     PlayCardMessage,
     DrawCardMessage,
     ChatMessage,
+    ChatHistoryRequest,
     ListRoomsMessage,
+    SyncStateMessage,
+    SubscribeLobbyMessage,
+    RoomInfo,
 )
 from common.card import Card
+from common.state_delta import apply_state_delta
+from common.binary_codec import WIRE_FORMATS
+from common.chat_history import CHAT_PAGE_SIZE, unpack_chat_page
+
+# Seconds between attempts to resume a dropped session; the server holds the
+# seat for 30 seconds by default
+RESUME_DELAYS = (0.5, 1.0, 2.0, 4.0, 8.0)
 
 
 class GameClient:
@@ -26,6 +37,9 @@ class GameClient:
         self.ws_client = WebSocketClient(server_url, self.event_manager)
         self.current_room_id: Optional[str] = None
         self.current_game_state: Optional[GameState] = None
+        self.state_seq: Optional[int] = None
+        self.room_list: Dict[str, RoomInfo] = {}
+        self.resume_token: Optional[str] = None
         self.logger = ClientLogger(player_name)
         self._setup_event_handlers()
 
@@ -48,6 +62,10 @@ class GameClient:
         self.event_manager.on(
             f"message_{MessageType.GAME_STATE.name}", self._handle_game_state
         )
+        self.event_manager.on(
+            f"message_{MessageType.GAME_STATE_DELTA.name}",
+            self._handle_game_state_delta,
+        )
         self.event_manager.on(
             f"message_{MessageType.GAME_STARTED.name}", self._handle_game_started
         )
@@ -57,6 +75,9 @@ class GameClient:
         self.event_manager.on(
             f"message_{MessageType.CHAT_MESSAGE.name}", self._handle_chat_message
         )
+        self.event_manager.on(
+            f"message_{MessageType.CHAT_HISTORY.name}", self._handle_chat_history
+        )
         self.event_manager.on(f"message_{MessageType.ERROR.name}", self._handle_error)
         self.event_manager.on(
             f"message_{MessageType.PLAYER_DISCONNECTED.name}",
@@ -69,6 +90,12 @@ class GameClient:
         self.event_manager.on(
             f"message_{MessageType.ROOM_LIST.name}", self._handle_room_list
         )
+        self.event_manager.on(
+            f"message_{MessageType.ROOM_LIST_DELTA.name}", self._handle_room_list_delta
+        )
+        self.event_manager.on(
+            f"message_{MessageType.ROOM_PAGE.name}", self._handle_room_page
+        )
         self.event_manager.on("connection_closed", self._handle_connection_closed)
 
     async def connect(self) -> bool:
@@ -117,6 +144,15 @@ class GameClient:
             {"type": MessageType.START_GAME.name, "room_id": self.current_room_id}
         )
 
+    async def add_bot(self, policy: Optional[str] = None) -> None:
+        if not self.current_room_id:
+            return
+
+        message = {"type": MessageType.ADD_BOT.name, "room_id": self.current_room_id}
+        if policy:
+            message["policy"] = policy
+        await self.ws_client.send_message(message)
+
     async def play_card(self, card: Card, chosen_color: Optional[str] = None) -> None:
         if not self.current_room_id:
             return
@@ -156,8 +192,57 @@ class GameClient:
         }
         await self.ws_client.send_message(message)
 
-    async def request_room_list(self) -> None:
+    async def request_chat_history(
+        self, cursor: Optional[str] = None, limit: int = CHAT_PAGE_SIZE
+    ) -> None:
+        # Earlier messages than the last page received, when given its cursor
+        if not self.current_room_id:
+            return
+
+        message: ChatHistoryRequest = {
+            "type": MessageType.CHAT_HISTORY.name,
+            "room_id": self.current_room_id,
+            "limit": limit,
+        }
+        if cursor:
+            message["cursor"] = cursor
+        await self.ws_client.send_message(message)
+
+    async def request_state_sync(self) -> None:
+        if not self.current_room_id:
+            return
+
+        message: SyncStateMessage = {
+            "type": MessageType.SYNC_STATE.name,
+            "room_id": self.current_room_id,
+            "player_id": self.player_id,
+        }
+        await self.ws_client.send_message(message)
+
+    async def request_room_list(
+        self,
+        state: Optional[str] = None,
+        has_free_seat: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> None:
         message: ListRoomsMessage = {"type": MessageType.LIST_ROOMS.name}
+        if state is not None:
+            message["state"] = state
+        if has_free_seat is not None:
+            message["has_free_seat"] = has_free_seat
+        if cursor is not None:
+            message["cursor"] = cursor
+        if limit is not None:
+            message["limit"] = limit
+        await self.ws_client.send_message(message)
+
+    async def subscribe_lobby(self) -> None:
+        message: SubscribeLobbyMessage = {"type": MessageType.SUBSCRIBE_LOBBY.name}
+        await self.ws_client.send_message(message)
+
+    async def unsubscribe_lobby(self) -> None:
+        message: SubscribeLobbyMessage = {"type": MessageType.UNSUBSCRIBE_LOBBY.name}
         await self.ws_client.send_message(message)
 
     async def _authenticate(self) -> None:
@@ -165,52 +250,118 @@ class GameClient:
             "type": MessageType.AUTHENTICATE.name,
             "player_id": self.player_id,
             "name": self.player_name,
+            "codecs": list(WIRE_FORMATS),
         }
+        if self.resume_token:
+            message["resume_token"] = self.resume_token
+            message["received"] = self.ws_client.messages_received
         await self.ws_client.send_message(message)
 
     async def _handle_authenticated(self, data: Dict[str, Any]) -> None:
+        wire_format = data.get("codec")
+        if wire_format in WIRE_FORMATS:
+            self.ws_client.codec = WIRE_FORMATS[wire_format]
+        self.resume_token = data.get("resume_token")
+        if data.get("resumed"):
+            # Whatever was missed follows this reply; if the server no longer
+            # had all of it, start over from a full state
+            if data.get("replayed") is None:
+                await self.request_state_sync()
+            return
+
+        self.ws_client.messages_received = 0
+        if self.current_room_id:
+            # The seat was not held long enough to resume
+            await self._handle_room_closed({"room_id": self.current_room_id})
         await self.event_manager.emit("client_authenticated", data)
 
     async def _handle_room_created(self, data: Dict[str, Any]) -> None:
         self.current_room_id = data["room_id"]
         self.current_game_state = data["state"]
+        self.state_seq = None
         await self.event_manager.emit("room_created", data)
 
     async def _handle_room_joined(self, data: Dict[str, Any]) -> None:
         self.current_room_id = data["room_id"]
         self.current_game_state = data["state"]
+        self.state_seq = None
         await self.event_manager.emit("room_joined", data)
 
     async def _handle_room_left(self, data: Dict[str, Any]) -> None:
         if data["room_id"] == self.current_room_id:
             self.current_room_id = None
             self.current_game_state = None
+            self.state_seq = None
             await self.event_manager.emit("room_left", data)
 
     async def _handle_room_closed(self, data: Dict[str, Any]) -> None:
         if data["room_id"] == self.current_room_id:
             self.current_room_id = None
             self.current_game_state = None
+            self.state_seq = None
             await self.event_manager.emit("room_closed", data)
 
     async def _handle_game_state(self, data: Dict[str, Any]) -> None:
         self.logger.log_message(Direction.RECEIVE, "GAME_STATE", self.current_room_id)
         self.current_game_state = data["state"]
+        self.state_seq = data.get("seq")
         await self.event_manager.emit("game_state_updated", data)
 
+    async def _handle_game_state_delta(self, data: Dict[str, Any]) -> None:
+        self.logger.log_message(
+            Direction.RECEIVE, "GAME_STATE_DELTA", self.current_room_id
+        )
+        if data["room_id"] != self.current_room_id:
+            return
+
+        if self.current_game_state is None or self.state_seq != data["base_seq"]:
+            await self.request_state_sync()
+            return
+
+        try:
+            state = apply_state_delta(self.current_game_state, data)
+        except (KeyError, IndexError, TypeError, ValueError):
+            await self.request_state_sync()
+            return
+
+        self.current_game_state = state
+        self.state_seq = data["seq"]
+        await self.event_manager.emit(
+            "game_state_updated",
+            {
+                "type": MessageType.GAME_STATE.name,
+                "room_id": data["room_id"],
+                "seq": data["seq"],
+                "state": state,
+            },
+        )
+
     async def _handle_game_started(self, data: Dict[str, Any]) -> None:
         self.logger.log_game_event("Game Started")
         self.current_game_state = data["state"]
+        self.state_seq = data.get("seq")
         await self.event_manager.emit("game_started", data)
 
     async def _handle_game_ended(self, data: Dict[str, Any]) -> None:
         self.logger.log_game_event("Game Ended")
         self.current_game_state = data["state"]
+        self.state_seq = data.get("seq")
         await self.event_manager.emit("game_ended", data)
 
     async def _handle_chat_message(self, data: Dict[str, Any]) -> None:
         await self.event_manager.emit("chat_message_received", data)
 
+    async def _handle_chat_history(self, data: Dict[str, Any]) -> None:
+        if data["room_id"] == self.current_room_id:
+            await self.event_manager.emit(
+                "chat_history_received",
+                {
+                    "room_id": data["room_id"],
+                    "messages": unpack_chat_page(data),
+                    "next_cursor": data.get("next_cursor"),
+                },
+            )
+
     async def _handle_error(self, data: Dict[str, Any]) -> None:
         self.logger.log_error(data["message"])
         await self.event_manager.emit("error", data)
@@ -219,20 +370,66 @@ class GameClient:
         if data["room_id"] == self.current_room_id:
             await self.event_manager.emit(
                 "player_disconnected",
-                {"room_id": data["room_id"], "player_id": data["player_id"]},
+                {
+                    "room_id": data["room_id"],
+                    "player_id": data["player_id"],
+                    "state": self.current_game_state,
+                },
             )
 
     async def _handle_player_reconnected(self, data: Dict[str, Any]) -> None:
         if data["room_id"] == self.current_room_id:
             await self.event_manager.emit(
                 "player_reconnected",
-                {"room_id": data["room_id"], "player_id": data["player_id"]},
+                {
+                    "room_id": data["room_id"],
+                    "player_id": data["player_id"],
+                    "state": self.current_game_state,
+                },
             )
 
     async def _handle_room_list(self, data: Dict[str, Any]):
+        # Only the lobby snapshot holds every room; deltas are applied to it
+        self.room_list = {room["room_id"]: room for room in data["rooms"]}
         await self.event_manager.emit("room_list_updated", data)
 
+    async def _handle_room_page(self, data: Dict[str, Any]):
+        # A page of a query, which leaves the lobby's room list alone
+        await self.event_manager.emit("room_page_received", data)
+
+    async def _handle_room_list_delta(self, data: Dict[str, Any]):
+        for room in data["added"] + data["changed"]:
+            self.room_list[room["room_id"]] = room
+        for room_id in data["removed"]:
+            self.room_list.pop(room_id, None)
+        await self.event_manager.emit(
+            "room_list_updated",
+            {
+                "type": MessageType.ROOM_LIST.name,
+                "rooms": list(self.room_list.values()),
+            },
+        )
+
     async def _handle_connection_closed(self, _: Dict[str, Any]) -> None:
+        if self.resume_token and self.current_room_id:
+            # Outside the closed connection's message loop, which is still
+            # running this handler
+            asyncio.create_task(self._resume())
+            return
+        await self._connection_lost()
+
+    async def _resume(self) -> None:
+        for delay in RESUME_DELAYS:
+            await asyncio.sleep(delay)
+            if await self.ws_client.connect():
+                self.logger.log_connection(self.ws_client.uri)
+                await self._authenticate()
+                return
+        await self._connection_lost()
+
+    async def _connection_lost(self) -> None:
+        self.resume_token = None
         self.current_room_id = None
         self.current_game_state = None
+        self.state_seq = None
         await self.event_manager.emit("connection_closed", {})
@@ -4,7 +4,7 @@ import asyncio
 from client.ui.chat_box import ChatBox
 from client.ui.game_board import GameBoard
 from client.ui.player_hand import PlayerHand
-from common.card import Card
+from common.card import Card, playable_mask
 from common.card_enums import CardColor, CardType
 
 
@@ -18,6 +18,7 @@ class GameRoomSection:
 
         self.on_leave_room: Optional[Callable[[], Coroutine]] = None
         self.on_start_game: Optional[Callable[[], Coroutine]] = None
+        self.on_add_bot: Optional[Callable[[], Coroutine]] = None
         self.on_chat_message: Optional[Callable[[str], Coroutine]] = None
         self.on_card_played: Optional[
             Callable[[Card, Optional[CardColor]], Coroutine]
@@ -96,6 +97,15 @@ class GameRoomSection:
                 fg=self.styles["button_fg"],
             ).pack(side="right", padx=5)
 
+            tk.Button(
+                controls,
+                text="Add Bot",
+                command=lambda: self.on_add_bot
+                and asyncio.create_task(self.on_add_bot()),
+                bg=self.styles["button_bg"],
+                fg=self.styles["button_fg"],
+            ).pack(side="right", padx=5)
+
     def _create_color_selector(self):
         selector = tk.Toplevel(self.frame)
         selector.title("Select Color")
@@ -166,18 +176,10 @@ class GameRoomSection:
     def _get_playable_cards(
         self, top_card: Card, hand: List[Card], current_color: CardColor
     ) -> List[Card]:
-        return [
-            card
-            for card in hand
-            if card.can_be_played_on(
-                top_card,
-                (
-                    current_color
-                    if card.type in [CardType.WILD, CardType.WILD_DRAW_FOUR]
-                    else None
-                ),
-            )
-        ]
+        # current_color only ever applied to wild cards here, and those are
+        # playable under any color, so the top card alone decides.
+        mask = playable_mask(top_card)
+        return [card for card in hand if mask >> card.code & 1]
 
     def destroy(self):
         if hasattr(self, "frame"):
@@ -20,6 +20,7 @@ class GameUI:
         self.on_leave_room: Optional[Callable[[], Coroutine]] = None
         self.on_refresh_rooms: Optional[Callable[[], Coroutine]] = None
         self.on_start_game: Optional[Callable[[], None]] = None
+        self.on_add_bot: Optional[Callable[[], Coroutine]] = None
         self.on_chat_message: Optional[Callable[[str], Coroutine]] = None
         self.on_card_played: Optional[
             Callable[[Card, Optional[CardColor]], Coroutine]
@@ -125,6 +126,7 @@ class GameUI:
         self.game_room = GameRoomSection(self.root, self.styles, is_host)
         self.game_room.on_leave_room = self.on_leave_room
         self.game_room.on_start_game = self.on_start_game
+        self.game_room.on_add_bot = self.on_add_bot
         self.game_room.on_chat_message = self.on_chat_message
         self.game_room.chat_box.on_message_sent = self.on_chat_message
         self.game_room.on_card_played = self.on_card_played
@@ -172,6 +174,9 @@ class GameUI:
     def set_on_start_game(self, callback: Callable[[], Coroutine]):
         self.on_start_game = callback
 
+    def set_on_add_bot(self, callback: Callable[[], Coroutine]):
+        self.on_add_bot = callback
+
     def set_on_refresh_rooms(self, callback: Callable[[], Coroutine]):
         self.on_refresh_rooms = callback
 
@@ -18,6 +18,7 @@ class UICoordinator:
         self.game_ui.set_on_join_room(self._handle_join_room)
         self.game_ui.set_on_leave_room(self._handle_leave_room)
         self.game_ui.set_on_start_game(self._handle_start_game)
+        self.game_ui.set_on_add_bot(self._handle_add_bot)
         self.game_ui.set_on_refresh_rooms(self._handle_refresh_rooms)
         self.game_ui.set_on_chat_message(self._handle_chat_message)
         self.game_ui.set_on_card_played(self._handle_card_played)
@@ -43,6 +44,9 @@ class UICoordinator:
         self.game_client.event_manager.on(
             "chat_message_received", self._handle_chat_received
         )
+        self.game_client.event_manager.on(
+            "chat_history_received", self._handle_chat_history
+        )
         self.game_client.event_manager.on("game_state_updated", self._handle_game_state)
         self.game_client.event_manager.on("game_ended", self._handle_game_ended)
         self.game_client.event_manager.on(
@@ -90,6 +94,9 @@ class UICoordinator:
     async def _handle_start_game(self) -> None:
         await self.game_client.start_game()
 
+    async def _handle_add_bot(self) -> None:
+        await self.game_client.add_bot()
+
     async def _handle_create_room(self) -> None:
         await self.game_client.create_room()
 
@@ -100,26 +107,29 @@ class UICoordinator:
         await self.game_client.leave_room()
 
     async def _handle_refresh_rooms(self) -> None:
-        await self.game_client.request_room_list()
+        # Subscribing again sends a fresh snapshot of the whole lobby
+        await self.game_client.subscribe_lobby()
 
     async def _handle_authenticated(self, data: dict) -> None:
         self.game_ui.show_room_selection()
-        await self._handle_refresh_rooms()
+        await self.game_client.subscribe_lobby()
 
     async def _handle_room_created(self, data: dict) -> None:
         self.game_ui.show_game_room(is_host=True)
+        await self.game_client.unsubscribe_lobby()
 
     async def _handle_room_joined(self, data: dict) -> None:
         self.game_ui.show_game_room(is_host=False)
+        await self.game_client.unsubscribe_lobby()
 
     async def _handle_room_left(self, data: dict) -> None:
         self.game_ui.show_room_selection()
-        await self._handle_refresh_rooms()
+        await self.game_client.subscribe_lobby()
 
     async def _handle_room_closed(self, data: dict) -> None:
         self.game_ui.show_error("Room has been closed!")
         self.game_ui.show_room_selection()
-        await self._handle_refresh_rooms()
+        await self.game_client.subscribe_lobby()
 
     async def _handle_game_state(self, data: dict) -> None:
         if self.game_ui.game_room:
@@ -148,6 +158,13 @@ class UICoordinator:
             data["player_name"], data["content"], data["timestamp"]
         )
 
+    async def _handle_chat_history(self, data: dict) -> None:
+        # The backfill sent on joining, before any newer message
+        for message in data["messages"]:
+            self.game_ui.add_chat_message(
+                message["player_name"], message["content"], message["timestamp"]
+            )
+
     async def _handle_error(self, data: dict) -> None:
         self.game_ui.show_error(data["message"])
 
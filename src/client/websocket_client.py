@@ -1,21 +1,35 @@
 from typing import Optional, Dict, Any
-import json
 import asyncio
 import websockets
 from websockets.asyncio.client import ClientConnection
 from server.event_manager import EventManager
 from client.logger import ClientLogger
+from common.network_protocol import Codec, DEFAULT_CODEC, MessageType
+from common.compression import CompressionConfig
 
 
 class WebSocketClient:
-    def __init__(self, uri: str, event_manager: EventManager):
+    def __init__(
+        self,
+        uri: str,
+        event_manager: EventManager,
+        codec: Codec = DEFAULT_CODEC,
+        compression: Optional[CompressionConfig] = None,
+    ):
         self.uri = uri
         self.event_manager = event_manager
+        # Client messages are small; the size threshold alone decides
+        self.compression = compression or CompressionConfig()
+        self.default_codec = codec
+        self.codec = codec
         self.websocket: Optional[ClientConnection] = None
         self.connected = False
+        # Messages of the current session, reported to the server on resume
+        self.messages_received = 0
         self.logger = ClientLogger("WebSocketClient")
 
     async def connect(self) -> bool:
+        self.codec = self.default_codec
         try:
             self.websocket = await websockets.connect(
                 self.uri,
@@ -24,6 +38,7 @@ class WebSocketClient:
                 close_timeout=10,
                 max_size=10 * 1024 * 1024,
                 compression=None,
+                extensions=self.compression.client_extensions(),
                 max_queue=32,
             )
             self.connected = True
@@ -45,27 +60,32 @@ class WebSocketClient:
             raise ConnectionError("WebSocket is not connected")
 
         try:
-            await self.websocket.send(json.dumps(message))
+            await self.websocket.send(self.codec.encode(message))
         except Exception:
             self.connected = False
             await self.disconnect()
             raise
 
     async def _message_loop(self) -> None:
-        if not self.websocket:
+        websocket = self.websocket
+        if not websocket:
             return
 
         try:
-            async for message in self.websocket:
+            async for message in websocket:
+                try:
+                    data = self.codec.decode(message)
+                except ValueError:
+                    self.logger.log_error(f"Invalid message received: {message}")
+                    continue
+
                 try:
-                    data = json.loads(message)
                     message_type = data.get("type")
+                    if message_type != MessageType.AUTHENTICATED.name:
+                        self.messages_received += 1
 
                     if message_type:
                         await self.event_manager.emit(f"message_{message_type}", data)
-                except json.JSONDecodeError:
-                    self.logger.log_error(f"Invalid JSON received: {message}")
-                    continue
                 except Exception as e:
                     self.logger.log_error(f"Error processing message: {e}")
                     await self.event_manager.emit("error", {"message": str(e)})
@@ -78,5 +98,7 @@ class WebSocketClient:
             self.connected = False
             await self.event_manager.emit("error", {"message": str(e)})
         finally:
-            self.connected = False
-            await self.disconnect()
+            # A handler may already have reconnected on a new socket
+            if self.websocket is websocket:
+                self.connected = False
+                await self.disconnect()
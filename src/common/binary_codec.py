@@ -0,0 +1,267 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+import struct
+from common.card import Card, CARDS
+from common.card_enums import CardType, CardColor
+from common.network_protocol import MessageType, Codec, JsonCodec, DEFAULT_CODEC
+
+# Frame layout: one byte message type (MessageType value, 0 for untyped
+# objects), followed by the object's entries and an END marker. JSON frames
+# always start with "{", which never collides with a message type byte, so a
+# binary decoder can transparently accept JSON frames as well.
+
+NONE, FALSE, TRUE, INT, FLOAT, STR, LIST, MAP, CARD, HAND, SYMBOL = range(11)
+LITERAL_KEY = 0xFE
+END = 0xFF
+
+# Field names and common string values are sent as one-byte indexes. Both
+# tables are append-only: reordering them breaks compatibility.
+KEYS = [
+    "type", "room_id", "player_id", "name", "state", "seq", "base_seq",
+    "changes", "players", "player_updates", "hand_added", "hand_removed",
+    "your_hand", "game_id", "current_player_index", "current_player_id",
+    "direction_clockwise", "current_color", "top_card", "deck_count", "id",
+    "card_count", "is_connected", "rooms", "player_count", "max_players",
+    "next_cursor", "added", "changed", "removed", "message", "content",
+    "player_name", "timestamp", "winner_id", "card", "chosen_color", "codec",
+    "codecs", "cursor", "limit", "sort", "descending", "has_free_seat", "hand",
+    "score", "is_bot", "policy", "speakers", "messages", "request_id", "keys",
+]  # fmt: skip
+SYMBOLS = (
+    ["WAITING", "PLAYING", "FINISHED"]
+    + [color.name for color in CardColor]
+    + [card_type.name for card_type in CardType]
+)
+
+_KEY_CODES = {key: index for index, key in enumerate(KEYS)}
+_SYMBOL_CODES = {symbol: index for index, symbol in enumerate(SYMBOLS)}
+_DOUBLE = struct.Struct("<d")
+
+def _card_code(value: Dict[str, Any]) -> Optional[int]:
+    if len(value) != 3 or "color" not in value:
+        return None
+    try:
+        return Card.from_dict(value).code
+    except ValueError:
+        return None
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    data = value.encode()
+    _write_varint(out, len(data))
+    out += data
+
+
+def _encode_value(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(NONE)
+    elif value is True:
+        out.append(TRUE)
+    elif value is False:
+        out.append(FALSE)
+    elif isinstance(value, int):
+        out.append(INT)
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        symbol = _SYMBOL_CODES.get(value)
+        if symbol is not None:
+            out.append(SYMBOL)
+            out.append(symbol)
+        else:
+            out.append(STR)
+            _write_str(out, value)
+    elif isinstance(value, dict):
+        code = _card_code(value)
+        if code is not None:
+            out.append(CARD)
+            out.append(code)
+        else:
+            out.append(MAP)
+            _encode_entries(value, out)
+    elif isinstance(value, (list, tuple)):
+        codes = [_card_code(item) if isinstance(item, dict) else None for item in value]
+        if codes and None not in codes:
+            out.append(HAND)
+            _write_varint(out, len(codes))
+            out += bytes(codes)
+        else:
+            out.append(LIST)
+            _write_varint(out, len(value))
+            for item in value:
+                _encode_value(item, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _encode_entries(entries: Dict[str, Any], out: bytearray) -> None:
+    for key, value in entries.items():
+        index = _KEY_CODES.get(key)
+        if index is not None:
+            out.append(index)
+        else:
+            out.append(LITERAL_KEY)
+            _write_str(out, key)
+        _encode_value(value, out)
+    out.append(END)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise ValueError("Truncated string")
+    return data[pos:end].decode(), end
+
+
+def _card_dict(code: int) -> Dict[str, Any]:
+    return CARDS[code].to_dict()
+
+
+def _decode_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == NONE:
+        return None, pos
+    if tag == TRUE:
+        return True, pos
+    if tag == FALSE:
+        return False, pos
+    if tag == INT:
+        zigzag, pos = _read_varint(data, pos)
+        return (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1), pos
+    if tag == FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+    if tag == STR:
+        return _read_str(data, pos)
+    if tag == SYMBOL:
+        return SYMBOLS[data[pos]], pos + 1
+    if tag == CARD:
+        return _card_dict(data[pos]), pos + 1
+    if tag == HAND:
+        count, pos = _read_varint(data, pos)
+        if pos + count > len(data):
+            raise ValueError("Truncated hand")
+        return [_card_dict(code) for code in data[pos : pos + count]], pos + count
+    if tag == LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == MAP:
+        return _decode_entries(data, pos, {})
+    raise ValueError(f"Unknown tag {tag}")
+
+
+def _decode_entries(
+    data: bytes, pos: int, result: Dict[str, Any]
+) -> Tuple[Dict[str, Any], int]:
+    while True:
+        key_code = data[pos]
+        pos += 1
+        if key_code == END:
+            return result, pos
+        if key_code == LITERAL_KEY:
+            key, pos = _read_str(data, pos)
+        else:
+            key = KEYS[key_code]
+        result[key], pos = _decode_value(data, pos)
+
+
+class BinaryCodec(Codec):
+    name = "binary"
+
+    def __init__(self, fallback: JsonCodec = DEFAULT_CODEC):
+        self.fallback = fallback
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        out = bytearray()
+        message_type = message.get("type")
+        if message_type is None:
+            out.append(0)
+            _encode_entries(message, out)
+        else:
+            out.append(MessageType[message_type].value)
+            _encode_entries(
+                {key: value for key, value in message.items() if key != "type"}, out
+            )
+        return bytes(out)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        if isinstance(data, str) or data[:1] == b"{":
+            return self.fallback.decode(data)
+
+        try:
+            result: Dict[str, Any] = {}
+            if data[0]:
+                result["type"] = MessageType(data[0]).name
+            result, pos = _decode_entries(data, 1, result)
+        except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid binary frame: {e}")
+        if pos != len(data):
+            raise ValueError("Trailing bytes in binary frame")
+        return result
+
+    def merge(self, encoded: bytes, fragment: bytes) -> bytes:
+        return encoded[:-1] + fragment[1:]
+
+    def wrap(self, key: str, encoded_value: bytes) -> bytes:
+        out = bytearray([0])
+        index = _KEY_CODES.get(key)
+        if index is not None:
+            out.append(index)
+        else:
+            out.append(LITERAL_KEY)
+            _write_str(out, key)
+        out.append(MAP)
+        out += encoded_value[1:]
+        out.append(END)
+        return bytes(out)
+
+
+# Wire formats a client may offer at AUTHENTICATE. "json" is served by
+# whichever JSON backend is installed.
+WIRE_FORMATS: Dict[str, Codec] = {
+    "binary": BinaryCodec(),
+    "json": DEFAULT_CODEC,
+}
+
+# Binary frames are about a quarter the size of JSON, but with orjson installed
+# they take the server roughly ten times the CPU to encode (scripts/
+# bench_codec.py), on every broadcast. The server then prefers JSON and leaves
+# the bytes to permessage-deflate. The standard json module is about as slow
+# as the binary codec, so without orjson the smaller frames win.
+DEFAULT_WIRE_FORMAT = "json" if DEFAULT_CODEC.name == "orjson" else "binary"
+
+
+def negotiate_wire_format(
+    offered: List[str], preferred: str = DEFAULT_WIRE_FORMAT
+) -> str:
+    if preferred in offered:
+        return preferred
+    for name in WIRE_FORMATS:
+        if name in offered:
+            return name
+    return "json"
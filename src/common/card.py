@@ -1,13 +1,48 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 from common.card_enums import CardType, CardColor
 
+# Canonical face codes: each colored suit takes 13 codes (numbers 0-9, then
+# SKIP, REVERSE, DRAW_TWO) in the order below, followed by the two wilds.
+# Codes 54-63 are WILD-colored numbers, which the validation rules accept but
+# no deck contains. Codes are part of the wire format, so the numbering must
+# not change.
+SUIT_COLORS = [CardColor.RED, CardColor.BLUE, CardColor.GREEN, CardColor.YELLOW]
+SUIT_ACTIONS = [CardType.SKIP, CardType.REVERSE, CardType.DRAW_TWO]
+SUIT_SIZE = 13
+WILD_CODE = 52
+WILD_DRAW_FOUR_CODE = 53
+DECK_FACE_COUNT = 54
+CARD_CODE_COUNT = 64
 
-@dataclass(frozen=True, eq=True)
+FaceKey = Tuple[CardType, CardColor, int]
+
+
+def _build_faces() -> List[FaceKey]:
+    faces = []
+    for color in SUIT_COLORS:
+        faces.extend((CardType.NUMBER, color, value) for value in range(10))
+        faces.extend((card_type, color, -1) for card_type in SUIT_ACTIONS)
+    faces.append((CardType.WILD, CardColor.WILD, -1))
+    faces.append((CardType.WILD_DRAW_FOUR, CardColor.WILD, -1))
+    faces.extend((CardType.NUMBER, CardColor.WILD, value) for value in range(10))
+    return faces
+
+
+_FACES = _build_faces()
+_FACE_CODES: Dict[FaceKey, int] = {face: code for code, face in enumerate(_FACES)}
+_NAME_CODES: Dict[Tuple[str, str, int], int] = {
+    (card_type.name, color.name, value): code
+    for (card_type, color, value), code in _FACE_CODES.items()
+}
+
+
+@dataclass(frozen=True, eq=True, slots=True)
 class Card:
     type: CardType
     color: CardColor
     value: int
+    code: int = field(default=-1, compare=False, repr=False)
 
     def __post_init__(self):
         if self.type in [CardType.WILD, CardType.WILD_DRAW_FOUR]:
@@ -23,25 +58,17 @@ class Card:
                 raise ValueError(f"Action cards must have value -1, got {self.value}")
             if self.color == CardColor.WILD:
                 raise ValueError("Only wild cards can have WILD color")
+        code = _FACE_CODES.get((self.type, self.color, self.value))
+        if code is None:
+            raise ValueError(
+                f"Unknown card face: {self.type} {self.color} {self.value}"
+            )
+        object.__setattr__(self, "code", code)
 
     def can_be_played_on(
         self, other: "Card", current_color: Optional[CardColor] = None
     ) -> bool:
-        if self.type in [CardType.WILD, CardType.WILD_DRAW_FOUR]:
-            return True
-
-        if current_color:
-            return self.color == current_color
-
-        return (
-            self.color == other.color
-            or (
-                self.type == other.type
-                and self.type == CardType.NUMBER
-                and self.value == other.value
-            )
-            or (self.type == other.type and self.type != CardType.NUMBER)
-        )
+        return bool(playable_mask(other, current_color) >> self.code & 1)
 
     def get_score_value(self) -> int:
         if self.type == CardType.NUMBER:
@@ -53,13 +80,64 @@ class Card:
     def to_dict(self) -> Dict[str, Any]:
         return {"type": self.type.name, "color": self.color.name, "value": self.value}
 
+    def to_code(self) -> int:
+        return self.code
+
+    @classmethod
+    def from_code(cls, code: int) -> "Card":
+        if not 0 <= code < CARD_CODE_COUNT:
+            raise ValueError(f"Invalid card code: {code}")
+        return CARDS[code]
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Card":
+        # Every valid face is already in the table, so a lookup both validates
+        # the data and returns the shared instance.
         try:
-            return cls(
-                type=CardType[data["type"]],
-                color=CardColor[data["color"]],
-                value=data["value"],
-            )
-        except (KeyError, ValueError) as e:
+            return CARDS[_NAME_CODES[(data["type"], data["color"], data["value"])]]
+        except (KeyError, TypeError) as e:
             raise ValueError(f"Invalid card data: {e}")
+
+
+# One shared, immutable instance per face, indexed by code
+CARDS: Tuple[Card, ...] = tuple(Card(*face) for face in _FACES)
+
+
+def _plays_on(card: Card, other: Card, current_color: Optional[CardColor]) -> bool:
+    # The matching rules; only used to build the playability tables below
+    if card.type in [CardType.WILD, CardType.WILD_DRAW_FOUR]:
+        return True
+
+    if current_color:
+        return card.color == current_color
+
+    return (
+        card.color == other.color
+        or (
+            card.type == other.type
+            and card.type == CardType.NUMBER
+            and card.value == other.value
+        )
+        or (card.type == other.type and card.type != CardType.NUMBER)
+    )
+
+
+def _mask(cards: List[Card]) -> int:
+    return sum(1 << card.code for card in cards)
+
+
+# Bit N of a mask is set when the card with code N may be played. Once a
+# current color is in force the top card no longer matters.
+PLAYABLE_ON: Tuple[int, ...] = tuple(
+    _mask([card for card in CARDS if _plays_on(card, top, None)]) for top in CARDS
+)
+PLAYABLE_IN_COLOR: Dict[CardColor, int] = {
+    color: _mask([card for card in CARDS if _plays_on(card, CARDS[0], color)])
+    for color in CardColor
+}
+
+
+def playable_mask(top_card: Card, current_color: Optional[CardColor] = None) -> int:
+    if current_color:
+        return PLAYABLE_IN_COLOR[current_color]
+    return PLAYABLE_ON[top_card.code]
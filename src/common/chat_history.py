@@ -0,0 +1,105 @@
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import time
+
+CHAT_PAGE_SIZE = 50
+CHAT_BACKFILL_SIZE = 20  # Messages sent to a player joining the room
+MAX_CHAT_LENGTH = 1000  # Characters per message
+
+
+@dataclass
+class ChatMessage:
+    player_id: str
+    player_name: str
+    content: str
+    timestamp: float = field(default_factory=lambda: time.time())
+    seq: int = 0  # Position in the room's chat, set when added to the history
+
+
+class ChatHistory:
+    # A room's most recent chat, capped by message count and by text size so a
+    # long-lived room holds constant memory. Messages are numbered in order;
+    # a page cursor is the number of the oldest message on the previous page.
+    def __init__(self, max_messages: int = 200, max_bytes: int = 32 * 1024):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.evicted = 0
+        self._messages: Deque[ChatMessage] = deque()
+        self._bytes = 0
+        self._next_seq = 1
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def append(self, message: ChatMessage) -> ChatMessage:
+        message.seq = self._next_seq
+        self._next_seq += 1
+        self._messages.append(message)
+        self._bytes += _text_size(message)
+        # The newest message always stays, however long it is
+        while len(self._messages) > 1 and (
+            len(self._messages) > self.max_messages or self._bytes > self.max_bytes
+        ):
+            self._bytes -= _text_size(self._messages.popleft())
+            self.evicted += 1
+        return message
+
+    def page(
+        self, cursor: Optional[str] = None, limit: int = CHAT_PAGE_SIZE
+    ) -> Tuple[List[ChatMessage], Optional[str]]:
+        # The latest messages before the cursor, oldest first
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        end = len(self._messages)
+        if cursor:
+            try:
+                before = int(cursor)
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            # Numbers are consecutive, so the position follows from the number
+            end = min(max(before - self._next_seq + end, 0), end)
+
+        start = max(end - limit, 0)
+        page = list(islice(self._messages, start, end))
+        next_cursor = str(page[0].seq) if page and start > 0 else None
+        return page, next_cursor
+
+
+def pack_chat_page(messages: List[ChatMessage]) -> Dict[str, Any]:
+    # Each speaker is listed once and messages refer to them by index, which
+    # spares repeating IDs, names and keys in every message
+    speakers: Dict[Tuple[str, str], int] = {}
+    rows = []
+    for message in messages:
+        speaker = (message.player_id, message.player_name)
+        index = speakers.setdefault(speaker, len(speakers))
+        rows.append([index, message.content, message.timestamp])
+    return {"speakers": [list(speaker) for speaker in speakers], "messages": rows}
+
+
+def unpack_chat_page(page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    speakers = page["speakers"]
+    return [
+        {
+            "player_id": speakers[index][0],
+            "player_name": speakers[index][1],
+            "content": content,
+            "timestamp": timestamp,
+        }
+        for index, content, timestamp in page["messages"]
+    ]
+
+
+def _text_size(message: ChatMessage) -> int:
+    return len(
+        (message.content + message.player_name + message.player_id).encode()
+    )
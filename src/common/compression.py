@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from websockets.extensions.base import ClientExtensionFactory, ServerExtensionFactory
+from websockets.extensions.permessage_deflate import (
+    ClientPerMessageDeflateFactory,
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import CONT, CTRL_OPCODES, Frame
+from common.network_protocol import MessageType
+
+# Types not listed here are compressed when they reach min_size. Room lists
+# and full snapshots repeat the same keys and card dicts over and over; chat
+# is short free text that rarely shrinks enough to pay for the CPU.
+DEFAULT_TYPE_POLICY: Dict[str, bool] = {
+    MessageType.GAME_STATE.name: True,
+    MessageType.GAME_STARTED.name: True,
+    MessageType.GAME_END.name: True,
+    MessageType.ROOM_LIST.name: True,
+    MessageType.ROOM_PAGE.name: True,
+    MessageType.CHAT_MESSAGE.name: False,
+}
+
+
+class SelectiveDeflate(PerMessageDeflate):
+    # RFC 7692 lets a sender leave any message uncompressed (RSV1 clear), and
+    # the peer passes those through untouched, so compression can be decided
+    # per message. The writer sets compress_next right before each send;
+    # otherwise messages under min_size go out as they are.
+    def __init__(self, *args: Any, min_size: int = 0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.compress_next: Optional[bool] = None
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self._compressing = False
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+
+        if frame.opcode is not CONT:
+            self._compressing = (
+                self.compress_next
+                if self.compress_next is not None
+                else len(frame.data) >= self.min_size
+            )
+            self.compress_next = None
+
+        encoded = super().encode(frame) if self._compressing else frame
+        self.raw_bytes += len(frame.data)
+        self.wire_bytes += len(encoded.data)
+        return encoded
+
+
+def _selective(extension: PerMessageDeflate, min_size: int) -> SelectiveDeflate:
+    return SelectiveDeflate(
+        extension.remote_no_context_takeover,
+        extension.local_no_context_takeover,
+        extension.remote_max_window_bits,
+        extension.local_max_window_bits,
+        extension.compress_settings,
+        min_size=min_size,
+    )
+
+
+class _ServerDeflateFactory(ServerPerMessageDeflateFactory):
+    def __init__(self, min_size: int, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.min_size = min_size
+
+    def process_request_params(
+        self, params: Sequence[Tuple[str, Optional[str]]], accepted_extensions: Any
+    ) -> Tuple[List[Tuple[str, Optional[str]]], SelectiveDeflate]:
+        response_params, extension = super().process_request_params(
+            params, accepted_extensions
+        )
+        return response_params, _selective(extension, self.min_size)
+
+
+class _ClientDeflateFactory(ClientPerMessageDeflateFactory):
+    def __init__(self, min_size: int, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.min_size = min_size
+
+    def process_response_params(
+        self, params: Sequence[Tuple[str, Optional[str]]], accepted_extensions: Any
+    ) -> SelectiveDeflate:
+        extension = super().process_response_params(params, accepted_extensions)
+        return _selective(extension, self.min_size)
+
+
+@dataclass
+class CompressionConfig:
+    enabled: bool = True
+    window_bits: int = 12  # 9-15; each direction keeps a 2**window_bits window
+    mem_level: int = 5  # 1-9; the compressor allocates about 2**(mem_level + 9) B
+    min_size: int = 256  # Smaller messages are sent uncompressed
+    # Per message type: True always compresses, False never does
+    type_policy: Dict[str, bool] = field(
+        default_factory=lambda: dict(DEFAULT_TYPE_POLICY)
+    )
+
+    def should_compress(self, message_type: str, size: int) -> bool:
+        policy = self.type_policy.get(message_type)
+        return policy if policy is not None else size >= self.min_size
+
+    def server_extensions(self) -> Optional[List[ServerExtensionFactory]]:
+        if not self.enabled:
+            return None
+        return [
+            _ServerDeflateFactory(
+                self.min_size,
+                server_max_window_bits=self.window_bits,
+                client_max_window_bits=self.window_bits,
+                compress_settings={"memLevel": self.mem_level},
+            )
+        ]
+
+    def client_extensions(self) -> Optional[List[ClientExtensionFactory]]:
+        if not self.enabled:
+            return None
+        return [
+            _ClientDeflateFactory(
+                self.min_size,
+                client_max_window_bits=self.window_bits,
+                compress_settings={"memLevel": self.mem_level},
+            )
+        ]
+
+
+def find_deflate(websocket: Any) -> Optional[SelectiveDeflate]:
+    # The extension negotiated for this connection, if compression is on
+    protocol = getattr(websocket, "protocol", None)
+    for extension in getattr(protocol, "extensions", []):
+        if isinstance(extension, SelectiveDeflate):
+            return extension
+    return None
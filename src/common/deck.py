@@ -1,58 +1,65 @@
 import random
 from typing import List, Dict, Any, Optional, Iterator
-from common.card import Card
-from common.card_enums import CardType, CardColor
+from common.card import (
+    Card,
+    CARDS,
+    SUIT_COLORS,
+    SUIT_SIZE,
+    WILD_CODE,
+    WILD_DRAW_FOUR_CODE,
+)
 
 
-class Deck:
-    def __init__(self):
-        self._cards: List[Card] = []
-        self._initialize_deck()
+def _standard_codes() -> bytes:
+    codes = bytearray()
+    for suit in range(len(SUIT_COLORS)):
+        base = suit * SUIT_SIZE
+        # One zero card per color
+        codes.append(base)
+
+        # Two of each number 1-9 and of each action card per color
+        for offset in range(1, SUIT_SIZE):
+            codes.extend([base + offset] * 2)
+
+    # Four wild cards of each type
+    codes.extend([WILD_CODE, WILD_DRAW_FOUR_CODE] * 4)
+    return bytes(codes)
 
-    def _initialize_deck(self) -> None:
-        for color in [CardColor.RED, CardColor.BLUE, CardColor.GREEN, CardColor.YELLOW]:
-            # One zero card per color
-            self._cards.append(Card(CardType.NUMBER, color, 0))
 
-            # Two of each number 1-9 per color
-            for value in range(1, 10):
-                self._cards.extend([Card(CardType.NUMBER, color, value)] * 2)
+STANDARD_DECK_CODES = _standard_codes()
 
-            # Two of each action card per color
-            for card_type in [CardType.SKIP, CardType.REVERSE, CardType.DRAW_TWO]:
-                self._cards.extend([Card(card_type, color, -1)] * 2)
 
-        # Four wild cards of each type
-        for _ in range(4):
-            self._cards.append(Card(CardType.WILD, CardColor.WILD, -1))
-            self._cards.append(Card(CardType.WILD_DRAW_FOUR, CardColor.WILD, -1))
+class Deck:
+    # Cards are stored as their codes; the top of the deck is the end
+    def __init__(
+        self, codes: Optional[bytes] = None, rng: Optional[random.Random] = None
+    ):
+        self._codes = bytearray(STANDARD_DECK_CODES if codes is None else codes)
+        self._rng = rng if rng is not None else random.Random()
 
     def shuffle(self) -> None:
-        random.shuffle(self._cards)
+        self._rng.shuffle(self._codes)
 
     def draw(self) -> Optional[Card]:
-        return self._cards.pop() if self._cards else None
+        return CARDS[self._codes.pop()] if self._codes else None
 
     def draw_multiple(self, count: int) -> List[Card]:
-        cards = []
-        for _ in range(count):
-            card = self.draw()
-            if card:
-                cards.append(card)
-            else:
-                break
-        return cards
+        if count <= 0:
+            return []
+        taken = self._codes[-count:]
+        del self._codes[-count:]
+        return [CARDS[code] for code in reversed(taken)]
 
     def add_card(self, card: Card) -> None:
         if not isinstance(card, Card):
             raise ValueError("Invalid card object")
-        self._cards.append(card)
+        self._codes.append(card.code)
 
     def add_cards(self, cards: List[Card]) -> None:
-        for card in cards:
-            if not isinstance(card, Card):
-                raise ValueError("Invalid card object")
-        self._cards.extend(cards)
+        try:
+            self._codes.extend([card.code for card in cards])
+        except AttributeError:
+            raise ValueError("Invalid card object")
 
     def merge_pile(self, cards: List[Card], shuffle: bool = True) -> None:
         self.add_cards(cards)
@@ -61,19 +68,20 @@ class Deck:
 
     @property
     def remaining(self) -> int:
-        return len(self._cards)
+        return len(self._codes)
 
     def __iter__(self) -> Iterator[Card]:
-        return iter(self._cards)
+        return (CARDS[code] for code in self._codes)
 
     def to_dict(self) -> Dict[str, Any]:
-        return {"cards": [card.to_dict() for card in self._cards]}
+        return {"cards": [CARDS[code].to_dict() for code in self._codes]}
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "Deck":
+    def from_dict(
+        cls, data: Dict[str, Any], rng: Optional[random.Random] = None
+    ) -> "Deck":
         try:
-            deck = cls()
-            deck._cards = [Card.from_dict(card_data) for card_data in data["cards"]]
-            return deck
-        except (KeyError, ValueError) as e:
+            codes = bytes(Card.from_dict(card_data).code for card_data in data["cards"])
+            return cls(codes, rng)
+        except (KeyError, TypeError, ValueError) as e:
             raise ValueError(f"Invalid deck data: {e}")
@@ -1,6 +1,8 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from uuid import uuid4
 from enum import Enum, auto
+import random
+import secrets
 from common.card import Card, CardType, CardColor
 from common.player import Player
 from common.deck import Deck
@@ -16,15 +18,31 @@ class GameError(Exception):
     pass
 
 
+# Builds a game's generator from its seed. Any random.Random subclass works,
+# so bulk simulations can swap in a faster generator; replays must use the
+# same factory as the original game.
+RngFactory = Callable[[int], random.Random]
+
+
 class Game:
     INITIAL_CARDS_PER_PLAYER = 7
     MIN_PLAYERS = 2
     MAX_PLAYERS = 4
 
-    def __init__(self, game_id: str = None):
+    def __init__(
+        self,
+        game_id: str = None,
+        seed: Optional[int] = None,
+        rng_factory: RngFactory = random.Random,
+    ):
         self._game_id = game_id or str(uuid4())
+        self._seed = seed if seed is not None else secrets.randbits(64)
+        self._rng = rng_factory(self._seed)
+        # Every state-changing call, in order; replaying it against a game
+        # with the same seed reproduces this game exactly.
+        self._action_log: List[List[Any]] = []
         self._players: List[Player] = []
-        self._deck = Deck()
+        self._deck = Deck(rng=self._rng)
         self._discard_pile: List[Card] = []
         self._current_player_index = 0
         self._direction_clockwise = True
@@ -35,6 +53,14 @@ class Game:
     def game_id(self) -> str:
         return self._game_id
 
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def action_log(self) -> List[List[Any]]:
+        return self._action_log
+
     @property
     def state(self) -> GameState:
         return self._state
@@ -45,6 +71,14 @@ class Game:
             return None
         return self._players[self._current_player_index]
 
+    @property
+    def players(self) -> List[Player]:
+        return self._players.copy()
+
+    @property
+    def top_card(self) -> Optional[Card]:
+        return self._discard_pile[-1] if self._discard_pile else None
+
     @property
     def current_color(self) -> Optional[CardColor]:
         if not self._discard_pile:
@@ -59,9 +93,11 @@ class Game:
         if any(p.player_id == player.player_id for p in self._players):
             raise GameError("Cannot add player: player ID already exists")
 
+        self._action_log.append(["add_player", player.player_id, player.name])
         self._players.append(player)
 
     def remove_player(self, player_id: str) -> None:
+        self._action_log.append(["remove_player", player_id])
         if self._state == GameState.PLAYING:
             # Just mark the player as disconnected during gameplay
             for player in self._players:
@@ -71,6 +107,9 @@ class Game:
             return
 
         self._players = [p for p in self._players if p.player_id != player_id]
+        if self._current_player_index >= len(self._players):
+            # A finished game may have ended on the seat that just left
+            self._current_player_index = 0
 
     def start_game(self) -> None:
         if self._state != GameState.WAITING:
@@ -78,6 +117,7 @@ class Game:
         if len(self._players) < self.MIN_PLAYERS:
             raise GameError(f"Need at least {self.MIN_PLAYERS} players to start")
 
+        self._action_log.append(["start_game"])
         # Initialize the game
         self._deck.shuffle()
 
@@ -116,6 +156,14 @@ class Game:
             raise GameError("Invalid card play")
 
         self.current_player.remove_card(card)
+        self._action_log.append(
+            [
+                "play_card",
+                player_id,
+                card.code,
+                chosen_color.name if chosen_color else None,
+            ]
+        )
         self._discard_pile.append(card)
 
         if card.type not in [CardType.WILD, CardType.WILD_DRAW_FOUR]:
@@ -158,12 +206,11 @@ class Game:
         if self.current_player.player_id != player_id:
             raise GameError("Not your turn")
 
+        self._action_log.append(["draw_card", player_id])
         card = self._deck.draw()
         if not card and len(self._discard_pile) > 1:
-            top_card = self._discard_pile.pop()
-            self._deck.add_cards(self._discard_pile)
-            self._discard_pile = [top_card]
-            self._deck.shuffle()
+            self._deck.merge_pile(self._discard_pile[:-1])
+            del self._discard_pile[:-1]
             card = self._deck.draw()
 
         if card:
@@ -184,6 +231,15 @@ class Game:
 
         return card.can_be_played_on(top_card, self._current_color)
 
+    def get_valid_plays(self) -> List[Card]:
+        # The current player's cards that is_valid_play would accept
+        player = self.current_player
+        if not player:
+            return []
+        if not self._discard_pile:
+            return list(player.hand)
+        return player.get_valid_plays(self._discard_pile[-1], self._current_color)
+
     def get_game_state(self) -> Dict[str, Any]:
         return {
             "game_id": self._game_id,
@@ -202,6 +258,7 @@ class Game:
                     "name": player.name,
                     "card_count": player.card_count(),
                     "is_connected": player.is_connected,
+                    "is_bot": player.is_bot,
                 }
                 for player in self._players
             ],
@@ -249,13 +306,23 @@ class Game:
             "direction_clockwise": self._direction_clockwise,
             "state": self._state.name,
             "current_color": self._current_color.name if self._current_color else None,
+            "seed": self._seed,
+            "rng_state": _dump_rng_state(self._rng),
+            "action_log": [list(action) for action in self._action_log],
         }
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "Game":
-        game = cls(game_id=data["game_id"])
+    def from_dict(
+        cls, data: Dict[str, Any], rng_factory: RngFactory = random.Random
+    ) -> "Game":
+        game = cls(
+            game_id=data["game_id"], seed=data.get("seed"), rng_factory=rng_factory
+        )
+        if data.get("rng_state") is not None:
+            game._rng.setstate(_load_rng_state(data["rng_state"]))
+        game._action_log = [list(action) for action in data.get("action_log", [])]
         game._players = [Player.from_dict(p) for p in data["players"]]
-        game._deck = Deck.from_dict(data["deck"])
+        game._deck = Deck.from_dict(data["deck"], rng=game._rng)
         game._discard_pile = [Card.from_dict(c) for c in data["discard_pile"]]
         game._current_player_index = data["current_player_index"]
         game._direction_clockwise = data["direction_clockwise"]
@@ -264,3 +331,54 @@ class Game:
             CardColor[data["current_color"]] if data["current_color"] else None
         )
         return game
+
+    @classmethod
+    def replay(
+        cls, data: Dict[str, Any], rng_factory: RngFactory = random.Random
+    ) -> "Game":
+        # Re-runs a game from its seed and action log (as found in to_dict)
+        game = cls(
+            game_id=data["game_id"], seed=data["seed"], rng_factory=rng_factory
+        )
+        game.apply_actions(data["action_log"])
+        return game
+
+    def apply_actions(self, actions: List[List[Any]]) -> None:
+        # Re-runs logged actions against this game, in order
+        for action, *args in actions:
+            try:
+                match action:
+                    case "add_player":
+                        self.add_player(Player(*args))
+                    case "remove_player":
+                        self.remove_player(*args)
+                    case "start_game":
+                        self.start_game()
+                    case "play_card":
+                        player_id, code, color = args
+                        self.play_card(
+                            player_id,
+                            Card.from_code(code),
+                            CardColor[color] if color else None,
+                        )
+                    case "draw_card":
+                        self.draw_card(*args)
+                    case _:
+                        raise ValueError(f"Unknown action in log: {action}")
+            except GameError:
+                # Logged actions may have failed part-way in the original
+                # game too; the state they left behind is what we replay.
+                pass
+
+
+def _dump_rng_state(rng: random.Random) -> Optional[List[Any]]:
+    getstate = getattr(rng, "getstate", None)
+    if getstate is None:
+        return None
+    version, internal_state, gauss_next = getstate()
+    return [version, list(internal_state), gauss_next]
+
+
+def _load_rng_state(state: List[Any]) -> Any:
+    version, internal_state, gauss_next = state
+    return (version, tuple(internal_state), gauss_next)
@@ -1,22 +1,15 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple
 from uuid import uuid4
+import asyncio
 import time
 from common.game import Game, Player, GameState
 from common.network_protocol import MessageType
 from common.card import Card
 from common.card_enums import CardColor, CardType
+from common.chat_history import ChatHistory, ChatMessage
 from server.event_manager import EventManager
 
 
-@dataclass
-class ChatMessage:
-    player_id: str
-    player_name: str
-    content: str
-    timestamp: float = field(default_factory=lambda: time.time())
-
-
 class GameRoom:
     def __init__(
         self,
@@ -26,7 +19,14 @@ class GameRoom:
         self.room_id = room_id or str(uuid4())
         self.event_manager = event_manager or EventManager()
         self.game = Game(self.room_id)
-        self.chat_history: List[ChatMessage] = []
+        self.chat_history = ChatHistory()
+        self._inbox: Optional[asyncio.Queue] = None
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._stopped = False
+        self.actions_processed = 0
+        self.total_processing_time = 0.0
+        self.max_processing_time = 0.0
+        self.total_queue_wait = 0.0
 
     @property
     def is_full(self) -> bool:
@@ -36,6 +36,10 @@ class GameRoom:
     def player_count(self) -> int:
         return len(self.game._players)
 
+    @property
+    def has_humans(self) -> bool:
+        return any(not player.is_bot for player in self.game._players)
+
     async def add_player(self, player: Player) -> bool:
         try:
             if not self.is_full:
@@ -53,6 +57,31 @@ class GameRoom:
         else:
             await self._emit_room_update()
 
+    async def replace_with_bot(self, player_id: str) -> bool:
+        # Mid-game a leaving player keeps their seat and a bot plays it
+        player = self.get_player(player_id)
+        if not player or self.game.state != GameState.PLAYING:
+            return False
+        player.is_bot = True
+        await self.remove_player(player_id)
+        return True
+
+    async def set_connected(self, player_id: str, connected: bool) -> None:
+        player = self.get_player(player_id)
+        if player and player.is_connected != connected:
+            player.is_connected = connected
+            await self._emit_room_update()
+
+    async def reclaim_seat(self, player_id: str) -> bool:
+        # A seated player coming back (e.g. after a restart) takes over from the bot
+        player = self.get_player(player_id)
+        if not player:
+            return False
+        player.is_connected = True
+        player.is_bot = False
+        await self._emit_room_update()
+        return True
+
     async def start_game(self) -> bool:
         try:
             if self.player_count >= self.game.MIN_PLAYERS:
@@ -85,6 +114,112 @@ class GameRoom:
             "state": game_state,
         }
 
+    def get_player(self, player_id: str) -> Optional[Player]:
+        return next((p for p in self.game._players if p.player_id == player_id), None)
+
+    def get_player_hand(self, player_id: str) -> List[Dict[str, Any]]:
+        player = self.get_player(player_id)
+        return [card.to_dict() for card in player.hand] if player else []
+
+    async def submit_action(self, player_id: str, action: str, data: dict) -> bool:
+        return await self.run_serialized(
+            self.handle_player_action, player_id, action, data
+        )
+
+    async def run_serialized(
+        self, operation: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        # Every mutation of the room goes through one consumer task, which gives
+        # a deterministic order per room while other rooms proceed independently.
+        if self._stopped:
+            # A closed room; a late bot turn or disconnect finds nothing to do
+            return False
+        if self._consumer_task is not None and asyncio.current_task() is (
+            self._consumer_task
+        ):
+            return await operation(*args)
+
+        if self._consumer_task is None or self._consumer_task.done():
+            # Also when the consumer died unexpectedly, e.g. cancelled by a
+            # shutdown that still has disconnects to process
+            self._inbox = asyncio.Queue()
+            self._consumer_task = asyncio.create_task(self._consume(self._inbox))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inbox.put_nowait((operation, args, future, time.monotonic()))
+        return await future
+
+    def stop(self) -> None:
+        self._stopped = True
+        task, inbox = self._consumer_task, self._inbox
+        self._consumer_task = None
+        self._inbox = None
+        if task is None:
+            return
+
+        while not inbox.empty():
+            _, _, future, _ = inbox.get_nowait()
+            if not future.done():
+                future.set_result(False)
+
+        if task is asyncio.current_task():
+            inbox.put_nowait(None)
+        else:
+            task.cancel()
+
+    async def _consume(self, inbox: asyncio.Queue) -> None:
+        try:
+            while True:
+                item = await inbox.get()
+                if item is None:
+                    return
+                await self._run_item(*item)
+        finally:
+            # Nothing will run what is still queued; release its callers
+            while not inbox.empty():
+                item = inbox.get_nowait()
+                if item is not None and not item[2].done():
+                    item[2].set_result(False)
+
+    async def _run_item(
+        self,
+        operation: Callable[..., Awaitable[Any]],
+        args: Tuple[Any, ...],
+        future: asyncio.Future,
+        enqueued_at: float,
+    ) -> None:
+        started_at = time.monotonic()
+        try:
+            result = await operation(*args)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_result(False)
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+        elapsed = time.monotonic() - started_at
+        self.actions_processed += 1
+        self.total_processing_time += elapsed
+        self.max_processing_time = max(self.max_processing_time, elapsed)
+        self.total_queue_wait += started_at - enqueued_at
+
+    def get_metrics(self) -> Dict[str, Any]:
+        processed = self.actions_processed or 1
+        return {
+            "queue_depth": self._inbox.qsize() if self._inbox else 0,
+            "actions_processed": self.actions_processed,
+            "avg_processing_ms": self.total_processing_time / processed * 1000,
+            "max_processing_ms": self.max_processing_time * 1000,
+            "avg_queue_wait_ms": self.total_queue_wait / processed * 1000,
+            "chat_messages": len(self.chat_history),
+            "chat_bytes": self.chat_history.size_bytes,
+        }
+
     async def handle_player_action(
         self, player_id: str, action: str, data: dict
     ) -> bool:
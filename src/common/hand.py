@@ -0,0 +1,133 @@
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Union
+from common.card import Card, CARDS, CARD_CODE_COUNT
+
+
+def _codes(mask: int) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class Hand:
+    # Per-face counts indexed by card code, plus a bitmask of the codes with a
+    # non-zero count so playability is a single AND against a playable mask.
+    # Cards iterate grouped by face in code order, not in the order received.
+    __slots__ = ("_counts", "_mask", "_size", "_score")
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        self._counts = bytearray(CARD_CODE_COUNT)
+        self._mask = 0
+        self._size = 0
+        self._score = 0
+        for card in cards:
+            self.add(card)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    @property
+    def score(self) -> int:
+        return self._score
+
+    def add(self, card: Card) -> None:
+        code = card.code
+        self._counts[code] += 1
+        self._mask |= 1 << code
+        self._size += 1
+        self._score += card.get_score_value()
+
+    def remove(self, card: Card) -> None:
+        code = card.code
+        count = self._counts[code]
+        if not count:
+            raise ValueError(f"{card} not in hand")
+        self._counts[code] = count - 1
+        if count == 1:
+            self._mask &= ~(1 << code)
+        self._size -= 1
+        self._score -= card.get_score_value()
+
+    def clear(self) -> None:
+        self._counts = bytearray(CARD_CODE_COUNT)
+        self._mask = 0
+        self._size = 0
+        self._score = 0
+
+    def count(self, card: Card) -> int:
+        return self._counts[card.code]
+
+    def has_playable(self, playable_mask: int) -> bool:
+        return bool(self._mask & playable_mask)
+
+    def playable(self, playable_mask: int) -> List[Card]:
+        counts = self._counts
+        cards = []
+        for code in _codes(self._mask & playable_mask):
+            cards.extend([CARDS[code]] * counts[code])
+        return cards
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, card: object) -> bool:
+        return isinstance(card, Card) and self._counts[card.code] > 0
+
+    def __iter__(self) -> Iterator[Card]:
+        counts = self._counts
+        for code in _codes(self._mask):
+            card = CARDS[code]
+            for _ in range(counts[code]):
+                yield card
+
+
+class HandView(Sequence):
+    # Read-only, zero-copy access to a Hand; reflects later changes to it
+    __slots__ = ("_hand",)
+
+    def __init__(self, hand: Hand):
+        self._hand = hand
+
+    @property
+    def mask(self) -> int:
+        return self._hand.mask
+
+    @property
+    def score(self) -> int:
+        return self._hand.score
+
+    def count(self, card: Card) -> int:
+        return self._hand.count(card)
+
+    def __len__(self) -> int:
+        return len(self._hand)
+
+    def __contains__(self, card: object) -> bool:
+        return card in self._hand
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self._hand)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Card, List[Card]]:
+        if isinstance(index, slice):
+            return list(self._hand)[index]
+        if index < 0:
+            index += len(self._hand)
+        if not 0 <= index < len(self._hand):
+            raise IndexError("hand index out of range")
+
+        counts = self._hand._counts
+        for code in _codes(self._hand.mask):
+            if index < counts[code]:
+                return CARDS[code]
+            index -= counts[code]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HandView):
+            other = list(other)
+        return isinstance(other, (list, tuple)) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"HandView({list(self._hand)!r})"
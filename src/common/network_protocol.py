@@ -1,5 +1,11 @@
 from enum import Enum, auto
 from typing import TypedDict, Union, Optional, List, Dict, Any
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional faster backend
+    orjson = None
 
 
 class MessageType(Enum):
@@ -20,6 +26,8 @@ class MessageType(Enum):
     START_GAME = auto()  # Client -> Server: Request to start game
     GAME_STARTED = auto()  # Server -> Client: Game has started
     GAME_STATE = auto()  # Server -> Client: Current game state
+    GAME_STATE_DELTA = auto()  # Server -> Client: Changes since the last game state
+    SYNC_STATE = auto()  # Client -> Server: Request a full game state snapshot
     PLAY_CARD = auto()  # Client -> Server: Play a card
     DRAW_CARD = auto()  # Client -> Server: Draw a card
     GAME_END = auto()  # Server -> Client: Game has ended
@@ -36,7 +44,17 @@ class MessageType(Enum):
 
     # Room listing
     LIST_ROOMS = auto()  # Client -> Server: Request room list
-    ROOM_LIST = auto()  # Server -> Client: Room list response
+    ROOM_LIST = auto()  # Server -> Client: Every room, on subscribing to the lobby
+    SUBSCRIBE_LOBBY = auto()  # Client -> Server: Receive room list updates
+    UNSUBSCRIBE_LOBBY = auto()  # Client -> Server: Stop room list updates
+    ROOM_LIST_DELTA = auto()  # Server -> Client: Rooms added/changed/removed
+
+    # Bots
+    ADD_BOT = auto()  # Client -> Server: Fill a free seat with a bot
+
+    # Chat history (after the others: values are the binary codec's type byte)
+    CHAT_HISTORY = auto()  # Bi-directional: Page of a room's earlier chat
+    ROOM_PAGE = auto()  # Server -> Client: Rooms matching a LIST_ROOMS query
 
 
 class PlayerState(TypedDict):
@@ -44,6 +62,7 @@ class PlayerState(TypedDict):
     name: str
     card_count: int
     is_connected: bool
+    is_bot: bool  # Seat played by a server-side bot
 
 
 class GameState(TypedDict):
@@ -67,15 +86,22 @@ class RoomInfo(TypedDict):
 
 
 # Authentication Messages
-class AuthenticateMessage(TypedDict):
+class AuthenticateMessage(TypedDict, total=False):
     type: str  # MessageType.AUTHENTICATE
     player_id: str  # Unique identifier for the player
     name: str  # Display name of the player
+    codecs: List[str]  # Wire formats the client accepts, e.g. ["binary", "json"]
+    resume_token: str  # From the last AUTHENTICATED, to resume that session
+    received: int  # Messages received in that session, AUTHENTICATED excluded
 
 
 class AuthenticatedMessage(TypedDict):
     type: str  # MessageType.AUTHENTICATED
     player_id: str  # Confirmed player ID
+    codec: str  # Wire format used for every later message in both directions
+    resume_token: Optional[str]  # None when the server does not resume sessions
+    resumed: bool  # An earlier session was resumed; its missed messages follow
+    replayed: Optional[int]  # When resumed: messages resent, None if no longer kept
 
 
 # Room Management Messages
@@ -127,15 +153,35 @@ class StartGameMessage(TypedDict):
 class GameStartedMessage(TypedDict):
     type: str  # MessageType.GAME_STARTED
     room_id: str  # Room ID
+    seq: int  # State version of this snapshot
     state: GameState  # Initial game state
 
 
 class GameStateMessage(TypedDict):
     type: str  # MessageType.GAME_STATE
     room_id: str  # Room ID
+    seq: int  # State version of this snapshot
     state: GameState  # Current game state
 
 
+class GameStateDeltaMessage(TypedDict, total=False):
+    type: str  # MessageType.GAME_STATE_DELTA
+    room_id: str  # Room ID
+    seq: int  # State version after applying this delta
+    base_seq: int  # State version this delta applies to
+    changes: Dict[str, Any]  # Changed top-level GameState fields
+    players: List[PlayerState]  # Full player list (when players joined or left)
+    player_updates: List[List[Any]]  # [index, PlayerState] pairs that changed
+    hand_added: List[Dict]  # Cards added to the receiver's hand
+    hand_removed: List[Dict]  # Cards removed from the receiver's hand
+
+
+class SyncStateMessage(TypedDict):
+    type: str  # MessageType.SYNC_STATE
+    room_id: str  # Room ID
+    player_id: str  # Player requesting the snapshot
+
+
 class PlayCardMessage(TypedDict):
     type: str  # MessageType.PLAY_CARD
     room_id: str  # Room ID
@@ -153,6 +199,7 @@ class DrawCardMessage(TypedDict):
 class GameEndMessage(TypedDict):
     type: str  # MessageType.GAME_END
     room_id: str  # Room ID
+    seq: int  # State version of this snapshot
     winner_id: str  # ID of winning player
     state: GameState  # Final game state
 
@@ -167,6 +214,21 @@ class ChatMessage(TypedDict):
     timestamp: float  # Message timestamp
 
 
+class ChatHistoryRequest(TypedDict, total=False):
+    type: str  # MessageType.CHAT_HISTORY
+    room_id: str  # Room the requesting player is in
+    cursor: str  # next_cursor of the previous page (latest messages if absent)
+    limit: int  # Page size (default 50)
+
+
+class ChatHistoryMessage(TypedDict):
+    type: str  # MessageType.CHAT_HISTORY
+    room_id: str  # Room ID
+    speakers: List[List[str]]  # [player_id, player_name] of each speaker
+    messages: List[List[Any]]  # [speaker index, content, timestamp], oldest first
+    next_cursor: Optional[str]  # Cursor for older messages, None if no more kept
+
+
 # Connection Messages
 class PlayerConnectionMessage(TypedDict):
     type: str  # MessageType.PLAYER_DISCONNECTED or PLAYER_RECONNECTED
@@ -180,13 +242,54 @@ class ErrorMessage(TypedDict):
     message: str  # Error description
 
 
-class ListRoomsMessage(TypedDict):
+class ListRoomsMessage(TypedDict, total=False):
     type: str  # MessageType.LIST_ROOMS
+    state: str  # Only rooms in this state: "WAITING" | "PLAYING" | "FINISHED"
+    has_free_seat: bool  # Only rooms with (or without) a free seat
+    sort: str  # "created" | "player_count" | "free_seats"
+    descending: bool  # Reverse the sort order
+    cursor: str  # next_cursor of the previous page
+    limit: int  # Page size (max 200)
+    request_id: int  # Set by the shard router, which merges the replies
 
 
 class RoomListMessage(TypedDict):
     type: str  # MessageType.ROOM_LIST
+    rooms: List[RoomInfo]  # The whole lobby; ROOM_LIST_DELTA updates follow
+
+
+class RoomPageMessage(TypedDict):
+    type: str  # MessageType.ROOM_PAGE
     rooms: List[RoomInfo]
+    next_cursor: Optional[str]  # Cursor for the next page, None on the last page
+
+
+class ShardRoomListMessage(RoomListMessage, total=False):
+    # A shard's lobby snapshot for the router
+    request_id: int  # Echoed from the request
+
+
+class ShardRoomPageMessage(RoomPageMessage, total=False):
+    # A shard's page for the router
+    request_id: int  # Echoed from the request
+    keys: List[str]  # Cursor resuming right after each room
+
+
+class SubscribeLobbyMessage(TypedDict):
+    type: str  # MessageType.SUBSCRIBE_LOBBY or UNSUBSCRIBE_LOBBY
+
+
+class RoomListDeltaMessage(TypedDict):
+    type: str  # MessageType.ROOM_LIST_DELTA
+    added: List[RoomInfo]  # Rooms that appeared since the last update
+    changed: List[RoomInfo]  # Rooms whose info changed
+    removed: List[str]  # IDs of rooms that were closed
+
+
+class AddBotMessage(TypedDict, total=False):
+    type: str  # MessageType.ADD_BOT
+    room_id: str  # Room to add the bot to (must be waiting to start)
+    policy: str  # Bot policy name, e.g. "rollout" or "greedy" (the default)
 
 
 # Union type for all possible messages
@@ -203,12 +306,71 @@ NetworkMessage = Union[
     StartGameMessage,
     GameStartedMessage,
     GameStateMessage,
+    GameStateDeltaMessage,
+    SyncStateMessage,
     PlayCardMessage,
     DrawCardMessage,
     GameEndMessage,
     ChatMessage,
+    ChatHistoryRequest,
+    ChatHistoryMessage,
     PlayerConnectionMessage,
     ErrorMessage,
     ListRoomsMessage,
     RoomListMessage,
+    RoomPageMessage,
+    SubscribeLobbyMessage,
+    RoomListDeltaMessage,
+    AddBotMessage,
 ]
+
+
+class Codec:
+    name = ""
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    # Encoded objects can be combined without decoding them again, which lets
+    # the server encode a shared broadcast once and splice in per-player parts.
+    def merge(self, encoded: bytes, fragment: bytes) -> bytes:
+        raise NotImplementedError
+
+    def wrap(self, key: str, encoded_value: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return json.dumps(message, separators=(",", ":")).encode()
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return json.loads(data)
+
+    def merge(self, encoded: bytes, fragment: bytes) -> bytes:
+        if fragment == b"{}":
+            return encoded
+        if encoded == b"{}":
+            return fragment
+        return encoded[:-1] + b"," + fragment[1:]
+
+    def wrap(self, key: str, encoded_value: bytes) -> bytes:
+        return b"{" + self.encode(key) + b":" + encoded_value + b"}"
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return orjson.dumps(message)
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return orjson.loads(data)
+
+
+DEFAULT_CODEC: Codec = OrjsonCodec() if orjson else JsonCodec()
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional, Iterator
-from common.card import Card
+from common.card import Card, playable_mask
+from common.hand import Hand, HandView
 from common.card_enums import CardColor
 
 
@@ -7,8 +8,10 @@ class Player:
     def __init__(self, player_id: str, name: str):
         self._player_id: str = player_id
         self._name: str = name
-        self._hand: List[Card] = []
+        self._hand = Hand()
+        self._hand_view = HandView(self._hand)
         self._is_connected: bool = True
+        self._is_bot: bool = False
         self._score: int = 0
 
     @property
@@ -20,8 +23,8 @@ class Player:
         return self._name
 
     @property
-    def hand(self) -> List[Card]:
-        return self._hand.copy()
+    def hand(self) -> HandView:
+        return self._hand_view
 
     @property
     def is_connected(self) -> bool:
@@ -31,6 +34,14 @@ class Player:
     def is_connected(self, value: bool):
         self._is_connected = value
 
+    @property
+    def is_bot(self) -> bool:
+        return self._is_bot
+
+    @is_bot.setter
+    def is_bot(self, value: bool):
+        self._is_bot = value
+
     @property
     def score(self) -> int:
         return self._score
@@ -38,7 +49,7 @@ class Player:
     def add_card(self, card: Card) -> None:
         if not isinstance(card, Card):
             raise ValueError("Invalid card object")
-        self._hand.append(card)
+        self._hand.add(card)
 
     def add_cards(self, cards: List[Card]) -> None:
         for card in cards:
@@ -53,21 +64,15 @@ class Player:
     def get_valid_plays(
         self, top_card: Card, current_color: Optional[CardColor] = None
     ) -> List[Card]:
-        return [
-            card
-            for card in self._hand
-            if card.can_be_played_on(top_card, current_color)
-        ]
+        return self._hand.playable(playable_mask(top_card, current_color))
 
     def has_playable_card(
         self, top_card: Card, current_color: Optional[CardColor] = None
     ) -> bool:
-        return any(
-            card.can_be_played_on(top_card, current_color) for card in self._hand
-        )
+        return self._hand.has_playable(playable_mask(top_card, current_color))
 
     def calculate_score(self) -> int:
-        return sum(card.get_score_value() for card in self._hand)
+        return self._hand.score
 
     def update_score(self) -> None:
         self._score += self.calculate_score()
@@ -87,6 +92,7 @@ class Player:
             "name": self._name,
             "hand": [card.to_dict() for card in self._hand],
             "is_connected": self._is_connected,
+            "is_bot": self._is_bot,
             "score": self._score,
         }
 
@@ -95,8 +101,9 @@ class Player:
         try:
             player = cls(player_id=data["player_id"], name=data["name"])
             player._is_connected = data["is_connected"]
+            player._is_bot = data.get("is_bot", False)
             player._score = data["score"]
-            player._hand = [Card.from_dict(card_data) for card_data in data["hand"]]
+            player.add_cards([Card.from_dict(card_data) for card_data in data["hand"]])
             return player
         except (KeyError, ValueError) as e:
             raise ValueError(f"Invalid player data: {e}")
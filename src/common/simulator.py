@@ -0,0 +1,241 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Type
+import random
+import time
+from common.card import Card
+from common.card_enums import CardColor, CardType
+from common.game import Game, GameState, RngFactory
+from common.hand import HandView
+from common.player import Player
+
+WILD_TYPES = (CardType.WILD, CardType.WILD_DRAW_FOUR)
+PLAYABLE_COLORS = [CardColor.RED, CardColor.BLUE, CardColor.GREEN, CardColor.YELLOW]
+
+
+class Policy:
+    name = ""
+
+    def choose_card(
+        self, valid_plays: List[Card], hand: HandView, rng: random.Random
+    ) -> Card:
+        raise NotImplementedError
+
+    def choose_color(self, hand: HandView, rng: random.Random) -> CardColor:
+        # Name the color we hold most of, so the next turn likely has a play;
+        # ties (and a hand of only wilds) go to the first color in order.
+        counts = Counter(card.color for card in hand)
+        return max(PLAYABLE_COLORS, key=lambda color: counts[color])
+
+
+class RandomPolicy(Policy):
+    name = "random"
+
+    def choose_card(
+        self, valid_plays: List[Card], hand: HandView, rng: random.Random
+    ) -> Card:
+        return rng.choice(valid_plays)
+
+    def choose_color(self, hand: HandView, rng: random.Random) -> CardColor:
+        return rng.choice(PLAYABLE_COLORS)
+
+
+class FirstPlayablePolicy(Policy):
+    name = "first"
+
+    def choose_card(
+        self, valid_plays: List[Card], hand: HandView, rng: random.Random
+    ) -> Card:
+        return valid_plays[0]
+
+
+class GreedyPolicy(Policy):
+    # Sheds the most valuable card first, keeping wilds for last
+    name = "greedy"
+
+    def choose_card(
+        self, valid_plays: List[Card], hand: HandView, rng: random.Random
+    ) -> Card:
+        return max(
+            valid_plays,
+            key=lambda card: (card.type not in WILD_TYPES, card.get_score_value()),
+        )
+
+
+POLICIES: Dict[str, Type[Policy]] = {
+    policy.name: policy for policy in [RandomPolicy, FirstPlayablePolicy, GreedyPolicy]
+}
+
+
+@dataclass
+class GameResult:
+    seed: int
+    turns: int
+    winner_seat: Optional[int]  # None when the turn cap ended the game
+    hand_scores: List[int]  # Points left in each seat's hand at the end
+
+    @property
+    def winner_points(self) -> int:
+        return sum(self.hand_scores)
+
+
+def play_out(
+    game: Game,
+    policies: Dict[str, Policy],
+    rng: random.Random,
+    max_turns: int = 1000,
+) -> int:
+    # Plays a started game on until it finishes or hits the turn cap, asking
+    # each player's policy for their moves; returns the number of turns taken
+    turns = 0
+    while game.state == GameState.PLAYING and turns < max_turns:
+        player = game.current_player
+        valid_plays = game.get_valid_plays()
+        if valid_plays:
+            policy = policies[player.player_id]
+            card = policy.choose_card(valid_plays, player.hand, rng)
+            chosen_color = (
+                policy.choose_color(player.hand, rng)
+                if card.type in WILD_TYPES
+                else None
+            )
+            game.play_card(player.player_id, card, chosen_color)
+        else:
+            game.draw_card(player.player_id)
+        turns += 1
+    return turns
+
+
+def play_game(
+    seed: int,
+    policies: List[Policy],
+    max_turns: int = 1000,
+    rng_factory: RngFactory = random.Random,
+) -> GameResult:
+    # Drives a real Game, so the rules are exactly those used in production.
+    # Policies draw from their own stream so they never perturb the deck.
+    game = Game(game_id=f"sim-{seed}", seed=seed, rng_factory=rng_factory)
+    players = [
+        Player(f"seat-{seat}", policy.name) for seat, policy in enumerate(policies)
+    ]
+    for player in players:
+        game.add_player(player)
+    game.start_game()
+
+    seats = {player.player_id: seat for seat, player in enumerate(players)}
+    turns = play_out(
+        game,
+        {player.player_id: policy for player, policy in zip(players, policies)},
+        rng_factory(seed ^ 0x5EED),
+        max_turns,
+    )
+
+    winner = game.get_winner()
+    return GameResult(
+        seed=seed,
+        turns=turns,
+        winner_seat=seats[winner.player_id] if winner else None,
+        hand_scores=[player.calculate_score() for player in players],
+    )
+
+
+@dataclass
+class SimulationReport:
+    policies: List[str]
+    games: int = 0
+    capped_games: int = 0
+    total_turns: int = 0
+    wins_by_seat: Counter = field(default_factory=Counter)
+    winner_points: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        self.total_turns += result.turns
+        if result.winner_seat is None:
+            self.capped_games += 1
+        else:
+            self.wins_by_seat[result.winner_seat] += 1
+            self.winner_points[result.winner_points] += 1
+
+    def merge(self, other: "SimulationReport") -> None:
+        self.games += other.games
+        self.capped_games += other.capped_games
+        self.total_turns += other.total_turns
+        self.wins_by_seat.update(other.wins_by_seat)
+        self.winner_points.update(other.winner_points)
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def average_turns(self) -> float:
+        return self.total_turns / self.games if self.games else 0.0
+
+    def win_rates(self) -> Dict[int, float]:
+        return {
+            seat: self.wins_by_seat[seat] / self.games if self.games else 0.0
+            for seat in range(len(self.policies))
+        }
+
+    def score_percentiles(self, percentiles: List[int]) -> Dict[int, int]:
+        scores = sorted(self.winner_points.elements())
+        if not scores:
+            return {}
+        return {
+            percentile: scores[min(len(scores) - 1, len(scores) * percentile // 100)]
+            for percentile in percentiles
+        }
+
+
+def _simulate_chunk(
+    seeds: range, policy_names: List[str], max_turns: int, rng_factory: RngFactory
+) -> SimulationReport:
+    policies = [POLICIES[name]() for name in policy_names]
+    report = SimulationReport(policies=policy_names)
+    for seed in seeds:
+        report.add(play_game(seed, policies, max_turns, rng_factory))
+    return report
+
+
+def run_simulation(
+    games: int,
+    policy_names: List[str],
+    workers: int = 1,
+    seed: int = 0,
+    max_turns: int = 1000,
+    chunk_size: int = 250,
+    rng_factory: RngFactory = random.Random,
+) -> SimulationReport:
+    # Game i always uses seed + i, so results do not depend on the worker count
+    unknown = [name for name in policy_names if name not in POLICIES]
+    if unknown:
+        raise ValueError(f"Unknown policies: {', '.join(unknown)}")
+    if not Game.MIN_PLAYERS <= len(policy_names) <= Game.MAX_PLAYERS:
+        raise ValueError(
+            f"Need {Game.MIN_PLAYERS}-{Game.MAX_PLAYERS} policies, one per seat"
+        )
+
+    chunks = [
+        range(start, min(start + chunk_size, seed + games))
+        for start in range(seed, seed + games, chunk_size)
+    ]
+    report = SimulationReport(policies=policy_names)
+    start = time.perf_counter()
+    if workers <= 1:
+        for chunk in chunks:
+            report.merge(_simulate_chunk(chunk, policy_names, max_turns, rng_factory))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _simulate_chunk, chunk, policy_names, max_turns, rng_factory
+                )
+                for chunk in chunks
+            ]
+            for future in futures:
+                report.merge(future.result())
+    report.elapsed = time.perf_counter() - start
+    return report
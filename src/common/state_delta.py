@@ -0,0 +1,81 @@
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+CardKey = Tuple[str, str, int]
+
+
+def _card_key(card: Dict[str, Any]) -> CardKey:
+    return (card["type"], card["color"], card["value"])
+
+
+def diff_public_state(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {
+        "changes": {
+            key: value
+            for key, value in current.items()
+            if key != "players" and previous.get(key) != value
+        }
+    }
+
+    previous_players = previous.get("players", [])
+    players = current.get("players", [])
+    if len(previous_players) != len(players):
+        delta["players"] = players
+    else:
+        updates = [
+            [index, player]
+            for index, (old, player) in enumerate(zip(previous_players, players))
+            if old != player
+        ]
+        if updates:
+            delta["player_updates"] = updates
+
+    return delta
+
+
+def diff_hand(
+    previous: List[Dict[str, Any]], current: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    remaining = Counter(_card_key(card) for card in previous)
+    added = []
+    for card in current:
+        key = _card_key(card)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            added.append(card)
+
+    removed = []
+    for card in previous:
+        key = _card_key(card)
+        if remaining[key]:
+            remaining[key] -= 1
+            removed.append(card)
+
+    return added, removed
+
+
+def apply_state_delta(
+    state: Dict[str, Any], delta: Dict[str, Any]
+) -> Dict[str, Any]:
+    new_state = dict(state)
+    new_state.update(delta.get("changes", {}))
+
+    if "players" in delta:
+        new_state["players"] = delta["players"]
+    elif "player_updates" in delta:
+        players = list(state["players"])
+        for index, player in delta["player_updates"]:
+            players[index] = player
+        new_state["players"] = players
+
+    hand = list(state.get("your_hand") or [])
+    for card in delta.get("hand_removed", []):
+        hand.remove(card)
+    hand.extend(delta.get("hand_added", []))
+    new_state["your_hand"] = hand
+
+    return new_state
+
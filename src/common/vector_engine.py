@@ -0,0 +1,298 @@
+from dataclasses import dataclass
+from typing import Any, List, Sequence
+import random
+from common.card import (
+    CARDS,
+    CARD_CODE_COUNT,
+    PLAYABLE_IN_COLOR,
+    PLAYABLE_ON,
+    SUIT_COLORS,
+)
+from common.card_enums import CardColor, CardType
+from common.deck import STANDARD_DECK_CODES
+from common.game import Game, RngFactory
+from common.simulator import FirstPlayablePolicy, SimulationReport, play_game
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Struct-of-arrays UNO engine: every array has the game as its first axis and
+# each step advances all unfinished games by one turn. It implements the rules
+# of Game.play_card/draw_card (quirks included) for one fixed policy, the same
+# as simulator.FirstPlayablePolicy: play the lowest-code valid card and name
+# the color held most. Shuffles go through each game's own Python generator,
+# seeded like Game, so every vectorized game matches its scalar counterpart.
+
+_COLORS = list(CardColor)
+(
+    _KIND_NUMBER,
+    _KIND_SKIP,
+    _KIND_REVERSE,
+    _KIND_DRAW_TWO,
+    _KIND_WILD,
+    _KIND_WILD_FOUR,
+) = range(6)
+_KINDS = {
+    CardType.NUMBER: _KIND_NUMBER,
+    CardType.SKIP: _KIND_SKIP,
+    CardType.REVERSE: _KIND_REVERSE,
+    CardType.DRAW_TWO: _KIND_DRAW_TWO,
+    CardType.WILD: _KIND_WILD,
+    CardType.WILD_DRAW_FOUR: _KIND_WILD_FOUR,
+}
+DECK_SIZE = len(STANDARD_DECK_CODES)
+POLICY_NAME = FirstPlayablePolicy.name
+
+
+def _bits(mask: int) -> List[bool]:
+    return [bool(mask >> code & 1) for code in range(CARD_CODE_COUNT)]
+
+
+def _tables() -> Any:
+    play_on_top = np.array([_bits(mask) for mask in PLAYABLE_ON], dtype=bool)
+    play_in_color = np.array(
+        [_bits(PLAYABLE_IN_COLOR[color]) for color in _COLORS], dtype=bool
+    )
+    kinds = np.array([_KINDS[card.type] for card in CARDS], dtype=np.int8)
+    suit_of = np.array(
+        [[card.color == color for color in SUIT_COLORS] for card in CARDS],
+        dtype=np.int16,
+    )
+    scores = np.array([card.get_score_value() for card in CARDS], dtype=np.int32)
+    suit_to_color = np.array(
+        [_COLORS.index(color) for color in SUIT_COLORS], dtype=np.int8
+    )
+    return play_on_top, play_in_color, kinds, suit_of, scores, suit_to_color
+
+
+@dataclass
+class BatchResult:
+    seeds: Any  # int64[games]
+    turns: Any  # int32[games]
+    winner_seat: Any  # int8[games], -1 when the turn cap ended the game
+    hand_scores: Any  # int32[games, players]
+
+    def to_report(self, elapsed: float = 0.0) -> SimulationReport:
+        players = self.hand_scores.shape[1]
+        report = SimulationReport(policies=[POLICY_NAME] * players, elapsed=elapsed)
+        finished = self.winner_seat >= 0
+        report.games = len(self.seeds)
+        report.capped_games = int((~finished).sum())
+        report.total_turns = int(self.turns.sum())
+        for seat in range(players):
+            report.wins_by_seat[seat] = int((self.winner_seat == seat).sum())
+        points, counts = np.unique(
+            self.hand_scores[finished].sum(axis=1), return_counts=True
+        )
+        report.winner_points.update(dict(zip(points.tolist(), counts.tolist())))
+        return report
+
+
+class VectorEngine:
+    def __init__(
+        self,
+        seeds: Sequence[int],
+        players: int,
+        rng_factory: RngFactory = random.Random,
+    ):
+        if np is None:
+            raise ImportError("The vector engine needs numpy (pip install .[sim])")
+        if not Game.MIN_PLAYERS <= players <= Game.MAX_PLAYERS:
+            raise ValueError(
+                f"Need {Game.MIN_PLAYERS}-{Game.MAX_PLAYERS} players per game"
+            )
+
+        (
+            self._play_on_top,
+            self._play_in_color,
+            self._kinds,
+            self._suit_of,
+            self._scores,
+            self._suit_to_color,
+        ) = _tables()
+
+        games = len(seeds)
+        self.players = players
+        self.seeds = np.asarray(seeds, dtype=np.int64)
+        self.hands = np.zeros((games, players, CARD_CODE_COUNT), dtype=np.int16)
+        self.deck = np.zeros((games, DECK_SIZE), dtype=np.int8)
+        self.deck_len = np.zeros(games, dtype=np.int64)
+        self.discard = np.zeros((games, DECK_SIZE), dtype=np.int8)
+        self.discard_len = np.ones(games, dtype=np.int64)
+        self.color = np.full(games, -1, dtype=np.int8)  # -1 until a wild is played
+        self.current = np.zeros(games, dtype=np.int64)
+        self.direction = np.ones(games, dtype=np.int64)
+        self.finished = np.zeros(games, dtype=bool)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self._rngs = [rng_factory(int(seed)) for seed in seeds]
+        self._deal()
+
+    def _deal(self) -> None:
+        # Mirrors Game.start_game draw for draw. Each deck is shuffled by its
+        # own generator; dealing and the first discard are done in bulk.
+        shuffled = bytearray()
+        for rng in self._rngs:
+            codes = bytearray(STANDARD_DECK_CODES)
+            rng.shuffle(codes)
+            shuffled += codes
+        games = len(self._rngs)
+        decks = np.frombuffer(bytes(shuffled), dtype=np.int8).reshape(
+            games, DECK_SIZE
+        )
+
+        # Seat 0 draws the last cards of the deck, seat 1 the ones before...
+        dealt_count = Game.INITIAL_CARDS_PER_PLAYER * self.players
+        remaining = DECK_SIZE - dealt_count
+        seat_of_column = np.repeat(
+            np.arange(self.players)[::-1], Game.INITIAL_CARDS_PER_PLAYER
+        )
+        np.add.at(
+            self.hands,
+            (np.arange(games)[:, None], seat_of_column, decks[:, remaining:]),
+            1,
+        )
+        self.deck[:, :remaining] = decks[:, :remaining]
+        self.deck_len[:] = remaining
+
+        wild_on_top = self._kinds[decks[:, remaining - 1]] >= _KIND_WILD
+        for index in np.flatnonzero(wild_on_top):
+            self._redraw_initial(int(index), remaining)
+        self.deck_len -= 1
+        self.discard[:, 0] = self.deck[np.arange(games), self.deck_len]
+
+    def _redraw_initial(self, index: int, remaining: int) -> None:
+        # Game puts a wild initial card back on top and reshuffles the whole
+        # deck until a non-wild comes up; it is left on top for the bulk draw
+        rng = self._rngs[index]
+        codes = bytearray(self.deck[index, :remaining].tobytes())
+        while self._kinds[codes[-1]] >= _KIND_WILD:
+            rng.shuffle(codes)
+        self.deck[index, :remaining] = np.frombuffer(bytes(codes), dtype=np.int8)
+
+    def _advance(self, games: Any) -> None:
+        self.current[games] = (self.current[games] + self.direction[games]) % (
+            self.players
+        )
+
+    def _draw_into(self, games: Any, seats: Any, count: int) -> None:
+        # Like Deck.draw_multiple: takes what is left, never reshuffles
+        for _ in range(count):
+            has_cards = self.deck_len[games] > 0
+            drawing, drawing_seats = games[has_cards], seats[has_cards]
+            self.deck_len[drawing] -= 1
+            codes = self.deck[drawing, self.deck_len[drawing]]
+            self.hands[drawing, drawing_seats, codes] += 1
+
+    def _reshuffle(self, index: int) -> None:
+        # Game.draw_card returns the discard pile (minus its top) to the empty
+        # deck and shuffles it with the game's generator
+        kept = int(self.discard_len[index]) - 1
+        codes = bytearray(self.discard[index, :kept].tobytes())
+        self._rngs[index].shuffle(codes)
+        self.deck[index, :kept] = np.frombuffer(bytes(codes), dtype=np.int8)
+        self.deck_len[index] = kept
+        self.discard[index, 0] = self.discard[index, kept]
+        self.discard_len[index] = 1
+
+    def step(self, games: Any) -> None:
+        seats = self.current[games]
+        hands = self.hands[games, seats]
+        top = self.discard[games, self.discard_len[games] - 1]
+        color = self.color[games]
+        playable = np.where(
+            (color >= 0)[:, None],
+            self._play_in_color[np.maximum(color, 0)],
+            self._play_on_top[top],
+        )
+        valid = (hands > 0) & playable
+        has_play = valid.any(axis=1)
+
+        self._play(games[has_play], seats[has_play], valid[has_play].argmax(axis=1))
+        self._draw(games[~has_play], seats[~has_play])
+        self.turns[games] += 1
+
+    def _play(self, games: Any, seats: Any, codes: Any) -> None:
+        self.hands[games, seats, codes] -= 1
+        self.discard[games, self.discard_len[games]] = codes
+        self.discard_len[games] += 1
+
+        kinds = self._kinds[codes]
+        wild = kinds >= _KIND_WILD
+        self.color[games[~wild]] = -1
+        held = self.hands[games[wild], seats[wild]] @ self._suit_of
+        self.color[games[wild]] = self._suit_to_color[held.argmax(axis=1)]
+
+        self._advance(games[kinds == _KIND_SKIP])
+
+        reverse = games[kinds == _KIND_REVERSE]
+        self.direction[reverse] *= -1
+        if self.players == 2:
+            self._advance(reverse)
+
+        for kind, count in ((_KIND_DRAW_TWO, 2), (_KIND_WILD_FOUR, 4)):
+            drawing = games[kinds == kind]
+            next_seats = (self.current[drawing] + self.direction[drawing]) % (
+                self.players
+            )
+            self._draw_into(drawing, next_seats, count)
+            self._advance(drawing)
+
+        # As in Game.play_card, the win check looks at whoever is current
+        # after any skip, not necessarily at the player who just played.
+        emptied = self.hands[games, self.current[games]].sum(axis=1) == 0
+        self.finished[games[emptied]] = True
+        self._advance(games[~emptied])
+
+    def _draw(self, games: Any, seats: Any) -> None:
+        for index in games[(self.deck_len[games] == 0) & (self.discard_len[games] > 1)]:
+            self._reshuffle(int(index))
+        self._draw_into(games, seats, 1)
+        self._advance(games)
+
+    def run(self, max_turns: int = 1000) -> BatchResult:
+        while True:
+            active = np.flatnonzero(~self.finished & (self.turns < max_turns))
+            if not len(active):
+                break
+            self.step(active)
+
+        emptied = self.hands.sum(axis=2) == 0
+        winner_seat = np.where(
+            self.finished, emptied.argmax(axis=1), -1
+        ).astype(np.int8)
+        return BatchResult(
+            seeds=self.seeds,
+            turns=self.turns.copy(),
+            winner_seat=winner_seat,
+            hand_scores=(self.hands @ self._scores).astype(np.int32),
+        )
+
+
+def cross_check(
+    result: BatchResult,
+    samples: int,
+    max_turns: int = 1000,
+    rng_factory: RngFactory = random.Random,
+    sample_seed: int = 0,
+) -> List[int]:
+    # Replays sampled games through common.game.Game; returns mismatched seeds
+    players = result.hand_scores.shape[1]
+    policies = [FirstPlayablePolicy() for _ in range(players)]
+    picked = random.Random(sample_seed).sample(
+        range(len(result.seeds)), min(samples, len(result.seeds))
+    )
+    mismatches = []
+    for index in picked:
+        seed = int(result.seeds[index])
+        expected = play_game(seed, policies, max_turns, rng_factory)
+        winner = int(result.winner_seat[index])
+        if (
+            expected.turns != int(result.turns[index])
+            or (expected.winner_seat if expected.winner_seat is not None else -1)
+            != winner
+            or expected.hand_scores != result.hand_scores[index].tolist()
+        ):
+            mismatches.append(seed)
+    return mismatches
@@ -0,0 +1,294 @@
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import random
+import time
+from common.card import CARDS, Card, playable_mask
+from common.card_enums import CardColor
+from common.deck import STANDARD_DECK_CODES
+from common.game import Game, GameState
+from common.hand import Hand, HandView
+from common.simulator import (
+    PLAYABLE_COLORS,
+    WILD_TYPES,
+    FirstPlayablePolicy,
+    GreedyPolicy,
+    Policy,
+    RandomPolicy,
+    play_out,
+)
+
+# A bot's move is the payload GameRoom.submit_action expects:
+# {"action": "play_card", "card": {...}, "chosen_color": "RED" | None}
+# or {"action": "draw_card"}
+BotMove = Dict[str, Any]
+DRAW_MOVE: BotMove = {"action": "draw_card"}
+Candidate = Tuple[Optional[Card], Optional[CardColor]]
+
+
+def _hand(view: Dict[str, Any]) -> HandView:
+    hand = Hand()
+    for card_data in view.get("hand", []):
+        hand.add(Card.from_dict(card_data))
+    return HandView(hand)
+
+
+def _valid_plays(view: Dict[str, Any], hand: HandView) -> List[Card]:
+    if not view.get("top_card"):
+        return list(hand)
+    current_color = view.get("current_color")
+    mask = playable_mask(
+        Card.from_dict(view["top_card"]),
+        CardColor[current_color] if current_color else None,
+    )
+    return [card for card in hand if mask >> card.code & 1]
+
+
+def _to_move(card: Optional[Card], chosen_color: Optional[CardColor]) -> BotMove:
+    if card is None:
+        return DRAW_MOVE
+    return {
+        "action": "play_card",
+        "card": card.to_dict(),
+        "chosen_color": chosen_color.name if chosen_color else None,
+    }
+
+
+class BotPolicy:
+    # Picks a move from the seat's get_player_view state. Policies run in
+    # worker processes, so they only see that dict and must return before
+    # the thread CPU clock (time.thread_time) passes the deadline.
+    name = ""
+
+    def choose_move(
+        self, view: Dict[str, Any], deadline: float, rng: random.Random
+    ) -> BotMove:
+        raise NotImplementedError
+
+
+class SimulatorBotPolicy(BotPolicy):
+    # Plays one of the simulator's single-move policies; ignores the budget
+    def __init__(self, policy: Policy):
+        self.policy = policy
+        self.name = policy.name
+
+    def choose_move(
+        self, view: Dict[str, Any], deadline: float, rng: random.Random
+    ) -> BotMove:
+        hand = _hand(view)
+        valid_plays = _valid_plays(view, hand)
+        if not valid_plays:
+            return DRAW_MOVE
+
+        card = self.policy.choose_card(valid_plays, hand, rng)
+        chosen_color = (
+            self.policy.choose_color(hand, rng) if card.type in WILD_TYPES else None
+        )
+        return _to_move(card, chosen_color)
+
+
+class RolloutBotPolicy(BotPolicy):
+    # Monte Carlo search: deals the unseen cards at random to the opponents
+    # and the deck, plays each candidate move out to the end with greedy
+    # players, and keeps the move that won most often before the deadline.
+    name = "rollout"
+    ROLLOUT_TURNS = 200
+
+    def __init__(self):
+        self.rollout_policy = GreedyPolicy()
+
+    def choose_move(
+        self, view: Dict[str, Any], deadline: float, rng: random.Random
+    ) -> BotMove:
+        candidates = self._candidates(view)
+        if len(candidates) == 1:
+            return _to_move(*candidates[0])
+
+        # Every candidate is played out against the same deal in each round,
+        # so differences in wins come from the move rather than the cards.
+        # A round cut short by the deadline is not counted.
+        wins = [0] * len(candidates)
+        while time.thread_time() < deadline:
+            deal_seed = rng.getrandbits(64)
+            round_wins = []
+            for candidate in candidates:
+                if time.thread_time() >= deadline:
+                    break
+                round_wins.append(
+                    self._rollout(view, candidate, random.Random(deal_seed))
+                )
+            if len(round_wins) == len(candidates):
+                wins = [total + won for total, won in zip(wins, round_wins)]
+
+        # Ties go to the earliest candidate, i.e. the greedy choice
+        best = max(range(len(candidates)), key=lambda index: wins[index])
+        return _to_move(*candidates[best])
+
+    def _candidates(self, view: Dict[str, Any]) -> List[Candidate]:
+        hand = _hand(view)
+        valid_plays = _valid_plays(view, hand)
+        if not valid_plays:
+            return [(None, None)]
+
+        greedy_card = self.rollout_policy.choose_card(valid_plays, hand, None)
+        candidates: List[Candidate] = []
+        for card in dict.fromkeys([greedy_card] + valid_plays):
+            if card.type in WILD_TYPES:
+                candidates.extend((card, color) for color in PLAYABLE_COLORS)
+            else:
+                candidates.append((card, None))
+        return candidates
+
+    def _rollout(
+        self, view: Dict[str, Any], candidate: Candidate, rng: random.Random
+    ) -> int:
+        game = self._determinize(view, rng)
+        player_id = view["current_player_id"]
+        card, chosen_color = candidate
+        if card is None:
+            game.draw_card(player_id)
+        else:
+            game.play_card(player_id, card, chosen_color)
+
+        policies = {player.player_id: self.rollout_policy for player in game.players}
+        play_out(game, policies, rng, self.ROLLOUT_TURNS)
+        winner = game.get_winner()
+        return int(winner is not None and winner.player_id == player_id)
+
+    def _determinize(self, view: Dict[str, Any], rng: random.Random) -> Game:
+        unseen = Counter(STANDARD_DECK_CODES)
+        unseen.subtract(Card.from_dict(card).code for card in view["hand"])
+        unseen[Card.from_dict(view["top_card"]).code] -= 1
+        codes = list(unseen.elements())
+        rng.shuffle(codes)
+
+        players = []
+        for player in view["players"]:
+            if player["id"] == view["current_player_id"]:
+                hand = view["hand"]
+            else:
+                hand = [CARDS[code].to_dict() for code in codes[: player["card_count"]]]
+                del codes[: player["card_count"]]
+            players.append(
+                {
+                    "player_id": player["id"],
+                    "name": player["name"],
+                    "hand": hand,
+                    "is_connected": True,
+                    "score": 0,
+                }
+            )
+
+        # Whatever is neither in a hand nor in the deck sits under the top card
+        deck = codes[: view["deck_count"]]
+        discard_pile = codes[view["deck_count"] :]
+        return Game.from_dict(
+            {
+                "game_id": view["game_id"],
+                "seed": rng.getrandbits(64),
+                "players": players,
+                "deck": {"cards": [CARDS[code].to_dict() for code in deck]},
+                "discard_pile": [CARDS[code].to_dict() for code in discard_pile]
+                + [view["top_card"]],
+                "current_player_index": view["current_player_index"],
+                "direction_clockwise": view["direction_clockwise"],
+                "state": GameState.PLAYING.name,
+                "current_color": view["current_color"],
+            }
+        )
+
+
+BOT_POLICIES: Dict[str, Callable[[], BotPolicy]] = {
+    RandomPolicy.name: partial(SimulatorBotPolicy, RandomPolicy()),
+    FirstPlayablePolicy.name: partial(SimulatorBotPolicy, FirstPlayablePolicy()),
+    GreedyPolicy.name: partial(SimulatorBotPolicy, GreedyPolicy()),
+    RolloutBotPolicy.name: RolloutBotPolicy,
+}
+# Searching has not beaten greedy play under these rules in self-play yet, so
+# the cheap policy is the default and ignores the move budget. The budget only
+# buys search for bots added with ADD_BOT {"policy": "rollout"}.
+DEFAULT_BOT_POLICY = GreedyPolicy.name
+
+
+def evaluate_move(
+    policy_name: str, view: Dict[str, Any], budget: float, seed: int
+) -> BotMove:
+    # Runs in a pool worker; the budget counts this thread's CPU time only
+    deadline = time.thread_time() + budget
+    return BOT_POLICIES[policy_name]().choose_move(view, deadline, random.Random(seed))
+
+
+def fallback_move(view: Dict[str, Any]) -> BotMove:
+    return BOT_POLICIES[FirstPlayablePolicy.name]().choose_move(
+        view, 0.0, random.Random()
+    )
+
+
+class BotPool:
+    # Evaluates bot moves off the event loop. workers=0 uses a single thread
+    # instead of processes, for hosts that cannot fork (e.g. daemon shards).
+    # Nothing starts until the first bot move.
+    def __init__(self, workers: int = 1, budget: float = 0.05, grace: float = 1.0):
+        self.workers = workers
+        self.budget = budget
+        self.grace = grace
+        self._executor: Optional[Executor] = None
+        self._rng = random.Random()
+        self.moves = 0
+        self.fallbacks = 0
+        self.total_think_time = 0.0
+        self.max_think_time = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = (
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="uno-bot")
+                if self.workers == 0
+                else ProcessPoolExecutor(max_workers=self.workers)
+            )
+        return self._executor
+
+    async def choose_move(self, policy_name: str, view: Dict[str, Any]) -> BotMove:
+        started_at = time.monotonic()
+        try:
+            move = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(),
+                    evaluate_move,
+                    policy_name,
+                    view,
+                    self.budget,
+                    self._rng.getrandbits(64),
+                ),
+                timeout=self.budget + self.grace,
+            )
+        except Exception as e:
+            # A saturated or crashed pool must not stall the room: play the
+            # cheap fallback here instead
+            if isinstance(e, BrokenProcessPool):
+                self._executor = None
+            self.fallbacks += 1
+            move = fallback_move(view)
+
+        elapsed = time.monotonic() - started_at
+        self.moves += 1
+        self.total_think_time += elapsed
+        self.max_think_time = max(self.max_think_time, elapsed)
+        return move
+
+    def get_metrics(self) -> Dict[str, Any]:
+        moves = self.moves or 1
+        return {
+            "moves": self.moves,
+            "fallbacks": self.fallbacks,
+            "avg_think_ms": self.total_think_time / moves * 1000,
+            "max_think_ms": self.max_think_time * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
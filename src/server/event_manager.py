@@ -1,19 +1,45 @@
 from collections import defaultdict
-from typing import Callable, Dict, List, Any
+from enum import Enum, auto
+from functools import partial
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 import asyncio
+from server.logger import server_logger
+
+
+class HandlerKind(Enum):
+    ASYNC = auto()  # Coroutine function, awaited on the event loop
+    SYNC = auto()  # Plain function, called inline
+    BLOCKING = auto()  # Plain function that may block, run in the default executor
 
 
 class EventManager:
     def __init__(self):
-        self._handlers: Dict[str, List[Callable[..., Any]]] = defaultdict(list)
+        self._handlers: Dict[str, List[Tuple[Callable[..., Any], HandlerKind]]] = (
+            defaultdict(list)
+        )
+        self._background_tasks: Set[asyncio.Task] = set()
 
-    def on(self, event: str, handler: Callable[..., Any]) -> None:
-        self._handlers[event].append(handler)
+    def on(
+        self, event: str, handler: Callable[..., Any], blocking: bool = False
+    ) -> None:
+        if asyncio.iscoroutinefunction(handler):
+            kind = HandlerKind.ASYNC
+        elif blocking:
+            kind = HandlerKind.BLOCKING
+        else:
+            kind = HandlerKind.SYNC
+        self._handlers[event].append((handler, kind))
 
     def off(self, event: str, handler: Callable[..., Any]) -> None:
         if event in self._handlers:
-            self._handlers[event].remove(handler)
-            if not self._handlers[event]:
+            handlers = self._handlers[event]
+            for index, (registered, _) in enumerate(handlers):
+                if registered == handler:
+                    del handlers[index]
+                    break
+            else:
+                raise ValueError(f"Handler not registered for event: {event}")
+            if not handlers:
                 del self._handlers[event]
 
     def clear(self, event: str = None) -> None:
@@ -22,24 +48,81 @@ class EventManager:
         else:
             self._handlers.clear()
 
-    async def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
-        if event not in self._handlers:
-            return
+    async def emit(self, event: str, *args: Any, **kwargs: Any) -> List[Any]:
+        handlers = self._handlers.get(event)
+        if not handlers:
+            return []
 
         results = []
-        for handler in self._handlers[event]:
-            if asyncio.iscoroutinefunction(handler):
+        # Iterate over a snapshot so handlers may register or remove listeners
+        for handler, kind in tuple(handlers):
+            if kind is HandlerKind.ASYNC:
                 result = await handler(*args, **kwargs)
+            elif kind is HandlerKind.SYNC:
+                result = handler(*args, **kwargs)
             else:
-                if asyncio.get_event_loop().is_running():
-                    result = await asyncio.get_event_loop().run_in_executor(
-                        None, handler, *args, **dict(kwargs)
-                    )
-                else:
-                    result = handler(*args, **kwargs)
+                result = await asyncio.get_running_loop().run_in_executor(
+                    None, partial(handler, *args, **kwargs)
+                )
             results.append(result)
 
-        return results if results else None
+        return results
+
+    async def emit_concurrent(
+        self,
+        event: str,
+        *args: Any,
+        handler_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        handlers = self._handlers.get(event)
+        if not handlers:
+            return []
+
+        # Each slot holds the handler's result, or the exception it raised,
+        # which is logged here so no caller can lose it
+        results = await asyncio.gather(
+            *(
+                self._run_isolated(handler, kind, handler_timeout, args, kwargs)
+                for handler, kind in tuple(handlers)
+            )
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                server_logger.log_error(f"Handler for '{event}' failed: {result!r}")
+        return results
+
+    def emit_nowait(self, event: str, *args: Any, **kwargs: Any) -> None:
+        if not self._handlers.get(event):
+            return
+
+        task = asyncio.get_running_loop().create_task(
+            self.emit_concurrent(event, *args, **kwargs)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _run_isolated(
+        self,
+        handler: Callable[..., Any],
+        kind: HandlerKind,
+        timeout: Optional[float],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        try:
+            if kind is HandlerKind.ASYNC:
+                return await asyncio.wait_for(handler(*args, **kwargs), timeout)
+            if kind is HandlerKind.SYNC:
+                return handler(*args, **kwargs)
+            return await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(
+                    None, partial(handler, *args, **kwargs)
+                ),
+                timeout,
+            )
+        except Exception as e:
+            return e
 
     def has_listeners(self, event: str) -> bool:
         return bool(self._handlers.get(event))
@@ -1,26 +1,115 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set, Tuple
+from uuid import uuid4
 import asyncio
 from server.event_manager import EventManager
 from server.websocket_server import WebSocketServer
+from server.lobby_broadcaster import LobbyBroadcaster
+from server.room_index import RoomIndex
+from server.rate_limiter import RateLimitConfig
+from server.room_store import RoomStore
+from server.bots import BOT_POLICIES, DEFAULT_BOT_POLICY, BotPool
+from common.binary_codec import DEFAULT_WIRE_FORMAT
+from common.compression import CompressionConfig
+from common.chat_history import (
+    CHAT_BACKFILL_SIZE,
+    CHAT_PAGE_SIZE,
+    MAX_CHAT_LENGTH,
+    pack_chat_page,
+)
 from common.game_room import GameRoom
-from common.game import Player
+from common.game import GameState, Player
 from common.network_protocol import MessageType
+from common.state_delta import diff_public_state, diff_hand
 
 
 class GameServer:
-    def __init__(self, host: str, port: int):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        shard_id: Optional[str] = None,
+        bot_workers: int = 1,
+        bot_budget: float = 0.05,
+        compression: Optional[CompressionConfig] = None,
+        rate_limit: Optional[RateLimitConfig] = None,
+        store: Optional[RoomStore] = None,
+        resume_grace: float = 30.0,
+        wire_format: str = DEFAULT_WIRE_FORMAT,
+    ):
+        self.shard_id = shard_id
         self.event_manager = EventManager()
-        self.ws_server = WebSocketServer(host, port, self.event_manager)
+        self.ws_server = WebSocketServer(
+            host,
+            port,
+            self.event_manager,
+            compression=compression,
+            rate_limit=rate_limit,
+            resume_grace=resume_grace,
+            wire_format=wire_format,
+        )
+        self.room_index = RoomIndex()
+        self.lobby = LobbyBroadcaster(self.ws_server, self.room_index.get)
         self.active_rooms: Dict[str, GameRoom] = {}
         self.player_room_map: Dict[str, str] = {}
+        self._room_versions: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._player_versions: Dict[str, Tuple[int, List[Dict[str, Any]]]] = {}
+        self.bots = BotPool(workers=bot_workers, budget=bot_budget)
+        self._bot_seats: Dict[str, Dict[str, str]] = {}  # room -> player -> policy
+        self._bot_turns: Dict[str, asyncio.Task] = {}
+        self._suspended_players: Set[str] = set()
+        self.store = store
         self._setup_event_handlers()
 
     async def start(self):
+        if self.store:
+            self._recover_rooms()
         await self.ws_server.start()
 
     async def stop(self):
+        if self.store:
+            # Shutting down is not everyone leaving: keep the rooms as they are
+            store, self.store = self.store, None
+            await store.close()
+        for task in self._bot_turns.values():
+            task.cancel()
+        self.bots.shutdown()
+        await self.lobby.stop()
         await self.ws_server.stop()
 
+    def _recover_rooms(self) -> None:
+        # Nobody is connected after a restart; seated players get their seat
+        # back by joining the room again
+        for recovered in self.store.load():
+            room = GameRoom(room_id=recovered.room_id, event_manager=self.event_manager)
+            room.game = recovered.game
+            for player in room.game.players:
+                if not player.is_bot:
+                    player.is_connected = False
+            self.active_rooms[room.room_id] = room
+            if recovered.bot_seats:
+                self._bot_seats[room.room_id] = recovered.bot_seats
+            self._room_changed(room.room_id)
+        if self.active_rooms:
+            print(f"Recovered {len(self.active_rooms)} rooms")
+
+    def _persist(self, room: GameRoom) -> None:
+        if self.store:
+            self.store.record(
+                room.room_id, room.game, self._bot_seats.get(room.room_id, {})
+            )
+
+    def _persist_bot_seat(
+        self, room: GameRoom, player_id: str, policy: Optional[str]
+    ) -> None:
+        if self.store:
+            self.store.record_bot_seat(
+                room.room_id,
+                room.game,
+                self._bot_seats.get(room.room_id, {}),
+                player_id,
+                policy,
+            )
+
     def _setup_event_handlers(self):
         self.event_manager.on(
             f"message_{MessageType.CREATE_ROOM.name}", self._handle_create_room
@@ -43,10 +132,28 @@ class GameServer:
         self.event_manager.on(
             f"message_{MessageType.CHAT_MESSAGE.name}", self._handle_chat_message
         )
+        self.event_manager.on(
+            f"message_{MessageType.CHAT_HISTORY.name}", self._handle_chat_history
+        )
         self.event_manager.on(
             f"message_{MessageType.LIST_ROOMS.name}", self._handle_list_rooms
         )
+        self.event_manager.on(
+            f"message_{MessageType.SYNC_STATE.name}", self._handle_sync_state
+        )
+        self.event_manager.on(
+            f"message_{MessageType.SUBSCRIBE_LOBBY.name}", self._handle_subscribe_lobby
+        )
+        self.event_manager.on(
+            f"message_{MessageType.UNSUBSCRIBE_LOBBY.name}",
+            self._handle_unsubscribe_lobby,
+        )
+        self.event_manager.on(
+            f"message_{MessageType.ADD_BOT.name}", self._handle_add_bot
+        )
         self.event_manager.on("player_disconnected", self._handle_player_disconnect)
+        self.event_manager.on("player_suspended", self._handle_player_suspended)
+        self.event_manager.on("player_resumed", self._handle_player_resumed)
         self.event_manager.on("room_update", self._handle_room_update)
         self.event_manager.on("game_update", self._handle_game_update)
         self.event_manager.on("game_started", self._handle_game_started)
@@ -59,15 +166,16 @@ class GameServer:
         if not player_id:
             return
 
-        room = GameRoom(event_manager=self.event_manager)
+        room = GameRoom(room_id=self._new_room_id(), event_manager=self.event_manager)
         self.active_rooms[room.room_id] = room
 
         client_session = self.ws_server.clients.get(client_id)
         if client_session:
             player = Player(player_id, client_session.name)
-            if await room.add_player(player):
+            if await room.run_serialized(room.add_player, player):
                 self.player_room_map[player_id] = room.room_id
                 self.ws_server.add_to_room(client_id, room.room_id)
+                self._player_versions.pop(player_id, None)
 
                 await self.ws_server.send_to_client(
                     client_id,
@@ -77,7 +185,12 @@ class GameServer:
                         "state": room.get_player_state(player_id)["state"],
                     },
                 )
-                await self._broadcast_room_list()
+                self._room_changed(room.room_id)
+
+    def _new_room_id(self) -> str:
+        # Sharded servers prefix room IDs so the router can locate the owning shard
+        room_id = str(uuid4())
+        return f"{self.shard_id}-{room_id}" if self.shard_id else room_id
 
     async def _handle_join_room(self, client_id: str, message: dict):
         room_id = message.get("room_id")
@@ -95,9 +208,12 @@ class GameServer:
 
         if client_session:
             player = Player(player_id, client_session.name)
-            if await room.add_player(player):
+            if await self._reclaim_seat(room, player_id) or (
+                await room.run_serialized(room.add_player, player)
+            ):
                 self.player_room_map[player_id] = room.room_id
                 self.ws_server.add_to_room(client_id, room.room_id)
+                self._player_versions.pop(player_id, None)
 
                 await self.ws_server.send_to_client(
                     client_id,
@@ -107,39 +223,61 @@ class GameServer:
                         "state": room.get_player_state(player_id)["state"],
                     },
                 )
-                await self._broadcast_room_list()
+                if room.chat_history:
+                    await self.ws_server.send_to_client(
+                        client_id,
+                        self._chat_history_message(room, limit=CHAT_BACKFILL_SIZE),
+                    )
+                self._room_changed(room.room_id)
+                # Bots in a recovered game wait for someone to watch them
+                self._schedule_bot_turn(room)
             else:
                 await self.ws_server.send_to_client(
                     client_id,
                     {"type": MessageType.ERROR.name, "message": "Room is full"},
                 )
 
+    async def _reclaim_seat(self, room: GameRoom, player_id: str) -> bool:
+        # A seated player nobody is connected as takes the seat back
+        if not room.get_player(player_id) or any(
+            seated == player_id for _, seated in self._room_players(room.room_id)
+        ):
+            return False
+        # Off the bot before the room update goes out, so no bot turn starts
+        if self._bot_seats.get(room.room_id, {}).pop(player_id, None):
+            self._persist_bot_seat(room, player_id, None)
+            # The room update below schedules whichever bot is next
+            bot_turn = self._bot_turns.pop(room.room_id, None)
+            if bot_turn:
+                bot_turn.cancel()
+        return await room.run_serialized(room.reclaim_seat, player_id)
+
     async def _handle_leave_room(self, client_id: str, message: dict):
         room_id = message.get("room_id")
         player_id = message.get("player_id")
 
         if room_id in self.active_rooms and player_id:
             room = self.active_rooms[room_id]
-            await room.remove_player(player_id)
+            await self._vacate_seat(room, player_id)
             self.ws_server.remove_from_room(client_id)
             self.player_room_map.pop(player_id, None)
+            self._player_versions.pop(player_id, None)
 
             await self.ws_server.send_to_client(
                 client_id, {"type": MessageType.ROOM_LEFT.name, "room_id": room_id}
             )
 
-            if room.player_count == 0:
+            if not room.has_humans:
                 await self._handle_room_closed({"room_id": room_id})
-            await self._broadcast_room_list()
+            self._room_changed(room_id)
 
     async def _handle_start_game(self, client_id: str, message: dict):
         room_id = message.get("room_id")
         if room_id in self.active_rooms:
             room = self.active_rooms[room_id]
-            if await room.start_game():
+            if await room.run_serialized(room.start_game):
                 # Game started successfully - notification will be handled by room events
-                await self._broadcast_room_list()
-                pass
+                self._room_changed(room_id)
             else:
                 await self.ws_server.send_to_client(
                     client_id,
@@ -157,7 +295,7 @@ class GameServer:
 
         if room_id in self.active_rooms and player_id:
             room = self.active_rooms[room_id]
-            success = await room.handle_player_action(
+            success = await room.submit_action(
                 player_id, "play_card", {"card": card, "chosen_color": chosen_color}
             )
 
@@ -173,7 +311,7 @@ class GameServer:
 
         if room_id in self.active_rooms and player_id:
             room = self.active_rooms[room_id]
-            await room.handle_player_action(player_id, "draw_card", {})
+            await room.submit_action(player_id, "draw_card", {})
 
     async def _handle_chat_message(self, client_id: str, message: dict):
         room_id = message.get("room_id")
@@ -181,24 +319,195 @@ class GameServer:
         content = message.get("content")
 
         if room_id in self.active_rooms and player_id and content:
+            if len(content) > MAX_CHAT_LENGTH:
+                await self.ws_server.send_to_client(
+                    client_id,
+                    {
+                        "type": MessageType.ERROR.name,
+                        "message": "Chat message too long",
+                    },
+                )
+                return
             room = self.active_rooms[room_id]
             client_session = self.ws_server.clients.get(client_id)
             if client_session:
                 await room.add_chat_message(player_id, client_session.name, content)
 
+    async def _handle_chat_history(self, client_id: str, message: dict):
+        room_id = message.get("room_id")
+        client_session = self.ws_server.clients.get(client_id)
+        if (
+            room_id not in self.active_rooms
+            or not client_session
+            or client_session.room_id != room_id
+        ):
+            return
+
+        try:
+            history = self._chat_history_message(
+                self.active_rooms[room_id],
+                cursor=message.get("cursor"),
+                limit=int(message.get("limit", CHAT_PAGE_SIZE)),
+            )
+        except (TypeError, ValueError) as e:
+            await self.ws_server.send_to_client(
+                client_id, {"type": MessageType.ERROR.name, "message": str(e)}
+            )
+            return
+        await self.ws_server.send_to_client(client_id, history)
+
+    def _chat_history_message(
+        self,
+        room: GameRoom,
+        cursor: Optional[str] = None,
+        limit: int = CHAT_PAGE_SIZE,
+    ) -> Dict[str, Any]:
+        messages, next_cursor = room.chat_history.page(cursor, limit)
+        return {
+            "type": MessageType.CHAT_HISTORY.name,
+            "room_id": room.room_id,
+            **pack_chat_page(messages),
+            "next_cursor": next_cursor,
+        }
+
     async def _handle_player_disconnect(self, player_id: str, room_id: str):
+        self._player_versions.pop(player_id, None)
+        # A suspended player's room was told when the connection dropped
+        was_suspended = player_id in self._suspended_players
+        self._suspended_players.discard(player_id)
         if room_id in self.active_rooms:
             room = self.active_rooms[room_id]
-            await room.remove_player(player_id)
+            await self._vacate_seat(room, player_id)
+            self._room_changed(room_id)
 
-            await self.ws_server.broadcast_to_room(
-                room_id,
+            if not was_suspended:
+                await self._broadcast_connection(
+                    MessageType.PLAYER_DISCONNECTED, room_id, player_id
+                )
+            if not room.has_humans:
+                await self._handle_room_closed({"room_id": room_id})
+
+    async def _handle_player_suspended(self, player_id: str, room_id: str):
+        # The seat is held for the resume grace period; until then the player
+        # only shows as disconnected
+        if room_id in self.active_rooms:
+            self._suspended_players.add(player_id)
+            room = self.active_rooms[room_id]
+            await room.run_serialized(room.set_connected, player_id, False)
+            await self._broadcast_connection(
+                MessageType.PLAYER_DISCONNECTED, room_id, player_id
+            )
+
+    async def _handle_player_resumed(
+        self, player_id: str, room_id: str, previous_client_id: str, client_id: str
+    ):
+        if previous_client_id in self.lobby.subscribers:
+            self.lobby.unsubscribe(previous_client_id)
+            self.lobby.subscribers.add(client_id)
+        self._suspended_players.discard(player_id)
+        if room_id in self.active_rooms:
+            room = self.active_rooms[room_id]
+            await room.run_serialized(room.set_connected, player_id, True)
+            await self._broadcast_connection(
+                MessageType.PLAYER_RECONNECTED, room_id, player_id
+            )
+
+    async def _broadcast_connection(
+        self, message_type: MessageType, room_id: str, player_id: str
+    ) -> None:
+        await self.ws_server.broadcast_to_room(
+            room_id,
+            {"type": message_type.name, "room_id": room_id, "player_id": player_id},
+        )
+
+    async def _vacate_seat(self, room: GameRoom, player_id: str) -> None:
+        # A game in progress would stall on the empty seat, so a bot takes it
+        if await room.run_serialized(room.replace_with_bot, player_id):
+            self._bot_seats.setdefault(room.room_id, {})[player_id] = (
+                DEFAULT_BOT_POLICY
+            )
+            self._persist_bot_seat(room, player_id, DEFAULT_BOT_POLICY)
+            self._schedule_bot_turn(room)
+        else:
+            await room.run_serialized(room.remove_player, player_id)
+
+    async def _handle_add_bot(self, client_id: str, message: dict):
+        room_id = message.get("room_id")
+        policy = message.get("policy") or DEFAULT_BOT_POLICY
+        client_session = self.ws_server.clients.get(client_id)
+        if (
+            room_id not in self.active_rooms
+            or not client_session
+            or client_session.room_id != room_id
+        ):
+            await self.ws_server.send_to_client(
+                client_id,
+                {"type": MessageType.ERROR.name, "message": "Invalid room ID"},
+            )
+            return
+        if policy not in BOT_POLICIES:
+            await self.ws_server.send_to_client(
+                client_id,
                 {
-                    "type": MessageType.PLAYER_DISCONNECTED.name,
-                    "room_id": room_id,
-                    "player_id": player_id,
+                    "type": MessageType.ERROR.name,
+                    "message": f"Unknown bot policy: {policy}",
                 },
             )
+            return
+
+        room = self.active_rooms[room_id]
+        bots = self._bot_seats.setdefault(room_id, {})
+        bot = Player(f"bot-{uuid4()}", f"Bot {len(bots) + 1} ({policy})")
+        bot.is_bot = True
+        if await room.run_serialized(room.add_player, bot):
+            bots[bot.player_id] = policy
+            self._persist_bot_seat(room, bot.player_id, policy)
+            self._room_changed(room_id)
+        else:
+            await self.ws_server.send_to_client(
+                client_id,
+                {"type": MessageType.ERROR.name, "message": "Cannot add bot"},
+            )
+
+    def _schedule_bot_turn(self, room: GameRoom) -> None:
+        # Bots only play while someone is watching the room
+        game = room.game
+        bot_seats = self._bot_seats.get(room.room_id, {})
+        if (
+            game.state != GameState.PLAYING
+            or room.room_id in self._bot_turns
+            or game.current_player.player_id not in bot_seats
+            or not self.ws_server.room_clients.get(room.room_id)
+        ):
+            return
+        self._bot_turns[room.room_id] = asyncio.create_task(
+            self._play_bot_turn(room, game.current_player.player_id)
+        )
+
+    async def _play_bot_turn(self, room: GameRoom, player_id: str) -> None:
+        try:
+            policy = self._bot_seats.get(room.room_id, {}).get(player_id)
+            if policy is None:
+                return
+            move = await self.bots.choose_move(
+                policy, room.game.get_player_view(player_id)
+            )
+            await room.run_serialized(self._apply_bot_move, room, player_id, move)
+        finally:
+            if self._bot_turns.get(room.room_id) is asyncio.current_task():
+                del self._bot_turns[room.room_id]
+        self._schedule_bot_turn(room)
+
+    async def _apply_bot_move(
+        self, room: GameRoom, player_id: str, move: Dict[str, Any]
+    ) -> bool:
+        # The player may have taken the seat back while the bot was thinking
+        if player_id not in self._bot_seats.get(room.room_id, {}):
+            return False
+        if not await room.handle_player_action(player_id, move["action"], move):
+            # Drawing is always legal on the bot's own turn
+            await room.handle_player_action(player_id, "draw_card", {})
+        return True
 
     async def _handle_room_update(self, data: dict):
         room_id = data["room_id"]
@@ -206,20 +515,108 @@ class GameServer:
             return
 
         room = self.active_rooms[room_id]
-        room_clients = self.ws_server.room_clients.get(room_id, set())
+        self._persist(room)
+        base_seq, seq, public_state, public_delta = self._advance_room_version(room)
+        delta_fragments: Dict[str, Dict[str, Any]] = {}
+        snapshot_fragments: Dict[str, Dict[str, Any]] = {}
+
+        for client_id, player_id in self._room_players(room_id):
+            hand = room.get_player_hand(player_id)
+            baseline = self._player_versions.get(player_id)
+            self._player_versions[player_id] = (seq, hand)
+
+            if public_delta is not None and baseline and baseline[0] == base_seq:
+                hand_added, hand_removed = diff_hand(baseline[1], hand)
+                delta_fragments[client_id] = {
+                    "hand_added": hand_added,
+                    "hand_removed": hand_removed,
+                }
+            else:
+                snapshot_fragments[client_id] = {"your_hand": hand}
+
+        if delta_fragments:
+            await self.ws_server.send_personalized(
+                {
+                    "type": MessageType.GAME_STATE_DELTA.name,
+                    "room_id": room_id,
+                    "seq": seq,
+                    "base_seq": base_seq,
+                    **public_delta,
+                },
+                delta_fragments,
+            )
+        if snapshot_fragments:
+            await self.ws_server.send_personalized(
+                {
+                    "type": MessageType.GAME_STATE.name,
+                    "room_id": room_id,
+                    "seq": seq,
+                    "state": public_state,
+                },
+                snapshot_fragments,
+                into="state",
+            )
+        self._schedule_bot_turn(room)
+
+    async def _handle_sync_state(self, client_id: str, message: dict):
+        room_id = message.get("room_id")
+        client_session = self.ws_server.clients.get(client_id)
+        if (
+            room_id not in self.active_rooms
+            or not client_session
+            or client_session.room_id != room_id
+        ):
+            return
+
+        room = self.active_rooms[room_id]
+        if room_id not in self._room_versions:
+            self._advance_room_version(room)
+        seq, public_state = self._room_versions[room_id]
+        hand = room.get_player_hand(client_session.player_id)
+        self._player_versions[client_session.player_id] = (seq, hand)
+
+        await self.ws_server.send_to_client(
+            client_id,
+            {
+                "type": MessageType.GAME_STATE.name,
+                "room_id": room_id,
+                "seq": seq,
+                "state": {**public_state, "your_hand": hand},
+            },
+        )
+
+    def _advance_room_version(
+        self, room: GameRoom
+    ) -> Tuple[int, int, Dict[str, Any], Optional[Dict[str, Any]]]:
+        base_seq, previous_state = self._room_versions.get(room.room_id, (0, None))
+        public_state = room.get_game_state()
+        seq = base_seq + 1
+        self._room_versions[room.room_id] = (seq, public_state)
+
+        public_delta = (
+            diff_public_state(previous_state, public_state)
+            if previous_state is not None
+            else None
+        )
+        return base_seq, seq, public_state, public_delta
 
-        for client_id in room_clients:
+    def _room_players(self, room_id: str) -> List[Tuple[str, str]]:
+        room_players = []
+        for client_id in self.ws_server.room_clients.get(room_id, set()):
             client_session = self.ws_server.clients.get(client_id)
             if client_session and client_session.player_id:
-                player_state = room.get_player_state(client_session.player_id)
-                await self.ws_server.send_to_client(
-                    client_id,
-                    {
-                        "type": MessageType.GAME_STATE.name,
-                        "room_id": room_id,
-                        "state": player_state["state"],
-                    },
-                )
+                room_players.append((client_id, client_session.player_id))
+        return room_players
+
+    def _snapshot_fragments(
+        self, room: GameRoom, seq: int
+    ) -> Dict[str, Dict[str, Any]]:
+        fragments = {}
+        for client_id, player_id in self._room_players(room.room_id):
+            hand = room.get_player_hand(player_id)
+            self._player_versions[player_id] = (seq, hand)
+            fragments[client_id] = {"your_hand": hand}
+        return fragments
 
     async def _handle_game_update(self, data: dict):
         await self._handle_room_update(data)
@@ -245,73 +642,150 @@ class GameServer:
             await self.ws_server.broadcast_to_room(
                 room_id, {"type": MessageType.ROOM_CLOSED.name, "room_id": room_id}
             )
-            del self.active_rooms[room_id]
+            self.active_rooms.pop(room_id).stop()
+            self._room_versions.pop(room_id, None)
+            self._bot_seats.pop(room_id, None)
+            if self.store:
+                self.store.drop(room_id)
+            bot_turn = self._bot_turns.pop(room_id, None)
+            if bot_turn and bot_turn is not asyncio.current_task():
+                bot_turn.cancel()
             # Clean up player mappings
             self.player_room_map = {
                 pid: rid for pid, rid in self.player_room_map.items() if rid != room_id
             }
-        await self._broadcast_room_list()
+        self._room_changed(room_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.ws_server.get_metrics(),
+            "bots": self.bots.get_metrics(),
+            **({"store": self.store.get_metrics()} if self.store else {}),
+            "rooms": {
+                room_id: room.get_metrics()
+                for room_id, room in self.active_rooms.items()
+            },
+        }
 
     def get_room_list(self) -> List[Dict[str, Any]]:
-        return [
-            {
-                "room_id": room_id,
-                "player_count": room.player_count,
-                "max_players": room.game.MAX_PLAYERS,
-                "state": room.game.state.name,
-            }
-            for room_id, room in self.active_rooms.items()
-        ]
+        return list(self.room_index)
+
+    def _room_changed(self, room_id: str) -> None:
+        info = self._room_info(room_id)
+        if info:
+            self.room_index.update(info)
+        else:
+            self.room_index.remove(room_id)
+        self.lobby.mark_dirty(room_id)
+
+    def _room_info(self, room_id: str) -> Optional[Dict[str, Any]]:
+        room = self.active_rooms.get(room_id)
+        if not room:
+            return None
+        return {
+            "room_id": room_id,
+            "player_count": room.player_count,
+            "max_players": room.game.MAX_PLAYERS,
+            "state": room.game.state.name,
+        }
+
+    async def _handle_list_rooms(self, client_id: str, message: dict):
+        try:
+            query = self._room_query(message)
+            room_list, next_cursor = self.room_index.query(**query)
+        except (TypeError, ValueError) as e:
+            error = {"type": MessageType.ERROR.name, "message": str(e)}
+            if "request_id" in message:
+                # Ends the router's wait for this shard's page
+                error["request_id"] = message["request_id"]
+            await self.ws_server.send_to_client(client_id, error, coalesce=False)
+            return
 
-    async def _handle_list_rooms(self, client_id: str, _: dict):
-        room_list = self.get_room_list()
-        await self.ws_server.send_to_client(
-            client_id, {"type": MessageType.ROOM_LIST.name, "rooms": room_list}
+        reply = {
+            "type": MessageType.ROOM_PAGE.name,
+            "rooms": room_list,
+            "next_cursor": next_cursor,
+        }
+        if "request_id" in message:
+            # The shard router merges the pages of all shards by these keys
+            reply["request_id"] = message["request_id"]
+            reply["keys"] = [
+                self.room_index.cursor(room["room_id"], query["sort"])
+                for room in room_list
+            ]
+        # A page answers its own query: it must not replace lobby updates
+        await self.ws_server.send_to_client(client_id, reply, coalesce=False)
+
+    @staticmethod
+    def _room_query(message: dict) -> Dict[str, Any]:
+        # Checked rather than coerced: bool("false") would filter the wrong way
+        query = {
+            "state": message.get("state"),
+            "has_free_seat": message.get("has_free_seat"),
+            "sort": message.get("sort", "created"),
+            "descending": message.get("descending", False),
+            "cursor": message.get("cursor"),
+            "limit": message.get("limit", 50),
+        }
+        state = query["state"]
+        if state is not None and (
+            not isinstance(state, str) or state not in GameState.__members__
+        ):
+            raise ValueError(f"Invalid state: {state}")
+        if query["has_free_seat"] is not None and not isinstance(
+            query["has_free_seat"], bool
+        ):
+            raise ValueError("has_free_seat must be true or false")
+        if not isinstance(query["descending"], bool):
+            raise ValueError("descending must be true or false")
+        if not isinstance(query["sort"], str):
+            raise ValueError(f"Invalid sort field: {query['sort']}")
+        if isinstance(query["limit"], bool) or not isinstance(query["limit"], int):
+            raise ValueError("Limit must be an integer")
+        return query
+
+    async def _handle_subscribe_lobby(self, client_id: str, message: dict):
+        await self.lobby.subscribe(
+            client_id, self.get_room_list(), message.get("request_id")
         )
 
-    async def _broadcast_room_list(self):
-        room_list = self.get_room_list()
-        await self.ws_server.broadcast_to_all(
-            {"type": MessageType.ROOM_LIST.name, "rooms": room_list}
-        )
+    async def _handle_unsubscribe_lobby(self, client_id: str, _: dict):
+        self.lobby.unsubscribe(client_id)
 
     async def _handle_game_started(self, data: dict):
         room_id = data["room_id"]
         if room_id in self.active_rooms:
             room = self.active_rooms[room_id]
-            room_clients = self.ws_server.room_clients.get(room_id, set())
-
-            for client_id in room_clients:
-                client_session = self.ws_server.clients.get(client_id)
-                if client_session and client_session.player_id:
-                    player_state = room.get_player_state(client_session.player_id)
-                    await self.ws_server.send_to_client(
-                        client_id,
-                        {
-                            "type": MessageType.GAME_STARTED.name,
-                            "room_id": room_id,
-                            "state": player_state["state"],
-                        },
-                    )
-            await self._broadcast_room_list()
+            self._persist(room)
+            _, seq, public_state, _ = self._advance_room_version(room)
+            await self.ws_server.send_personalized(
+                {
+                    "type": MessageType.GAME_STARTED.name,
+                    "room_id": room_id,
+                    "seq": seq,
+                    "state": public_state,
+                },
+                self._snapshot_fragments(room, seq),
+                into="state",
+            )
+            self._room_changed(room_id)
+            self._schedule_bot_turn(room)
 
     async def _handle_game_ended(self, data: dict):
         room_id = data["room_id"]
         if room_id in self.active_rooms:
             room = self.active_rooms[room_id]
-            room_clients = self.ws_server.room_clients.get(room_id, set())
-
-            for client_id in room_clients:
-                client_session = self.ws_server.clients.get(client_id)
-                if client_session and client_session.player_id:
-                    player_state = room.get_player_state(client_session.player_id)
-                    await self.ws_server.send_to_client(
-                        client_id,
-                        {
-                            "type": MessageType.GAME_END.name,
-                            "room_id": room_id,
-                            "state": player_state["state"],
-                            "winner_id": data.get("winner_id"),
-                        },
-                    )
-            await self._broadcast_room_list()
+            self._persist(room)
+            _, seq, public_state, _ = self._advance_room_version(room)
+            await self.ws_server.send_personalized(
+                {
+                    "type": MessageType.GAME_END.name,
+                    "room_id": room_id,
+                    "seq": seq,
+                    "winner_id": data.get("winner_id"),
+                    "state": public_state,
+                },
+                self._snapshot_fragments(room, seq),
+                into="state",
+            )
+            self._room_changed(room_id)
@@ -0,0 +1,87 @@
+from typing import Callable, Dict, List, Optional, Set, Any
+import asyncio
+from common.network_protocol import MessageType
+from server.websocket_server import WebSocketServer
+
+
+class LobbyBroadcaster:
+    def __init__(
+        self,
+        ws_server: WebSocketServer,
+        room_info: Callable[[str], Optional[Dict[str, Any]]],
+        interval: float = 0.2,
+    ):
+        self.ws_server = ws_server
+        self.interval = interval
+        self.subscribers: Set[str] = set()
+        self._room_info = room_info
+        self._published: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def subscribe(
+        self,
+        client_id: str,
+        rooms: List[Dict[str, Any]],
+        request_id: Optional[int] = None,
+    ) -> None:
+        self.subscribers.add(client_id)
+        message = {"type": MessageType.ROOM_LIST.name, "rooms": rooms}
+        if request_id is not None:
+            message["request_id"] = request_id
+        # A later snapshot replaces this one, unless the router waits for it
+        await self.ws_server.send_to_client(
+            client_id, message, coalesce=request_id is None
+        )
+
+    def unsubscribe(self, client_id: str) -> None:
+        self.subscribers.discard(client_id)
+
+    def mark_dirty(self, room_id: str) -> None:
+        self._dirty.add(room_id)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    async def _flush_later(self) -> None:
+        # Changes arriving within one interval are coalesced into a single delta
+        await asyncio.sleep(self.interval)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        added, changed, removed = [], [], []
+
+        for room_id in dirty:
+            info = self._room_info(room_id)
+            previous = self._published.get(room_id)
+            if info is None:
+                if previous is not None:
+                    removed.append(room_id)
+                    del self._published[room_id]
+                continue
+
+            if previous is None:
+                added.append(info)
+            elif previous != info:
+                changed.append(info)
+            self._published[room_id] = info
+
+        self.subscribers &= self.ws_server.clients.keys()
+        if not (added or changed or removed) or not self.subscribers:
+            return
+
+        await self.ws_server.send_to_clients(
+            self.subscribers,
+            {
+                "type": MessageType.ROOM_LIST_DELTA.name,
+                "added": added,
+                "changed": changed,
+                "removed": removed,
+            },
+        )
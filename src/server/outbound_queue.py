@@ -0,0 +1,97 @@
+from collections import deque
+from enum import Enum, auto
+from typing import Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import time
+from common.network_protocol import MessageType
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = auto()  # Evict the oldest queued message to make room
+    DROP_NEWEST = auto()  # Refuse the message being enqueued
+    DISCONNECT = auto()  # Evict the client as soon as the queue is full
+
+
+# Queued messages of these types are discarded when a newer message of the key
+# type is enqueued, since the newer one carries the complete information.
+# Replies to a particular request are enqueued with coalesce=False: they are
+# only complete for that request, so they neither replace nor get replaced.
+SUPERSEDES: Dict[str, Set[str]] = {
+    MessageType.GAME_STATE.name: {
+        MessageType.GAME_STATE.name,
+        MessageType.GAME_STATE_DELTA.name,
+    },
+    MessageType.ROOM_LIST.name: {
+        MessageType.ROOM_LIST.name,
+        MessageType.ROOM_LIST_DELTA.name,
+    },
+}
+
+
+class OutboundQueue:
+    def __init__(
+        self,
+        max_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        coalesce: bool = True,
+    ):
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.coalesce = coalesce
+        self.dropped = 0
+        self.coalesced = 0
+        self.full_since: Optional[float] = None
+        self._items: Deque[Tuple[str, bytes, bool]] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._items) >= self.max_size
+
+    def put(self, message_type: str, payload: bytes, coalesce: bool = True) -> bool:
+        if self.coalesce and coalesce and message_type in SUPERSEDES:
+            superseded = SUPERSEDES[message_type]
+            queued = len(self._items)
+            self._items = deque(
+                item for item in self._items if not (item[2] and item[0] in superseded)
+            )
+            self.coalesced += queued - len(self._items)
+
+        if self.is_full:
+            if self.full_since is None:
+                self.full_since = time.monotonic()
+            if self.overflow_policy != OverflowPolicy.DROP_OLDEST:
+                self.dropped += 1
+                return False
+            self._items.popleft()
+            self.dropped += 1
+        else:
+            self.full_since = None
+
+        self._items.append((message_type, payload, coalesce))
+        self._ready.set()
+        return True
+
+    async def get(self) -> Tuple[str, bytes]:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+
+        message_type, payload, _ = self._items.popleft()
+        if not self.is_full:
+            self.full_since = None
+        return message_type, payload
+
+    def drain(self) -> List[Tuple[str, bytes, bool]]:
+        items = list(self._items)
+        self._items.clear()
+        self.full_since = None
+        return items
+
+    def overflowed_for(self) -> float:
+        if self.full_since is None:
+            return 0.0
+        return time.monotonic() - self.full_since
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import time
+from common.network_protocol import MessageType
+
+# Stands in for any type that is not a MessageType, and for undecodable frames
+UNKNOWN_MESSAGE_TYPE = "UNKNOWN"
+
+# Tokens a message takes from its connection's bucket; other types cost 1.
+# Room lists walk every room, and chat and room changes fan out to a room.
+DEFAULT_COSTS: Dict[str, float] = {
+    MessageType.LIST_ROOMS.name: 5,
+    MessageType.SUBSCRIBE_LOBBY.name: 5,
+    MessageType.CREATE_ROOM.name: 5,
+    MessageType.JOIN_ROOM.name: 3,
+    MessageType.ADD_BOT.name: 3,
+    MessageType.SYNC_STATE.name: 3,
+    MessageType.CHAT_HISTORY.name: 3,
+    MessageType.CHAT_MESSAGE.name: 2,
+}
+
+# Types that also get a bucket of their own: (messages per second, burst)
+DEFAULT_TYPE_LIMITS: Dict[str, Tuple[float, float]] = {
+    MessageType.CHAT_MESSAGE.name: (2, 8),
+    MessageType.LIST_ROOMS.name: (2, 6),
+    MessageType.SUBSCRIBE_LOBBY.name: (1, 4),
+    MessageType.CREATE_ROOM.name: (0.5, 3),
+    MessageType.CHAT_HISTORY.name: (1, 5),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self, cost: float = 1, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def refund(self, cost: float = 1) -> None:
+        self.tokens = min(self.burst, self.tokens + cost)
+
+
+@dataclass
+class RateLimitConfig:
+    enabled: bool = True
+    rate: float = 20  # Tokens per second refilled into each connection's bucket
+    burst: float = 60  # Bucket size
+    costs: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_COSTS))
+    type_limits: Dict[str, Tuple[float, float]] = field(
+        default_factory=lambda: dict(DEFAULT_TYPE_LIMITS)
+    )
+    # A connection is closed once this many messages were throttled in a
+    # burst; one violation is forgiven per violation_decay seconds.
+    max_violations: int = 30
+    violation_decay: float = 1.0
+
+    def new_limiter(self) -> "ConnectionLimiter":
+        return ConnectionLimiter(self)
+
+
+class ConnectionLimiter:
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self._bucket = TokenBucket(config.rate, config.burst)
+        self._type_buckets: Dict[str, TokenBucket] = {}
+        self._violations = TokenBucket(
+            1 / config.violation_decay, config.max_violations
+        )
+
+    def admit(self, message_type: str) -> bool:
+        # A message refused by either bucket takes nothing from the other, so
+        # one flooded type does not starve the others, nor the reverse
+        now = time.monotonic()
+        bucket = None
+        limit = self.config.type_limits.get(message_type)
+        if limit is not None:
+            bucket = self._type_buckets.get(message_type)
+            if bucket is None:
+                bucket = self._type_buckets[message_type] = TokenBucket(*limit)
+            if not bucket.take(1, now):
+                return False
+        if not self._bucket.take(self.config.costs.get(message_type, 1), now):
+            if bucket is not None:
+                bucket.refund(1)
+            return False
+        return True
+
+    def record_violation(self) -> bool:
+        # False once the connection keeps going after being throttled
+        return self._violations.take(1)
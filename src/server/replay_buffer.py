@@ -0,0 +1,48 @@
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import secrets
+
+
+class ReplayBuffer:
+    # The last messages written to a player's connection, so that a client
+    # resuming its session gets again exactly what it never received. Both
+    # sides count the messages of a session (AUTHENTICATED replies excepted);
+    # the client reports its count when it resumes.
+    def __init__(self, max_messages: int = 128, max_bytes: int = 256 * 1024):
+        self.token = secrets.token_urlsafe(24)
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.sent = 0
+        self._recent: Deque[Tuple[str, bytes]] = deque()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def record(self, message_type: str, payload: bytes) -> None:
+        self.sent += 1
+        self._recent.append((message_type, payload))
+        self._bytes += len(payload)
+        while self._recent and (
+            len(self._recent) > self.max_messages or self._bytes > self.max_bytes
+        ):
+            self._bytes -= len(self._recent.popleft()[1])
+
+    def take_unreceived(self, received: int) -> Optional[List[Tuple[str, bytes]]]:
+        # Removes and returns the messages after the client's count, which are
+        # recorded again as they are resent. None when they are no longer all
+        # here; counting then continues from the client's number.
+        oldest = self.sent - len(self._recent)
+        if not oldest <= received <= self.sent:
+            self._recent.clear()
+            self._bytes = 0
+            self.sent = received
+            return None
+
+        missed = []
+        while self.sent > received:
+            missed.append(self._recent.pop())
+            self._bytes -= len(missed[-1][1])
+            self.sent -= 1
+        missed.reverse()
+        return missed
@@ -0,0 +1,157 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from itertools import count, islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+
+RoomInfo = Dict[str, Any]
+BucketKey = Tuple[str, int]
+SortKey = Tuple[int, int]
+Entry = Tuple[SortKey, str]
+
+SORT_FIELDS = ("created", "player_count", "free_seats")
+MAX_PAGE_SIZE = 200
+
+_entry_key = itemgetter(0)
+
+
+class RoomIndex:
+    def __init__(self):
+        self._rooms: Dict[str, RoomInfo] = {}
+        self._bucket_keys: Dict[str, BucketKey] = {}
+        self._sort_keys: Dict[str, Dict[str, SortKey]] = {}
+        self._created: Dict[str, int] = {}
+        # Rooms grouped by (state, free seats), each group kept sorted by every
+        # sort field, so a page is a lazy merge of the matching groups
+        self._buckets: Dict[BucketKey, Dict[str, List[Entry]]] = {}
+        self._counter = count()
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def __iter__(self) -> Iterator[RoomInfo]:
+        return iter(self._rooms.values())
+
+    def get(self, room_id: str) -> Optional[RoomInfo]:
+        return self._rooms.get(room_id)
+
+    def update(self, info: RoomInfo) -> None:
+        room_id = info["room_id"]
+        if room_id not in self._created:
+            self._created[room_id] = next(self._counter)
+        self._rooms[room_id] = info
+
+        key = (info["state"], info["max_players"] - info["player_count"])
+        sort_keys = {sort: self._sort_key(room_id, sort) for sort in SORT_FIELDS}
+        previous_key = self._bucket_keys.get(room_id)
+        if previous_key == key and self._sort_keys[room_id] == sort_keys:
+            return
+        if previous_key is not None:
+            self._discard_from_bucket(previous_key, room_id)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {sort: [] for sort in SORT_FIELDS}
+        for sort, sort_key in sort_keys.items():
+            insort(bucket[sort], (sort_key, room_id))
+        self._bucket_keys[room_id] = key
+        self._sort_keys[room_id] = sort_keys
+
+    def remove(self, room_id: str) -> None:
+        key = self._bucket_keys.get(room_id)
+        if key is not None:
+            self._discard_from_bucket(key, room_id)
+            del self._bucket_keys[room_id]
+            del self._sort_keys[room_id]
+        self._rooms.pop(room_id, None)
+        self._created.pop(room_id, None)
+
+    def query(
+        self,
+        state: Optional[str] = None,
+        has_free_seat: Optional[bool] = None,
+        sort: str = "created",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[RoomInfo], Optional[str]]:
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field: {sort}")
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        limit = min(limit, MAX_PAGE_SIZE)
+        after = parse_cursor(cursor) if cursor else None
+
+        runs = []
+        for (bucket_state, free_seats), bucket in self._buckets.items():
+            if state is not None and bucket_state != state:
+                continue
+            if has_free_seat is not None and (free_seats > 0) != has_free_seat:
+                continue
+            runs.append(_run(bucket[sort], after, descending))
+
+        # One entry past the page tells whether there is a next one
+        entries = list(islice(merge(*runs, reverse=descending), limit + 1))
+        page = entries[:limit]
+        next_cursor = None
+        if len(entries) > limit:
+            next_cursor = format_cursor(page[-1][0])
+        return [self._rooms[room_id] for _, room_id in page], next_cursor
+
+    def cursor(self, room_id: str, sort: str) -> str:
+        # Resumes a query sorted by this field right after the room
+        return format_cursor(self._sort_key(room_id, sort))
+
+    def _sort_key(self, room_id: str, sort: str) -> SortKey:
+        created = self._created[room_id]
+        info = self._rooms[room_id]
+        match sort:
+            case "player_count":
+                return (info["player_count"], created)
+            case "free_seats":
+                return (info["max_players"] - info["player_count"], created)
+            case _:
+                return (created, created)
+
+    def _discard_from_bucket(self, key: BucketKey, room_id: str) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        for sort, sort_key in self._sort_keys[room_id].items():
+            entries = bucket[sort]
+            position = bisect_left(entries, sort_key, key=_entry_key)
+            if position < len(entries) and entries[position][1] == room_id:
+                del entries[position]
+        if not bucket["created"]:
+            del self._buckets[key]
+
+
+def _run(
+    entries: List[Entry], after: Optional[SortKey], descending: bool
+) -> Iterable[Entry]:
+    # The bucket's entries past the cursor, in page order
+    if descending:
+        end = len(entries)
+        if after is not None:
+            end = bisect_left(entries, after, key=_entry_key)
+        positions = range(end - 1, -1, -1)
+    else:
+        start = 0
+        if after is not None:
+            start = bisect_right(entries, after, key=_entry_key)
+        positions = range(start, len(entries))
+    return (entries[position] for position in positions)
+
+
+def format_cursor(sort_key: SortKey) -> str:
+    return "{}.{}".format(*sort_key)
+
+
+def parse_cursor(cursor: str) -> SortKey:
+    if not isinstance(cursor, str):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    try:
+        value, created = cursor.split(".")
+        return (int(value), int(created))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
@@ -0,0 +1,307 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+import time
+from common.game import Game
+from common.network_protocol import DEFAULT_CODEC
+from server.logger import server_logger
+
+# Journal-only record for seat changes the game log does not carry:
+# [BOT_SEAT, player_id, policy], with policy None when a human takes it back
+BOT_SEAT = "bot_seat"
+SNAPSHOT_SUFFIX = ".snapshot"
+LOG_SUFFIX = ".log"
+
+
+@dataclass
+class RecoveredRoom:
+    room_id: str
+    game: Game
+    bot_seats: Dict[str, str]  # player -> policy
+
+
+@dataclass
+class _Journal:
+    seq: int = 0  # Records written for the room so far
+    logged_actions: int = 0  # Entries of game.action_log already journaled
+    since_snapshot: int = 0
+
+
+class RoomStore:
+    # Keeps a durable copy of every room: a snapshot (Game.to_dict plus the
+    # bot seats) and an append-only log of each record since, numbered by seq.
+    # Files are written by one background thread; whatever is queued while it
+    # writes goes out as the next batch, with one fsync per file per batch.
+    def __init__(
+        self, directory: str, snapshot_interval: int = 200, fsync: bool = True
+    ):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        self._journals: Dict[str, _Journal] = {}
+        self._pending: List[Tuple[Any, ...]] = []
+        self._writer_task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="uno-store"
+        )
+        self._logs: Dict[str, IO[bytes]] = {}  # Only touched by the writer thread
+        self.records = 0
+        self.snapshots = 0
+        self.batches = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.total_write_time = 0.0
+        self.max_write_time = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, room_id: str, game: Game, bot_seats: Dict[str, str]) -> None:
+        # Call after the room changes; queues the game actions not yet written
+        journal = self._journals.get(room_id)
+        if journal is None:
+            # The log alone cannot rebuild a game without its seed
+            self._journals[room_id] = journal = _Journal()
+            self._snapshot(room_id, journal, game, bot_seats)
+            return
+
+        actions = game.action_log[journal.logged_actions :]
+        journal.logged_actions += len(actions)
+        self._append(room_id, journal, actions)
+        if journal.since_snapshot >= self.snapshot_interval:
+            self._snapshot(room_id, journal, game, bot_seats)
+
+    def record_bot_seat(
+        self,
+        room_id: str,
+        game: Game,
+        bot_seats: Dict[str, str],
+        player_id: str,
+        policy: Optional[str],
+    ) -> None:
+        self.record(room_id, game, bot_seats)
+        self._append(room_id, self._journals[room_id], [[BOT_SEAT, player_id, policy]])
+
+    def drop(self, room_id: str) -> None:
+        if self._journals.pop(room_id, None) is not None:
+            self._queue(("drop", room_id))
+
+    def _append(self, room_id: str, journal: _Journal, records: List[Any]) -> None:
+        if not records:
+            return
+        entries = []
+        for record in records:
+            journal.seq += 1
+            entries.append((journal.seq, record))
+        journal.since_snapshot += len(records)
+        self._queue(("append", room_id, entries))
+
+    def _snapshot(
+        self,
+        room_id: str,
+        journal: _Journal,
+        game: Game,
+        bot_seats: Dict[str, str],
+    ) -> None:
+        # to_dict copies everything, so the writer thread can encode it later
+        journal.logged_actions = len(game.action_log)
+        journal.since_snapshot = 0
+        snapshot = {
+            "room_id": room_id,
+            "seq": journal.seq,
+            "bot_seats": dict(bot_seats),
+            "game": game.to_dict(),
+        }
+        self._queue(("snapshot", room_id, snapshot))
+
+    def _queue(self, operation: Tuple[Any, ...]) -> None:
+        self._pending.append(operation)
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(self._executor, self._write_batch, batch)
+            except Exception as e:
+                self.write_errors += 1
+                server_logger.log_error(f"Room store write failed: {e}")
+        self._writer_task = None
+
+    async def flush(self) -> None:
+        # Waits until everything queued so far is on disk
+        while self._writer_task is not None:
+            await asyncio.shield(self._writer_task)
+
+    async def close(self) -> None:
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._close_logs
+        )
+        self._executor.shutdown()
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]]) -> None:
+        started_at = time.perf_counter()
+        unsynced: Set[str] = set()
+        renamed = False
+        written = 0
+
+        for kind, room_id, *args in batch:
+            if kind == "append":
+                data = b"".join(
+                    DEFAULT_CODEC.encode({"seq": seq, "record": record}) + b"\n"
+                    for seq, record in args[0]
+                )
+                self._open_log(room_id).write(data)
+                unsynced.add(room_id)
+                written += len(data)
+                self.records += len(args[0])
+            elif kind == "snapshot":
+                written += self._write_snapshot(room_id, args[0])
+                # Records up to the snapshot's seq are in it; start the log over
+                log = self._open_log(room_id)
+                log.flush()
+                log.truncate(0)
+                unsynced.add(room_id)
+                renamed = True
+                self.snapshots += 1
+            elif kind == "drop":
+                self._close_log(room_id)
+                unsynced.discard(room_id)
+                for suffix in (SNAPSHOT_SUFFIX, LOG_SUFFIX):
+                    try:
+                        os.remove(self._path(room_id, suffix))
+                    except FileNotFoundError:
+                        pass
+                renamed = True
+
+        for room_id in unsynced:
+            log = self._logs[room_id]
+            log.flush()
+            if self.fsync:
+                os.fsync(log.fileno())
+        if renamed and self.fsync:
+            self._fsync_directory()
+
+        elapsed = time.perf_counter() - started_at
+        self.batches += 1
+        self.bytes_written += written
+        self.total_write_time += elapsed
+        self.max_write_time = max(self.max_write_time, elapsed)
+
+    def _write_snapshot(self, room_id: str, snapshot: Dict[str, Any]) -> int:
+        # Written aside and renamed over the old one, so a crash leaves either
+        path = self._path(room_id, SNAPSHOT_SUFFIX)
+        data = DEFAULT_CODEC.encode(snapshot)
+        with open(path + ".tmp", "wb") as file:
+            file.write(data)
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+        return len(data)
+
+    def _open_log(self, room_id: str) -> IO[bytes]:
+        log = self._logs.get(room_id)
+        if log is None:
+            log = self._logs[room_id] = open(self._path(room_id, LOG_SUFFIX), "ab")
+        return log
+
+    def _close_log(self, room_id: str) -> None:
+        log = self._logs.pop(room_id, None)
+        if log is not None:
+            log.close()
+
+    def _close_logs(self) -> None:
+        for room_id in list(self._logs):
+            self._close_log(room_id)
+
+    def _fsync_directory(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _path(self, room_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, room_id + suffix)
+
+    def load(self) -> List[RecoveredRoom]:
+        # Rebuilds every stored room: its latest snapshot, then the log tail
+        rooms = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(SNAPSHOT_SUFFIX):
+                continue
+            room_id = name[: -len(SNAPSHOT_SUFFIX)]
+            try:
+                rooms.append(self._load_room(room_id))
+            except (OSError, ValueError, KeyError) as e:
+                server_logger.log_error(f"Cannot recover room {room_id}: {e}")
+        return rooms
+
+    def _load_room(self, room_id: str) -> RecoveredRoom:
+        with open(self._path(room_id, SNAPSHOT_SUFFIX), "rb") as file:
+            snapshot = DEFAULT_CODEC.decode(file.read())
+        game = Game.from_dict(snapshot["game"])
+        bot_seats = dict(snapshot["bot_seats"])
+        journal = _Journal(seq=snapshot["seq"])
+
+        log_path = self._path(room_id, LOG_SUFFIX)
+        if os.path.exists(log_path):
+            with open(log_path, "r+b") as log:
+                good_until = 0
+                for line in log:
+                    if not line.endswith(b"\n"):
+                        break  # Torn by a crash mid-write
+                    try:
+                        entry = DEFAULT_CODEC.decode(line)
+                    except ValueError:
+                        break
+                    good_until += len(line)
+                    if entry["seq"] <= journal.seq:
+                        continue  # Already in the snapshot
+                    if entry["seq"] != journal.seq + 1:
+                        break
+
+                    journal.seq += 1
+                    journal.since_snapshot += 1
+                    record = entry["record"]
+                    if record[0] == BOT_SEAT:
+                        _set_bot_seat(game, bot_seats, *record[1:])
+                    else:
+                        game.apply_actions([record])
+                # New records must not land behind a torn line
+                log.truncate(good_until)
+
+        journal.logged_actions = len(game.action_log)
+        self._journals[room_id] = journal
+        return RecoveredRoom(room_id, game, bot_seats)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        batches = self.batches or 1
+        return {
+            "rooms": len(self._journals),
+            "records": self.records,
+            "snapshots": self.snapshots,
+            "batches": self.batches,
+            "avg_batch_records": self.records / batches,
+            "bytes_written": self.bytes_written,
+            "write_errors": self.write_errors,
+            "pending_operations": len(self._pending),
+            "avg_write_ms": self.total_write_time / batches * 1000,
+            "max_write_ms": self.max_write_time * 1000,
+        }
+
+
+def _set_bot_seat(
+    game: Game, bot_seats: Dict[str, str], player_id: str, policy: Optional[str]
+) -> None:
+    if policy is None:
+        bot_seats.pop(player_id, None)
+    else:
+        bot_seats[player_id] = policy
+    for player in game.players:
+        if player.player_id == player_id:
+            player.is_bot = policy is not None
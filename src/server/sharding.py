@@ -0,0 +1,412 @@
+from dataclasses import dataclass, field
+from multiprocessing import Process
+from typing import Dict, Iterator, List, Optional, Set, Any
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import signal
+import websockets
+from websockets.asyncio.client import ClientConnection
+from server.logger import server_logger
+from common.network_protocol import MessageType, JsonCodec, DEFAULT_CODEC
+from common.binary_codec import DEFAULT_WIRE_FORMAT, BinaryCodec
+from common.compression import CompressionConfig
+from server.rate_limiter import RateLimitConfig
+from server.room_index import MAX_PAGE_SIZE, parse_cursor
+
+LOBBY_MESSAGES = {
+    MessageType.LIST_ROOMS.name,
+    MessageType.SUBSCRIBE_LOBBY.name,
+    MessageType.UNSUBSCRIBE_LOBBY.name,
+}
+ROOM_LISTS = {MessageType.ROOM_LIST.name, MessageType.ROOM_PAGE.name}
+# Room lists a client may have in flight; shards answer every request except
+# the ones they throttle, which would otherwise wait forever
+MAX_PENDING_ROOM_LISTS = 16
+
+
+def shard_id(shard_index: int) -> str:
+    return f"s{shard_index}"
+
+
+def shard_for_room(room_id: str, shard_count: int) -> Optional[int]:
+    prefix, _, _ = room_id.partition("-")
+    if not prefix.startswith("s") or not prefix[1:].isdigit():
+        return None
+    shard_index = int(prefix[1:])
+    return shard_index if shard_index < shard_count else None
+
+
+@dataclass
+class PendingRoomList:
+    request: Dict[str, Any]
+    cursors: Dict[int, Optional[str]]  # Where each shard's page starts
+    awaiting: Set[int]
+    replies: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class RouterSession:
+    ws: ClientConnection
+    auth_message: Optional[bytes] = None
+    upstreams: Dict[int, ClientConnection] = field(default_factory=dict)
+    pumps: List[asyncio.Task] = field(default_factory=list)
+    authenticated_forwarded: bool = False
+    # Room lists being merged, by the request ID the shards echo back
+    room_lists: Dict[int, PendingRoomList] = field(default_factory=dict)
+    request_ids: Iterator[int] = field(default_factory=itertools.count)
+
+    async def close(self) -> None:
+        for pump in self.pumps:
+            pump.cancel()
+        for upstream in self.upstreams.values():
+            try:
+                await upstream.close()
+            except Exception:
+                pass
+        self.upstreams.clear()
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        shard_urls: List[str],
+        codec: JsonCodec = DEFAULT_CODEC,
+        compression: Optional[CompressionConfig] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.shard_urls = shard_urls
+        self.codec = codec
+        # Frames are forwarded as-is, so the router must read whichever wire
+        # format each client negotiated with the shards; its own replies stay
+        # JSON, which every client decoder accepts.
+        self.decoder = BinaryCodec(codec)
+        # Frames from the shards are forwarded without decoding them, so only
+        # the size threshold applies to what the router compresses
+        self.compression = compression or CompressionConfig()
+        self.server = None
+        self._create_targets = itertools.cycle(range(len(shard_urls)))
+
+    async def start(self):
+        self.server = await websockets.serve(
+            self._handle_connection,
+            self.host,
+            self.port,
+            ping_interval=30,
+            ping_timeout=10,
+            close_timeout=10,
+            max_size=10 * 1024 * 1024,
+            compression=None,
+            extensions=self.compression.server_extensions(),
+            max_queue=32,
+        )
+        print(
+            f"Router started at ws://{self.host}:{self.port} "
+            f"with {len(self.shard_urls)} shards"
+        )
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_connection(self, websocket: ClientConnection):
+        session = RouterSession(ws=websocket)
+        try:
+            async for raw in websocket:
+                try:
+                    message = self.decoder.decode(raw)
+                except ValueError:
+                    await self._send_error(session, "Invalid message format")
+                    continue
+                await self._route(session, raw, message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            server_logger.log_error(f"Router connection error: {e}")
+        finally:
+            await session.close()
+
+    async def _route(self, session: RouterSession, raw: bytes, message: dict):
+        msg_type = message.get("type")
+        if msg_type == MessageType.AUTHENTICATE.name:
+            session.auth_message = raw
+            if session.upstreams:
+                await self._send_upstream(session, session.upstreams.keys(), raw)
+            else:
+                await self._connect_upstreams(session)
+            return
+
+        if not session.upstreams:
+            await self._send_error(session, "Authentication required")
+            return
+
+        if msg_type in LOBBY_MESSAGES:
+            await self._route_lobby_message(session, raw, message)
+        elif msg_type == MessageType.CREATE_ROOM.name:
+            await self._send_upstream(session, [next(self._create_targets)], raw)
+        elif message.get("room_id"):
+            shard_index = shard_for_room(message["room_id"], len(self.shard_urls))
+            if shard_index is None:
+                await self._send_error(session, "Invalid room ID")
+                return
+            await self._send_upstream(session, [shard_index], raw)
+        else:
+            await self._send_upstream(session, [0], raw)
+
+    async def _route_lobby_message(
+        self, session: RouterSession, raw: bytes, message: dict
+    ):
+        msg_type = message["type"]
+        if msg_type == MessageType.UNSUBSCRIBE_LOBBY.name:
+            await self._send_upstream(session, session.upstreams.keys(), raw)
+            return
+
+        # Room lists are requested from every shard and merged once all reply;
+        # the merged cursor maps each shard to where its next page starts, and
+        # leaves out the shards that have no more rooms.
+        cursors: Dict[int, Optional[str]] = {
+            shard_index: None for shard_index in session.upstreams
+        }
+        if message.get("cursor"):
+            try:
+                cursors = {
+                    int(shard_index): cursor
+                    for shard_index, cursor in json.loads(message["cursor"]).items()
+                }
+            except (ValueError, AttributeError):
+                cursors = {}
+            if not cursors or not cursors.keys() <= session.upstreams.keys():
+                await self._send_error(session, "Invalid cursor")
+                return
+
+        if len(session.room_lists) >= MAX_PENDING_ROOM_LISTS:
+            del session.room_lists[next(iter(session.room_lists))]
+        request_id = next(session.request_ids)
+        session.room_lists[request_id] = PendingRoomList(
+            request=message, cursors=cursors, awaiting=set(cursors)
+        )
+        for shard_index, cursor in cursors.items():
+            shard_message = dict(message, request_id=request_id)
+            if cursor is None:
+                shard_message.pop("cursor", None)
+            else:
+                shard_message["cursor"] = cursor
+            await self._send_upstream(
+                session, [shard_index], self.codec.encode(shard_message)
+            )
+
+    async def _connect_upstreams(self, session: RouterSession):
+        for shard_index, url in enumerate(self.shard_urls):
+            upstream = await websockets.connect(
+                url,
+                ping_interval=30,
+                ping_timeout=10,
+                close_timeout=10,
+                max_size=10 * 1024 * 1024,
+                compression=None,
+                max_queue=32,
+            )
+            session.upstreams[shard_index] = upstream
+            session.pumps.append(
+                asyncio.create_task(self._pump(session, shard_index, upstream))
+            )
+            await upstream.send(session.auth_message)
+
+    async def _send_upstream(
+        self, session: RouterSession, shard_indexes, raw: bytes
+    ):
+        for shard_index in list(shard_indexes):
+            upstream = session.upstreams.get(shard_index)
+            if upstream:
+                await upstream.send(raw)
+
+    async def _pump(
+        self, session: RouterSession, shard_index: int, upstream: ClientConnection
+    ):
+        try:
+            async for raw in upstream:
+                try:
+                    message = self.decoder.decode(raw)
+                except ValueError as e:
+                    server_logger.log_error(
+                        f"Invalid message from shard {shard_index}: {e}"
+                    )
+                    continue
+                msg_type = message.get("type")
+                if msg_type == MessageType.AUTHENTICATED.name:
+                    if session.authenticated_forwarded:
+                        continue
+                    session.authenticated_forwarded = True
+                elif msg_type in ROOM_LISTS and "request_id" in message:
+                    await self._merge_room_list(session, shard_index, message)
+                    continue
+                elif msg_type == MessageType.ERROR.name and "request_id" in message:
+                    # Every shard rejects the same request; the client hears once
+                    if session.room_lists.pop(message.pop("request_id"), None):
+                        await session.ws.send(self.codec.encode(message))
+                    continue
+                await session.ws.send(raw)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            # Losing a shard connection leaves the client's view inconsistent
+            await session.ws.close(code=1011, reason="Shard connection lost")
+
+    async def _merge_room_list(
+        self, session: RouterSession, shard_index: int, message: dict
+    ):
+        request_id = message["request_id"]
+        pending = session.room_lists.get(request_id)
+        if pending is None:
+            return
+        pending.replies[shard_index] = message
+        pending.awaiting.discard(shard_index)
+        if pending.awaiting:
+            return
+        del session.room_lists[request_id]
+
+        if pending.request["type"] == MessageType.SUBSCRIBE_LOBBY.name:
+            reply = {
+                "type": MessageType.ROOM_LIST.name,
+                "rooms": [
+                    room
+                    for index in sorted(pending.replies)
+                    for room in pending.replies[index]["rooms"]
+                ],
+            }
+        else:
+            reply = self._merge_pages(pending)
+        await session.ws.send(self.codec.encode(reply))
+
+    @staticmethod
+    def _merge_pages(pending: PendingRoomList) -> Dict[str, Any]:
+        # Every shard's page is sorted by its keys, so the merged page takes
+        # the first rooms of a k-way merge; equal keys go to the lower shard
+        limit = min(int(pending.request.get("limit", 50)), MAX_PAGE_SIZE)
+        pages = [
+            [
+                (parse_cursor(key), shard_index, position)
+                for position, key in enumerate(reply["keys"])
+            ]
+            for shard_index, reply in sorted(pending.replies.items())
+        ]
+        merged = heapq.merge(
+            *pages, reverse=bool(pending.request.get("descending", False))
+        )
+        rooms = []
+        taken = dict.fromkeys(pending.replies, 0)
+        for _, shard_index, position in itertools.islice(merged, limit):
+            rooms.append(pending.replies[shard_index]["rooms"][position])
+            taken[shard_index] = position + 1
+
+        next_cursors: Dict[str, Optional[str]] = {}
+        for shard_index, reply in sorted(pending.replies.items()):
+            count = taken[shard_index]
+            if count < len(reply["rooms"]):
+                # The next page starts after the last room taken from this
+                # shard, or where this one did if none was
+                next_cursors[str(shard_index)] = (
+                    reply["keys"][count - 1] if count else pending.cursors[shard_index]
+                )
+            elif reply.get("next_cursor"):
+                next_cursors[str(shard_index)] = reply["next_cursor"]
+
+        return {
+            "type": MessageType.ROOM_PAGE.name,
+            "rooms": rooms,
+            "next_cursor": json.dumps(next_cursors) if next_cursors else None,
+        }
+
+    async def _send_error(self, session: RouterSession, message: str):
+        await session.ws.send(
+            self.codec.encode({"type": MessageType.ERROR.name, "message": message})
+        )
+
+
+def _run_shard(
+    shard_index: int,
+    host: str,
+    port: int,
+    data_dir: Optional[str],
+    snapshot_interval: int,
+    rate_limit: Optional[RateLimitConfig],
+    wire_format: str,
+) -> None:
+    from server.game_server import GameServer
+    from server.room_store import RoomStore
+    from server.shutdown import wait_for_signal
+
+    async def serve():
+        # Shards are daemon processes, which may not start a process pool of
+        # their own, so their bots think on a thread instead. The router
+        # compresses for the clients; the local hop to a shard stays plain.
+        # Sessions cannot be resumed through the router yet: every shard would
+        # hand out its own tokens and count its own messages to the client.
+        # Each client has its own connection to every shard, so the shards
+        # rate-limit clients one by one.
+        server = GameServer(
+            host=host,
+            port=port,
+            shard_id=shard_id(shard_index),
+            bot_workers=0,
+            compression=CompressionConfig(enabled=False),
+            rate_limit=rate_limit,
+            resume_grace=0,
+            wire_format=wire_format,
+            store=(
+                RoomStore(
+                    os.path.join(data_dir, shard_id(shard_index)),
+                    snapshot_interval=snapshot_interval,
+                )
+                if data_dir
+                else None
+            ),
+        )
+        await server.start()
+        try:
+            await wait_for_signal(signal.SIGTERM)
+        finally:
+            await server.stop()
+
+    # Ctrl-C reaches the whole process group; shards wait for the router to
+    # terminate them instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(serve())
+
+
+def start_shards(
+    count: int,
+    host: str,
+    base_port: int,
+    data_dir: Optional[str] = None,
+    snapshot_interval: int = 200,
+    rate_limit: Optional[RateLimitConfig] = None,
+    wire_format: str = DEFAULT_WIRE_FORMAT,
+) -> List[Process]:
+    # Each shard keeps its rooms under data_dir/<shard id>, so recovery needs
+    # the same shard count as before the restart
+    processes = []
+    for shard_index in range(count):
+        process = Process(
+            target=_run_shard,
+            args=(
+                shard_index,
+                host,
+                base_port + shard_index,
+                data_dir,
+                snapshot_interval,
+                rate_limit,
+                wire_format,
+            ),
+            name=f"uno-shard-{shard_index}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    return processes
@@ -0,0 +1,23 @@
+import asyncio
+import signal
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+async def wait_for_signal(*signals: signal.Signals) -> None:
+    # Returns on the first of these signals, while every connection is still
+    # open, so the caller can stop the server in order. The handlers are gone
+    # by then: a second Ctrl-C interrupts a slow shutdown as usual.
+    loop = asyncio.get_running_loop()
+    received = asyncio.Event()
+    try:
+        for sig in signals:
+            loop.add_signal_handler(sig, received.set)
+    except NotImplementedError:
+        # Windows event loops; Ctrl-C then cancels the waiting task instead
+        await asyncio.Future()
+    try:
+        await received.wait()
+    finally:
+        for sig in signals:
+            loop.remove_signal_handler(sig)
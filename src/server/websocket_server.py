@@ -1,13 +1,25 @@
-from dataclasses import dataclass
-from typing import Dict, Set, Optional, Any
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Set, Optional, Any, Tuple
 import asyncio
-import json
 import websockets
 from websockets.asyncio.client import ClientConnection
 from websockets.exceptions import ConnectionClosed
 from server.event_manager import EventManager
 from server.logger import server_logger, Direction
-from common.network_protocol import MessageType
+from server.outbound_queue import OutboundQueue, OverflowPolicy
+from server.rate_limiter import (
+    UNKNOWN_MESSAGE_TYPE,
+    ConnectionLimiter,
+    RateLimitConfig,
+)
+from server.replay_buffer import ReplayBuffer
+from common.network_protocol import MessageType, Codec, DEFAULT_CODEC
+from common.binary_codec import (
+    DEFAULT_WIRE_FORMAT,
+    WIRE_FORMATS,
+    negotiate_wire_format,
+)
+from common.compression import CompressionConfig, SelectiveDeflate, find_deflate
 
 
 @dataclass
@@ -17,16 +29,68 @@ class ClientSession:
     room_id: Optional[str] = None
     name: str = ""
     is_authenticated: bool = False
+    is_slow: bool = False
+    slow_sends: int = 0
+    outbound: OutboundQueue = field(default_factory=OutboundQueue)
+    codec: Codec = DEFAULT_CODEC
+    wire_format: str = "json"
+    deflate: Optional[SelectiveDeflate] = None
+    writer_task: Optional[asyncio.Task] = None
+    replay: Optional[ReplayBuffer] = None  # Set on authentication when resumable
+    is_suspended: bool = False  # Connection lost, waiting to be resumed
+    expiry_task: Optional[asyncio.Task] = None
+    limiter: Optional[ConnectionLimiter] = None
+    is_flooding: bool = False  # Being closed for ignoring the rate limit
 
 
 class WebSocketServer:
-    def __init__(self, host: str, port: int, event_manager: EventManager):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        event_manager: EventManager,
+        send_timeout: float = 2.0,
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        overflow_timeout: float = 10.0,
+        codec: Codec = DEFAULT_CODEC,
+        wire_format: str = DEFAULT_WIRE_FORMAT,
+        compression: Optional[CompressionConfig] = None,
+        rate_limit: Optional[RateLimitConfig] = None,
+        resume_grace: float = 30.0,
+        replay_buffer_size: int = 128,
+    ):
         self.host = host
         self.port = port
         self.event_manager = event_manager
+        self.send_timeout = send_timeout
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.overflow_timeout = overflow_timeout
+        self.codec = codec
+        # Preferred among the formats a client offers; see DEFAULT_WIRE_FORMAT
+        self.wire_format = wire_format
+        self.compression = compression or CompressionConfig()
+        self.rate_limit = rate_limit or RateLimitConfig()
+        # Seconds a seated player's session outlives its connection (0: off)
+        self.resume_grace = resume_grace
+        self.replay_buffer_size = replay_buffer_size
         self.clients: Dict[str, ClientSession] = {}
         self.room_clients: Dict[str, Set[str]] = {}
         self.server = None
+        self._resume_tokens: Dict[str, str] = {}  # token -> client ID
+        self._closed_queue_stats = {"dropped": 0, "coalesced": 0}
+        self._closed_compression_stats = {"raw_bytes": 0, "wire_bytes": 0}
+        self._resume_stats = {
+            "suspended": 0,
+            "resumed": 0,
+            "expired": 0,
+            "replayed_messages": 0,
+        }
+        self._evicted_clients = 0
+        # Known message type, or UNKNOWN for anything else -> count
+        self._throttled: Dict[str, int] = {}
+        self._rate_limited_clients = 0
 
     async def start(self):
         self.server = await websockets.serve(
@@ -38,6 +102,7 @@ class WebSocketServer:
             close_timeout=10,
             max_size=10 * 1024 * 1024,
             compression=None,
+            extensions=self.compression.server_extensions(),
             max_queue=32,
         )
         print(f"Server started at ws://{self.host}:{self.port}")
@@ -46,54 +111,196 @@ class WebSocketServer:
         if self.server:
             self.server.close()
             await self.server.wait_closed()
+        for session in self.clients.values():
+            if session.expiry_task:
+                session.expiry_task.cancel()
 
     async def broadcast_to_room(self, room_id: str, message: Dict[str, Any]) -> None:
         if room_id not in self.room_clients:
             return
 
-        msg_str = json.dumps(message)
-        tasks = []
-        for client_id in self.room_clients[room_id]:
-            if client_id in self.clients:
-                try:
-                    tasks.append(self.clients[client_id].ws.send(msg_str))
-                except Exception:
-                    continue
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.send_to_clients(self.room_clients[room_id], message)
 
     async def broadcast_to_all(self, message: Dict[str, Any]) -> None:
-        msg_str = json.dumps(message)
-        tasks = []
-        for client_id, client in self.clients.items():
-            try:
-                tasks.append(client.ws.send(msg_str))
-            except Exception:
+        await self.send_to_clients(self.clients, message)
+
+    async def send_to_clients(
+        self, client_ids: Iterable[str], message: Dict[str, Any]
+    ) -> None:
+        # Encoded once per wire format in use rather than once per client
+        encoded: Dict[str, bytes] = {}
+        payloads = {}
+        for client_id in client_ids:
+            session = self.clients.get(client_id)
+            if not session:
                 continue
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            codec = session.codec
+            if codec.name not in encoded:
+                encoded[codec.name] = codec.encode(message)
+            payloads[client_id] = encoded[codec.name]
+        await self.fan_out(message["type"], payloads)
 
-    async def send_to_client(self, client_id: str, message: Dict[str, Any]) -> None:
-        if client_id in self.clients:
-            try:
-                server_logger.log_message(
-                    Direction.OUTGOING, message["type"], client_id
+    async def send_to_client(
+        self, client_id: str, message: Dict[str, Any], coalesce: bool = True
+    ) -> None:
+        session = self.clients.get(client_id)
+        if session:
+            server_logger.log_message(Direction.OUTGOING, message["type"], client_id)
+            self._enqueue(
+                client_id, message["type"], session.codec.encode(message), coalesce
+            )
+
+    async def send_personalized(
+        self,
+        message: Dict[str, Any],
+        fragments: Dict[str, Dict[str, Any]],
+        into: Optional[str] = None,
+    ) -> None:
+        # The shared part is encoded once per wire format; only each client's
+        # fragment is encoded per recipient and spliced into the shared object.
+        shared: Dict[str, Tuple[bytes, Optional[bytes]]] = {}
+        payloads = {}
+        for client_id, fragment in fragments.items():
+            session = self.clients.get(client_id)
+            if not session:
+                continue
+            codec = session.codec
+            if codec.name not in shared:
+                if into:
+                    shared[codec.name] = (
+                        codec.encode({k: v for k, v in message.items() if k != into}),
+                        codec.encode(message[into]),
+                    )
+                else:
+                    shared[codec.name] = (codec.encode(message), None)
+            head, nested = shared[codec.name]
+
+            encoded_fragment = codec.encode(fragment)
+            if into:
+                payloads[client_id] = codec.merge(
+                    head, codec.wrap(into, codec.merge(nested, encoded_fragment))
                 )
-                await self.clients[client_id].ws.send(json.dumps(message))
+            else:
+                payloads[client_id] = codec.merge(head, encoded_fragment)
+            server_logger.log_message(Direction.OUTGOING, message["type"], client_id)
+
+        await self.fan_out(message["type"], payloads)
+
+    async def fan_out(self, message_type: str, payloads: Dict[str, bytes]) -> None:
+        # Enqueueing never waits on the network, so one stalled peer cannot
+        # hold up the rest of the room; each writer task drains independently.
+        for client_id, payload in payloads.items():
+            self._enqueue(client_id, message_type, payload)
+
+    def _enqueue(
+        self, client_id: str, message_type: str, payload: bytes, coalesce: bool = True
+    ) -> None:
+        session = self.clients.get(client_id)
+        if not session:
+            return
+
+        accepted = session.outbound.put(message_type, payload, coalesce)
+        if (not accepted and self.overflow_policy == OverflowPolicy.DISCONNECT) or (
+            session.outbound.overflowed_for() > self.overflow_timeout
+        ):
+            self._evict_client(client_id, session)
+
+    def _evict_client(self, client_id: str, session: ClientSession) -> None:
+        if session.ws.close_code is not None:
+            return
+
+        self._evicted_clients += 1
+        server_logger.log_error(f"Evicting slow client [{client_id}]")
+        asyncio.create_task(session.ws.close(code=1013, reason="Client too slow"))
+
+    async def _writer_loop(self, client_id: str, session: ClientSession) -> None:
+        while True:
+            message_type, payload = await session.outbound.get()
+            if (
+                session.replay is not None
+                and message_type != MessageType.AUTHENTICATED.name
+            ):
+                session.replay.record(message_type, payload)
+            if session.deflate:
+                # Read by the connection's deflate extension as this frame is sent
+                session.deflate.compress_next = self.compression.should_compress(
+                    message_type, len(payload)
+                )
+            try:
+                await asyncio.wait_for(session.ws.send(payload), self.send_timeout)
+                session.is_slow = False
+            except asyncio.TimeoutError:
+                session.is_slow = True
+                session.slow_sends += 1
             except Exception:
                 await self._handle_client_disconnect(client_id)
+                return
+
+    def get_metrics(self) -> Dict[str, Any]:
+        queue_depths = {
+            client_id: len(session.outbound)
+            for client_id, session in self.clients.items()
+        }
+        sessions = self.clients.values()
+        suspended = sum(1 for session in sessions if session.is_suspended)
+        return {
+            "connected_clients": len(self.clients) - suspended,
+            "suspended_sessions": suspended,
+            "outbound_queue_depth": queue_depths,
+            "max_outbound_queue_depth": max(queue_depths.values(), default=0),
+            "total_outbound_queue_depth": sum(queue_depths.values()),
+            "dropped_messages": self._closed_queue_stats["dropped"]
+            + sum(session.outbound.dropped for session in sessions),
+            "coalesced_messages": self._closed_queue_stats["coalesced"]
+            + sum(session.outbound.coalesced for session in sessions),
+            "slow_clients": sum(1 for session in sessions if session.is_slow),
+            "evicted_clients": self._evicted_clients,
+            "compression": self._compression_metrics(),
+            "resume": dict(self._resume_stats),
+            "rate_limit": {
+                "enabled": self.rate_limit.enabled,
+                "throttled": sum(self._throttled.values()),
+                "throttled_by_type": dict(self._throttled),
+                "disconnected_clients": self._rate_limited_clients,
+            },
+        }
+
+    def _compression_metrics(self) -> Dict[str, Any]:
+        raw_bytes = self._closed_compression_stats["raw_bytes"]
+        wire_bytes = self._closed_compression_stats["wire_bytes"]
+        for session in self.clients.values():
+            if session.deflate:
+                raw_bytes += session.deflate.raw_bytes
+                wire_bytes += session.deflate.wire_bytes
+        return {
+            "enabled": self.compression.enabled,
+            "raw_bytes": raw_bytes,
+            "wire_bytes": wire_bytes,
+            "ratio": wire_bytes / raw_bytes if raw_bytes else 1.0,
+        }
 
     async def _handle_connection(self, websocket: ClientConnection):
         client_id = str(id(websocket))
         server_logger.log_connection(client_id)
         try:
-            self.clients[client_id] = ClientSession(ws=websocket, player_id="")
+            session = ClientSession(
+                ws=websocket,
+                player_id="",
+                outbound=OutboundQueue(self.max_queue_size, self.overflow_policy),
+                codec=self.codec,
+                deflate=find_deflate(websocket),
+            )
+            session.writer_task = asyncio.create_task(
+                self._writer_loop(client_id, session)
+            )
+            self.clients[client_id] = session
             print(f"New connection: {client_id}")
             async for message in websocket:
                 try:
-                    data = json.loads(message)
-                    await self._process_message(client_id, data)
-                except json.JSONDecodeError:
+                    data = session.codec.decode(message)
+                except ValueError:
+                    if not await self._admit(client_id, session, ""):
+                        continue
                     await self.send_to_client(
                         client_id,
                         {
@@ -101,6 +308,10 @@ class WebSocketServer:
                             "message": "Invalid message format",
                         },
                     )
+                    continue
+
+                try:
+                    await self._process_message(client_id, data)
                 except Exception as e:
                     print(f"Error processing message: {e}")
                     await self.send_to_client(
@@ -126,6 +337,9 @@ class WebSocketServer:
             return
 
         server_logger.log_message(Direction.INCOMING, msg_type, client_id)
+        self.event_manager.emit_nowait("message_received", client_id, msg_type)
+        if not await self._admit(client_id, self.clients[client_id], msg_type):
+            return
         if msg_type == MessageType.AUTHENTICATE.name:
             await self._handle_authentication(client_id, message)
         elif not self.clients[client_id].is_authenticated:
@@ -137,6 +351,45 @@ class WebSocketServer:
         else:
             await self.event_manager.emit(f"message_{msg_type}", client_id, message)
 
+    async def _admit(
+        self, client_id: str, session: ClientSession, message_type: str
+    ) -> bool:
+        if not self.rate_limit.enabled:
+            return True
+        if session.is_flooding:
+            # Whatever arrives before the close completes is dropped uncounted
+            return False
+        # Types come from the client: made-up ones share a single bucket and
+        # count, or a flood of new names would grow both without limit
+        if not isinstance(message_type, str) or (
+            message_type not in MessageType.__members__
+        ):
+            message_type = UNKNOWN_MESSAGE_TYPE
+        if session.limiter is None:
+            session.limiter = self.rate_limit.new_limiter()
+        if session.limiter.admit(message_type):
+            return True
+
+        self._throttled[message_type] = self._throttled.get(message_type, 0) + 1
+        if not session.limiter.record_violation():
+            # Still flooding after being told to slow down
+            session.is_flooding = True
+            self._rate_limited_clients += 1
+            server_logger.log_error(f"Closing flooding client [{client_id}]")
+            asyncio.create_task(
+                session.ws.close(code=1008, reason="Rate limit exceeded")
+            )
+            return False
+
+        await self.send_to_client(
+            client_id,
+            {
+                "type": MessageType.ERROR.name,
+                "message": f"Rate limit exceeded for {message_type}",
+            },
+        )
+        return False
+
     async def _handle_authentication(self, client_id: str, message: Dict[str, Any]):
         player_id = message.get("player_id")
         name = message.get("name")
@@ -152,43 +405,192 @@ class WebSocketServer:
             return
 
         session = self.clients[client_id]
+        if message.get("resume_token") and await self._resume_session(
+            client_id, session, message
+        ):
+            return
+
         session.player_id = player_id
         session.name = name
         session.is_authenticated = True
+        if session.replay is not None:
+            self._resume_tokens.pop(session.replay.token, None)
+            session.replay = None
+        if self.resume_grace > 0:
+            session.replay = ReplayBuffer(self.replay_buffer_size)
+            self._resume_tokens[session.replay.token] = client_id
 
+        # The reply still goes out in the current format; the negotiated one
+        # applies from the next message in each direction.
+        session.wire_format = negotiate_wire_format(
+            message.get("codecs", []), self.wire_format
+        )
         await self.send_to_client(
-            client_id, {"type": MessageType.AUTHENTICATED.name, "player_id": player_id}
+            client_id,
+            {
+                "type": MessageType.AUTHENTICATED.name,
+                "player_id": player_id,
+                "codec": session.wire_format,
+                "resume_token": (
+                    session.replay.token if session.replay is not None else None
+                ),
+                "resumed": False,
+            },
         )
+        session.codec = WIRE_FORMATS[session.wire_format]
+
+    async def _resume_session(
+        self, client_id: str, session: ClientSession, message: Dict[str, Any]
+    ) -> bool:
+        previous_id = self._resume_tokens.get(message["resume_token"])
+        previous = self.clients.get(previous_id)
+        if (
+            previous is None
+            or previous is session
+            or previous.player_id != message.get("player_id")
+        ):
+            return False
+        try:
+            received = int(message.get("received", 0))
+        except (TypeError, ValueError):
+            return False
+
+        # The new connection takes over the old session's seat, its queue of
+        # unsent messages and its replay buffer, under its own client ID
+        if previous.expiry_task:
+            previous.expiry_task.cancel()
+        if previous.writer_task:
+            previous.writer_task.cancel()
+        if previous.ws.close_code is None:
+            asyncio.create_task(previous.ws.close(reason="Session resumed"))
+        self._retire_session(previous)
+        del self.clients[previous_id]
+
+        replay = previous.replay
+        missed = replay.take_unreceived(received)
+        session.player_id = previous.player_id
+        session.name = previous.name
+        session.is_authenticated = True
+        session.replay = replay
+        # Reconnecting does not refill the buckets
+        session.limiter = previous.limiter or session.limiter
+        self._resume_tokens[replay.token] = client_id
+        if previous.room_id:
+            self.room_clients.get(previous.room_id, set()).discard(previous_id)
+            self.add_to_room(client_id, previous.room_id)
+
+        session.wire_format = previous.wire_format
+        await self.send_to_client(
+            client_id,
+            {
+                "type": MessageType.AUTHENTICATED.name,
+                "player_id": session.player_id,
+                "codec": session.wire_format,
+                "resume_token": replay.token,
+                "resumed": True,
+                # None when the buffer no longer reaches back to what the
+                # client last received; it should then request a full state
+                "replayed": len(missed) if missed is not None else None,
+            },
+        )
+        session.codec = previous.codec
+        for message_type, payload in missed or []:
+            session.outbound.put(message_type, payload)
+        for message_type, payload, coalesce in previous.outbound.drain():
+            session.outbound.put(message_type, payload, coalesce)
+
+        self._resume_stats["resumed"] += 1
+        self._resume_stats["replayed_messages"] += len(missed or [])
+        await self.event_manager.emit_concurrent(
+            "player_resumed", session.player_id, session.room_id, previous_id, client_id
+        )
+        return True
 
     async def _handle_client_disconnect(self, client_id: str):
         if client_id not in self.clients:
             return
 
         session = self.clients[client_id]
+        if self._can_suspend(session):
+            # The connection's cleanup holds the seat for the grace period
+            return
         if session.room_id:
             if session.room_id in self.room_clients:
                 self.room_clients[session.room_id].remove(client_id)
                 if not self.room_clients[session.room_id]:
                     del self.room_clients[session.room_id]
 
-            await self.event_manager.emit(
+            await self.event_manager.emit_concurrent(
                 "player_disconnected", session.player_id, session.room_id
             )
 
     async def _cleanup_client(self, client_id: str):
         if client_id in self.clients:
+            session = self.clients[client_id]
+            if self._can_suspend(session):
+                await self._suspend(client_id, session)
+                return
             try:
-                session = self.clients[client_id]
+                if session.writer_task:
+                    session.writer_task.cancel()
+                self._retire_session(session)
                 if session.room_id:
-                    await self.event_manager.emit(
+                    await self.event_manager.emit_concurrent(
                         "player_disconnected", session.player_id, session.room_id
                     )
+                    self.remove_from_room(client_id)
                 await self.clients[client_id].ws.close()
             except:
                 pass
             finally:
+                if session.replay is not None:
+                    if self._resume_tokens.get(session.replay.token) == client_id:
+                        del self._resume_tokens[session.replay.token]
                 del self.clients[client_id]
 
+    def _can_suspend(self, session: ClientSession) -> bool:
+        # Only a seat is worth holding on to; lobby sessions simply end
+        return (
+            session.replay is not None
+            and session.room_id is not None
+            and not session.is_suspended
+        )
+
+    async def _suspend(self, client_id: str, session: ClientSession) -> None:
+        # The session keeps its room membership, so messages for the player
+        # keep collecting in its queue until it resumes or expires
+        session.is_suspended = True
+        if session.writer_task:
+            session.writer_task.cancel()
+            session.writer_task = None
+        self._add_compression_stats(session)
+        self._resume_stats["suspended"] += 1
+        session.expiry_task = asyncio.create_task(
+            self._expire_later(client_id, session)
+        )
+        await self.event_manager.emit_concurrent(
+            "player_suspended", session.player_id, session.room_id
+        )
+
+    async def _expire_later(self, client_id: str, session: ClientSession) -> None:
+        await asyncio.sleep(self.resume_grace)
+        if self.clients.get(client_id) is session:
+            session.expiry_task = None
+            self._resume_stats["expired"] += 1
+            await self._cleanup_client(client_id)
+
+    def _retire_session(self, session: ClientSession) -> None:
+        self._closed_queue_stats["dropped"] += session.outbound.dropped
+        self._closed_queue_stats["coalesced"] += session.outbound.coalesced
+        self._add_compression_stats(session)
+
+    def _add_compression_stats(self, session: ClientSession) -> None:
+        if session.deflate:
+            compression_stats = self._closed_compression_stats
+            compression_stats["raw_bytes"] += session.deflate.raw_bytes
+            compression_stats["wire_bytes"] += session.deflate.wire_bytes
+            session.deflate = None
+
     def add_to_room(self, client_id: str, room_id: str):
         if client_id not in self.clients:
             raise ValueError("Invalid client ID")
@@ -0,0 +1,53 @@
+from typing import Optional
+import pytest
+from common.card import (
+    CARD_CODE_COUNT,
+    CARDS,
+    PLAYABLE_IN_COLOR,
+    PLAYABLE_ON,
+    Card,
+    playable_mask,
+)
+from common.card_enums import CardColor, CardType
+
+CURRENT_COLORS = [None, *CardColor]
+
+
+def rule_allows(card: Card, other: Card, current_color: Optional[CardColor]) -> bool:
+    # Card.can_be_played_on as it was before the lookup tables
+    if card.type in [CardType.WILD, CardType.WILD_DRAW_FOUR]:
+        return True
+
+    if current_color:
+        return card.color == current_color
+
+    return (
+        card.color == other.color
+        or (
+            card.type == other.type
+            and card.type == CardType.NUMBER
+            and card.value == other.value
+        )
+        or (card.type == other.type and card.type != CardType.NUMBER)
+    )
+
+
+def test_every_code_has_a_face():
+    assert len(CARDS) == CARD_CODE_COUNT
+    assert [card.code for card in CARDS] == list(range(CARD_CODE_COUNT))
+    assert all(mask < 1 << CARD_CODE_COUNT for mask in PLAYABLE_ON)
+    assert set(PLAYABLE_IN_COLOR) == set(CardColor)
+
+
+@pytest.mark.parametrize("current_color", CURRENT_COLORS, ids=str)
+def test_tables_match_rules(current_color):
+    for top in CARDS:
+        mask = playable_mask(top, current_color)
+        if current_color is None:
+            assert mask == PLAYABLE_ON[top.code]
+        else:
+            assert mask == PLAYABLE_IN_COLOR[current_color]
+        for card in CARDS:
+            expected = rule_allows(card, top, current_color)
+            assert bool(mask >> card.code & 1) == expected, (card, top)
+            assert card.can_be_played_on(top, current_color) == expected, (card, top)
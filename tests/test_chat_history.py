@@ -0,0 +1,105 @@
+from typing import List, Optional
+import pytest
+from common.chat_history import (
+    ChatHistory,
+    ChatMessage,
+    pack_chat_page,
+    unpack_chat_page,
+)
+
+
+def message(content: str, player_id: str = "p1") -> ChatMessage:
+    return ChatMessage(player_id, f"Player {player_id}", content, timestamp=1.0)
+
+
+def filled_history(count: int, **limits) -> ChatHistory:
+    history = ChatHistory(**limits)
+    for number in range(1, count + 1):
+        history.append(message(str(number)))
+    return history
+
+
+def contents(messages: List[ChatMessage]) -> List[int]:
+    return [int(message.content) for message in messages]
+
+
+def page_back(history: ChatHistory, limit: int) -> List[int]:
+    pages = []
+    cursor: Optional[str] = None
+    while True:
+        page, cursor = history.page(cursor, limit)
+        pages.append(contents(page))
+        if cursor is None:
+            break
+    return [number for page in reversed(pages) for number in page]
+
+
+def test_keeps_the_latest_messages():
+    history = filled_history(25, max_messages=10)
+    assert len(history) == 10
+    assert history.evicted == 15
+    assert contents(history) == list(range(16, 26))
+    assert [message.seq for message in history] == list(range(16, 26))
+
+
+def test_byte_limit_keeps_the_newest_message():
+    history = ChatHistory(max_bytes=100)
+    history.append(message("a" * 40))
+    history.append(message("b" * 40))
+    assert len(history) == 1
+    assert history.size_bytes == len("b" * 40 + "Player p1" + "p1")
+
+    history.append(message("c" * 500))
+    assert [message.content[0] for message in history] == ["c"]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 10, 50])
+def test_pages_walk_back_through_everything_kept(limit):
+    history = filled_history(37, max_messages=30)
+    assert page_back(history, limit) == list(range(8, 38))
+
+
+def test_first_page_is_the_latest():
+    history = filled_history(12)
+    page, cursor = history.page(limit=5)
+    assert contents(page) == [8, 9, 10, 11, 12]
+    assert cursor == "8"
+
+
+def test_new_messages_do_not_shift_older_pages():
+    history = filled_history(12)
+    _, cursor = history.page(limit=5)
+    history.append(message("13"))
+
+    page, cursor = history.page(cursor, 5)
+    assert contents(page) == [3, 4, 5, 6, 7]
+    assert cursor == "3"
+
+
+def test_cursor_past_the_evicted_messages_ends_paging():
+    history = filled_history(12, max_messages=5)
+    assert history.page("8", 5) == ([], None)
+    page, cursor = history.page("10", 5)
+    assert contents(page) == [8, 9]
+    assert cursor is None
+
+
+@pytest.mark.parametrize("cursor, limit", [("abc", 5), ("5", 0), (None, -1)])
+def test_bad_pages_raise_value_error(cursor, limit):
+    with pytest.raises(ValueError):
+        filled_history(5).page(cursor, limit)
+
+
+def test_packed_page_round_trips():
+    messages = [message("hi", "p1"), message("hey", "p2"), message("yo", "p1")]
+    packed = pack_chat_page(messages)
+    assert len(packed["speakers"]) == 2
+    assert unpack_chat_page(packed) == [
+        {
+            "player_id": message.player_id,
+            "player_name": message.player_name,
+            "content": message.content,
+            "timestamp": message.timestamp,
+        }
+        for message in messages
+    ]
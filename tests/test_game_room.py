@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from common.game_room import GameRoom
+
+
+def test_operations_run_one_at_a_time_in_order():
+    async def scenario():
+        room = GameRoom("room")
+        log = []
+
+        async def operation(name: str) -> str:
+            log.append(f"{name} start")
+            await asyncio.sleep(0)
+            log.append(f"{name} end")
+            return name
+
+        results = await asyncio.gather(
+            *(room.run_serialized(operation, name) for name in "abc")
+        )
+        room.stop()
+        return results, log, room.actions_processed
+
+    results, log, processed = asyncio.run(scenario())
+    assert results == ["a", "b", "c"]
+    assert log == [f"{name} {step}" for name in "abc" for step in ("start", "end")]
+    assert processed == 3
+
+
+def test_nested_operations_run_inline():
+    async def scenario():
+        room = GameRoom("room")
+
+        async def inner() -> str:
+            return "inner"
+
+        async def outer() -> str:
+            return await room.run_serialized(inner)
+
+        result = await asyncio.wait_for(room.run_serialized(outer), 1)
+        room.stop()
+        return result
+
+    assert asyncio.run(scenario()) == "inner"
+
+
+def test_failures_reach_the_caller_only():
+    async def scenario():
+        room = GameRoom("room")
+
+        async def fail():
+            raise ValueError("bad move")
+
+        async def succeed() -> bool:
+            return True
+
+        with pytest.raises(ValueError):
+            await room.run_serialized(fail)
+        result = await room.run_serialized(succeed)
+        room.stop()
+        return result
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_stopped_room_releases_and_refuses_operations():
+    async def scenario():
+        room = GameRoom("room")
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def block() -> bool:
+            started.set()
+            await release.wait()
+            return True
+
+        async def queued() -> bool:
+            return True
+
+        running = asyncio.create_task(room.run_serialized(block))
+        waiting = asyncio.create_task(room.run_serialized(queued))
+        await started.wait()
+        room.stop()
+
+        late = await room.run_serialized(queued)
+        return await running, await waiting, late, room._consumer_task
+
+    assert asyncio.run(scenario()) == (False, False, False, None)
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+from common.network_protocol import MessageType
+from server.lobby_broadcaster import LobbyBroadcaster
+
+
+class FakeServer:
+    def __init__(self, client_ids: List[str]):
+        self.clients = dict.fromkeys(client_ids)
+        self.sent: List[tuple] = []
+
+    async def send_to_client(self, client_id: str, message: dict, coalesce=True):
+        self.sent.append(({client_id}, message, coalesce))
+
+    async def send_to_clients(self, client_ids: Set[str], message: dict):
+        self.sent.append((set(client_ids), message, True))
+
+
+def room(room_id: str, player_count: int) -> Dict[str, Any]:
+    return {"room_id": room_id, "player_count": player_count}
+
+
+def make_lobby(rooms: Dict[str, Dict[str, Any]], client_ids: List[str]):
+    server = FakeServer(client_ids)
+
+    def room_info(room_id: str) -> Optional[Dict[str, Any]]:
+        return rooms.get(room_id)
+
+    return server, LobbyBroadcaster(server, room_info, interval=0.01)
+
+
+def test_changes_within_an_interval_make_one_delta():
+    async def scenario():
+        rooms = {"a": room("a", 1)}
+        server, lobby = make_lobby(rooms, ["c1", "c2"])
+        await lobby.subscribe("c1", [])
+        await lobby.subscribe("c2", [])
+        server.sent.clear()
+
+        lobby.mark_dirty("a")
+        rooms["b"] = room("b", 1)
+        lobby.mark_dirty("b")
+        lobby.mark_dirty("a")
+        await asyncio.sleep(0.05)
+        return server.sent
+
+    sent = asyncio.run(scenario())
+    assert len(sent) == 1
+    client_ids, message, _ = sent[0]
+    assert client_ids == {"c1", "c2"}
+    assert message["type"] == MessageType.ROOM_LIST_DELTA.name
+    assert sorted(info["room_id"] for info in message["added"]) == ["a", "b"]
+
+
+def test_only_changed_rooms_are_sent():
+    async def scenario():
+        rooms = {"a": room("a", 1), "b": room("b", 1)}
+        server, lobby = make_lobby(rooms, ["c1"])
+        await lobby.subscribe("c1", [])
+        for room_id in rooms:
+            lobby.mark_dirty(room_id)
+        await lobby.flush()
+        server.sent.clear()
+
+        rooms["a"] = room("a", 2)
+        del rooms["b"]
+        for room_id in ("a", "b", "missing"):
+            lobby.mark_dirty(room_id)
+        await lobby.flush()
+
+        lobby.mark_dirty("a")
+        await lobby.flush()
+        await lobby.stop()
+        return server.sent
+
+    sent = asyncio.run(scenario())
+    assert [message for _, message, _ in sent] == [
+        {
+            "type": MessageType.ROOM_LIST_DELTA.name,
+            "added": [],
+            "changed": [room("a", 2)],
+            "removed": ["b"],
+        }
+    ]
+
+
+def test_disconnected_subscribers_are_dropped():
+    async def scenario():
+        rooms = {"a": room("a", 1)}
+        server, lobby = make_lobby(rooms, ["c1", "c2"])
+        await lobby.subscribe("c1", [])
+        await lobby.subscribe("c2", [])
+        del server.clients["c2"]
+
+        lobby.mark_dirty("a")
+        await lobby.flush()
+        await lobby.stop()
+        return server.sent[-1][0], lobby.subscribers
+
+    assert asyncio.run(scenario()) == ({"c1"}, {"c1"})
+
+
+def test_tagged_snapshots_are_not_coalesced():
+    async def scenario():
+        server, lobby = make_lobby({}, ["c1"])
+        await lobby.subscribe("c1", [room("a", 1)])
+        await lobby.subscribe("c1", [], request_id=7)
+        return server.sent
+
+    snapshot, reply = asyncio.run(scenario())
+    assert snapshot[1] == {"type": MessageType.ROOM_LIST.name, "rooms": [room("a", 1)]}
+    assert snapshot[2] is True
+    assert reply[1]["request_id"] == 7
+    assert reply[2] is False
@@ -0,0 +1,95 @@
+import asyncio
+from common.network_protocol import MessageType
+from server.outbound_queue import OutboundQueue, OverflowPolicy
+
+GAME_STATE = MessageType.GAME_STATE.name
+GAME_STATE_DELTA = MessageType.GAME_STATE_DELTA.name
+ROOM_LIST = MessageType.ROOM_LIST.name
+CHAT_MESSAGE = MessageType.CHAT_MESSAGE.name
+
+
+def queued(queue: OutboundQueue):
+    return [(message_type, payload) for message_type, payload, _ in queue.drain()]
+
+
+def test_snapshot_supersedes_queued_state():
+    queue = OutboundQueue()
+    queue.put(GAME_STATE, b"s1")
+    queue.put(GAME_STATE_DELTA, b"d1")
+    queue.put(CHAT_MESSAGE, b"c1")
+    queue.put(GAME_STATE, b"s2")
+
+    assert queue.coalesced == 2
+    assert queued(queue) == [(CHAT_MESSAGE, b"c1"), (GAME_STATE, b"s2")]
+
+
+def test_deltas_do_not_supersede_each_other():
+    queue = OutboundQueue()
+    queue.put(GAME_STATE_DELTA, b"d1")
+    queue.put(GAME_STATE_DELTA, b"d2")
+
+    assert queue.coalesced == 0
+    assert len(queue) == 2
+
+
+def test_request_replies_are_never_coalesced():
+    queue = OutboundQueue()
+    queue.put(ROOM_LIST, b"reply", coalesce=False)
+    queue.put(ROOM_LIST, b"broadcast")
+    queue.put(ROOM_LIST, b"other reply", coalesce=False)
+    queue.put(ROOM_LIST, b"newer broadcast")
+
+    assert queued(queue) == [
+        (ROOM_LIST, b"reply"),
+        (ROOM_LIST, b"other reply"),
+        (ROOM_LIST, b"newer broadcast"),
+    ]
+
+
+def test_coalescing_can_be_turned_off():
+    queue = OutboundQueue(coalesce=False)
+    queue.put(GAME_STATE, b"s1")
+    queue.put(GAME_STATE, b"s2")
+
+    assert queue.coalesced == 0
+    assert len(queue) == 2
+
+
+def test_drop_oldest_keeps_the_newest():
+    queue = OutboundQueue(max_size=2)
+    for index in range(4):
+        assert queue.put(CHAT_MESSAGE, bytes([index]))
+
+    assert queue.dropped == 2
+    assert queue.is_full
+    assert queue.full_since is not None
+    assert queued(queue) == [(CHAT_MESSAGE, b"\x02"), (CHAT_MESSAGE, b"\x03")]
+    assert queue.overflowed_for() == 0.0
+
+
+def test_drop_newest_refuses_when_full():
+    for policy in (OverflowPolicy.DROP_NEWEST, OverflowPolicy.DISCONNECT):
+        queue = OutboundQueue(max_size=2, overflow_policy=policy)
+        assert queue.put(CHAT_MESSAGE, b"a")
+        assert queue.put(CHAT_MESSAGE, b"b")
+        assert not queue.put(CHAT_MESSAGE, b"c")
+
+        assert queue.dropped == 1
+        assert queue.full_since is not None
+        assert queued(queue) == [(CHAT_MESSAGE, b"a"), (CHAT_MESSAGE, b"b")]
+
+
+def test_get_waits_for_a_message():
+    async def scenario():
+        queue = OutboundQueue(max_size=1)
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+
+        # The getter only runs after both puts, so it finds the newer one
+        queue.put(CHAT_MESSAGE, b"a")
+        queue.put(CHAT_MESSAGE, b"b")
+        assert queue.dropped == 1
+        return await getter, queue.full_since
+
+    assert asyncio.run(scenario()) == ((CHAT_MESSAGE, b"b"), None)
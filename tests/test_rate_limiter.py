@@ -0,0 +1,108 @@
+import pytest
+from common.network_protocol import MessageType
+from server import rate_limiter
+from server.rate_limiter import RateLimitConfig, TokenBucket
+
+CHAT_MESSAGE = MessageType.CHAT_MESSAGE.name
+PLAY_CARD = MessageType.PLAY_CARD.name
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_starts_full_and_empties():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated_at
+    assert [bucket.take(1, now) for _ in range(4)] == [True, True, True, False]
+
+
+def test_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated_at
+    assert bucket.take(3, now)
+    assert not bucket.take(1, now + 0.25)
+    assert bucket.take(1, now + 0.5)
+    assert not bucket.take(1, now + 0.5)
+
+
+def test_bucket_refill_stops_at_burst():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated_at
+    assert bucket.take(3, now)
+    assert bucket.take(3, now + 60)
+    assert not bucket.take(1, now + 60)
+
+
+def test_refused_take_costs_nothing():
+    bucket = TokenBucket(rate=1, burst=5)
+    now = bucket.updated_at
+    assert bucket.take(3, now)
+    assert not bucket.take(3, now)
+    assert bucket.take(2, now)
+
+
+def test_refund_is_capped_at_burst():
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.refund(5)
+    assert bucket.tokens == 2
+
+
+def test_type_bucket_limits_only_its_type(clock):
+    limiter = RateLimitConfig(type_limits={CHAT_MESSAGE: (1, 2)}).new_limiter()
+    assert limiter.admit(CHAT_MESSAGE)
+    assert limiter.admit(CHAT_MESSAGE)
+    assert not limiter.admit(CHAT_MESSAGE)
+    assert limiter.admit(PLAY_CARD)
+
+    clock.now += 1
+    assert limiter.admit(CHAT_MESSAGE)
+    assert not limiter.admit(CHAT_MESSAGE)
+
+
+def test_connection_bucket_refusal_refunds_the_type_token(clock):
+    config = RateLimitConfig(
+        rate=1, burst=2, costs={}, type_limits={CHAT_MESSAGE: (0.001, 2)}
+    )
+    limiter = config.new_limiter()
+    assert limiter.admit(PLAY_CARD)
+    assert limiter.admit(PLAY_CARD)
+    # The connection is out of tokens, so the chat type keeps both of its own
+    assert not limiter.admit(CHAT_MESSAGE)
+    assert not limiter.admit(CHAT_MESSAGE)
+
+    clock.now += 2
+    assert limiter.admit(CHAT_MESSAGE)
+    assert limiter.admit(CHAT_MESSAGE)
+
+
+def test_costs_are_taken_from_the_connection_bucket(clock):
+    config = RateLimitConfig(rate=1, burst=10, costs={CHAT_MESSAGE: 4})
+    limiter = config.new_limiter()
+    assert limiter.admit(CHAT_MESSAGE)
+    assert limiter.admit(CHAT_MESSAGE)
+    assert not limiter.admit(CHAT_MESSAGE)
+    assert limiter.admit(PLAY_CARD)
+    assert limiter.admit(PLAY_CARD)
+    assert not limiter.admit(PLAY_CARD)
+
+
+def test_violations_are_forgiven_over_time(clock):
+    limiter = RateLimitConfig(max_violations=3, violation_decay=2).new_limiter()
+    assert all(limiter.record_violation() for _ in range(3))
+    assert not limiter.record_violation()
+
+    clock.now += 2
+    assert limiter.record_violation()
+    assert not limiter.record_violation()
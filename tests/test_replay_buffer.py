@@ -0,0 +1,75 @@
+from server.replay_buffer import ReplayBuffer
+
+
+def filled_buffer(count: int, **limits) -> ReplayBuffer:
+    replay = ReplayBuffer(**limits)
+    for number in range(count):
+        replay.record("CHAT_MESSAGE", str(number).encode())
+    return replay
+
+
+def payloads(messages) -> list:
+    return [int(payload) for _, payload in messages]
+
+
+def test_resends_what_the_client_missed():
+    replay = filled_buffer(10)
+    assert payloads(replay.take_unreceived(7)) == [7, 8, 9]
+    assert replay.sent == 7
+    assert len(replay) == 7
+
+
+def test_client_that_missed_nothing_gets_nothing():
+    replay = filled_buffer(10)
+    assert replay.take_unreceived(10) == []
+    assert replay.sent == 10
+
+
+def test_resent_messages_can_be_resumed_again():
+    # The server records the missed messages again as it resends them, and the
+    # connection drops once more before the client gets the last two
+    replay = filled_buffer(10)
+    for message_type, payload in replay.take_unreceived(5):
+        replay.record(message_type, payload)
+    replay.record("CHAT_MESSAGE", b"10")
+
+    assert payloads(replay.take_unreceived(9)) == [9, 10]
+
+
+def test_count_restarts_when_messages_were_evicted():
+    replay = filled_buffer(10, max_messages=4)
+    assert len(replay) == 4
+    assert replay.take_unreceived(5) is None
+
+    # Counting continues from the client's number
+    assert replay.sent == 5
+    assert len(replay) == 0
+    replay.record("CHAT_MESSAGE", b"5")
+    assert payloads(replay.take_unreceived(5)) == [5]
+
+
+def test_client_ahead_of_the_server_is_not_resumed():
+    replay = filled_buffer(3)
+    assert replay.take_unreceived(4) is None
+    assert replay.sent == 4
+
+
+def test_byte_limit_evicts_the_oldest():
+    replay = ReplayBuffer(max_bytes=10)
+    for number in range(4):
+        replay.record("GAME_STATE", bytes([number]) * 4)
+
+    assert len(replay) == 2
+    assert replay.take_unreceived(1) is None
+
+    replay = ReplayBuffer(max_bytes=10)
+    for number in range(4):
+        replay.record("GAME_STATE", bytes([number]) * 4)
+    assert replay.take_unreceived(2) == [
+        ("GAME_STATE", b"\x02" * 4),
+        ("GAME_STATE", b"\x03" * 4),
+    ]
+
+
+def test_tokens_are_unique():
+    assert ReplayBuffer().token != ReplayBuffer().token
@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional
+import random
+import pytest
+from server.room_index import MAX_PAGE_SIZE, SORT_FIELDS, RoomIndex
+
+STATES = ["WAITING", "PLAYING", "FINISHED"]
+
+
+def room(room_id: str, state: str, player_count: int) -> Dict[str, Any]:
+    return {
+        "room_id": room_id,
+        "state": state,
+        "max_players": 4,
+        "player_count": player_count,
+    }
+
+
+def filled_index(count: int, seed: int = 0) -> RoomIndex:
+    rng = random.Random(seed)
+    index = RoomIndex()
+    for number in range(count):
+        index.update(room(f"r{number:03}", rng.choice(STATES), rng.randint(0, 4)))
+    return index
+
+
+def expected_order(
+    rooms: List[Dict[str, Any]], sort: str, descending: bool
+) -> List[str]:
+    # Rooms are numbered in creation order, which breaks ties
+    def key(info):
+        created = int(info["room_id"][1:])
+        match sort:
+            case "player_count":
+                return (info["player_count"], created)
+            case "free_seats":
+                return (info["max_players"] - info["player_count"], created)
+            case _:
+                return (created, created)
+
+    ordered = sorted(rooms, key=key, reverse=descending)
+    return [info["room_id"] for info in ordered]
+
+
+def page_through(index: RoomIndex, limit: int, **query) -> List[str]:
+    room_ids = []
+    cursor: Optional[str] = None
+    while True:
+        page, cursor = index.query(cursor=cursor, limit=limit, **query)
+        assert len(page) <= limit
+        room_ids.extend(info["room_id"] for info in page)
+        if cursor is None:
+            return room_ids
+
+
+@pytest.mark.parametrize("sort", SORT_FIELDS)
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_room_once_in_order(sort, descending):
+    index = filled_index(100)
+    for limit in (1, 7, 100, 500):
+        room_ids = page_through(index, limit, sort=sort, descending=descending)
+        assert room_ids == expected_order(list(index), sort, descending)
+
+
+@pytest.mark.parametrize("state", [None, *STATES])
+@pytest.mark.parametrize("has_free_seat", [None, True, False])
+def test_filters_match_every_room(state, has_free_seat):
+    index = filled_index(100)
+    matching = [
+        info
+        for info in index
+        if (state is None or info["state"] == state)
+        and (
+            has_free_seat is None
+            or (info["player_count"] < info["max_players"]) == has_free_seat
+        )
+    ]
+    room_ids = page_through(
+        index, 9, state=state, has_free_seat=has_free_seat, sort="player_count"
+    )
+    assert room_ids == expected_order(matching, "player_count", False)
+
+
+def test_rooms_changing_between_pages_are_not_repeated():
+    index = filled_index(30)
+    page, cursor = index.query(limit=10)
+    seen = [info["room_id"] for info in page]
+
+    # Rooms already sent fill up and one is removed; paging resumes after them
+    for info in page:
+        index.update({**info, "player_count": 4})
+    index.remove(seen[-1])
+    rest = []
+    while cursor is not None:
+        page, cursor = index.query(cursor=cursor, limit=10)
+        rest.extend(info["room_id"] for info in page)
+
+    unseen = [info for info in index if info["room_id"] not in seen]
+    assert rest == expected_order(unseen, "created", False)
+
+
+def test_cursor_resumes_after_a_room():
+    index = filled_index(20)
+    cursor = index.cursor("r009", "created")
+    page, _ = index.query(cursor=cursor, limit=3)
+    assert [info["room_id"] for info in page] == ["r010", "r011", "r012"]
+
+
+def test_updates_move_rooms_between_buckets():
+    index = RoomIndex()
+    index.update(room("a", "WAITING", 1))
+    index.update(room("b", "WAITING", 4))
+    index.update(room("a", "PLAYING", 4))
+
+    page, _ = index.query(state="WAITING")
+    assert [info["room_id"] for info in page] == ["b"]
+    page, _ = index.query(has_free_seat=True)
+    assert page == []
+
+    index.remove("a")
+    index.remove("b")
+    assert len(index) == 0
+    assert index.query() == ([], None)
+
+
+def test_page_size_is_capped():
+    index = filled_index(MAX_PAGE_SIZE + 10)
+    page, cursor = index.query(limit=MAX_PAGE_SIZE * 2)
+    assert len(page) == MAX_PAGE_SIZE
+    assert cursor is not None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"sort": "name"},
+        {"limit": 0},
+        {"cursor": "not-a-cursor"},
+        {"cursor": "1.2.3"},
+        {"cursor": 12},
+        {"cursor": ["1", "2"]},
+    ],
+)
+def test_bad_queries_raise_value_error(query):
+    with pytest.raises(ValueError):
+        filled_index(5).query(**query)
@@ -0,0 +1,174 @@
+from collections import Counter
+from typing import Any, Dict, List
+import asyncio
+import pytest
+from client.game_client import GameClient
+from common.card_enums import CardColor
+from common.game import Game, GameState
+from common.player import Player
+from common.simulator import WILD_TYPES
+from common.state_delta import apply_state_delta, diff_hand, diff_public_state
+
+
+def card_counts(cards: List[Dict[str, Any]]) -> Counter:
+    return Counter((card["type"], card["color"], card["value"]) for card in cards)
+
+
+def player_state(game: Game, player_id: str) -> Dict[str, Any]:
+    view = game.get_player_view(player_id)
+    view["your_hand"] = view.pop("hand")
+    return view
+
+
+def make_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    # What GameServer sends one player for a room update
+    public = {key: value for key, value in current.items() if key != "your_hand"}
+    hand_added, hand_removed = diff_hand(previous["your_hand"], current["your_hand"])
+    return {
+        **diff_public_state(previous, public),
+        "hand_added": hand_added,
+        "hand_removed": hand_removed,
+    }
+
+
+def play_turn(game: Game) -> None:
+    player = game.current_player
+    valid_plays = game.get_valid_plays()
+    if valid_plays:
+        card = valid_plays[0]
+        chosen_color = CardColor.RED if card.type in WILD_TYPES else None
+        game.play_card(player.player_id, card, chosen_color)
+    else:
+        game.draw_card(player.player_id)
+
+
+def started_game(seed: int) -> Game:
+    game = Game(seed=seed)
+    for index in range(3):
+        game.add_player(Player(f"p{index}", f"Player {index}"))
+    game.start_game()
+    return game
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_deltas_rebuild_every_state(seed):
+    game = started_game(seed)
+    state = player_state(game, "p0")
+    for _ in range(200):
+        if game.state != GameState.PLAYING:
+            break
+        previous = player_state(game, "p0")
+        play_turn(game)
+        current = player_state(game, "p0")
+
+        state = apply_state_delta(state, make_delta(previous, current))
+        # Added cards go to the end, so only the hand's order may differ
+        assert card_counts(state["your_hand"]) == card_counts(current["your_hand"])
+        assert {**state, "your_hand": None} == {**current, "your_hand": None}
+
+
+def test_diff_hand_keeps_duplicates():
+    red_one = {"type": "NUMBER", "color": "RED", "value": 1}
+    blue_two = {"type": "NUMBER", "color": "BLUE", "value": 2}
+    added, removed = diff_hand([red_one, red_one, blue_two], [red_one, blue_two])
+    assert added == []
+    assert removed == [red_one]
+
+
+def test_unchanged_players_are_not_resent():
+    previous = {"deck_count": 10, "players": [{"id": "a"}, {"id": "b"}]}
+    current = {"deck_count": 9, "players": [{"id": "a"}, {"id": "b", "x": 1}]}
+    delta = diff_public_state(previous, current)
+    assert delta == {
+        "changes": {"deck_count": 9},
+        "player_updates": [[1, {"id": "b", "x": 1}]],
+    }
+
+
+class SyncRecorder:
+    def __init__(self, client: GameClient):
+        self.calls = 0
+        client.request_state_sync = self
+
+    async def __call__(self) -> None:
+        self.calls += 1
+
+
+def joined_client(state: Dict[str, Any], seq: int) -> GameClient:
+    client = GameClient("ws://localhost:0", "tester")
+    client.current_room_id = "room"
+    client.current_game_state = state
+    client.state_seq = seq
+    return client
+
+
+def test_client_applies_delta_on_its_base_seq():
+    state = {"deck_count": 10, "players": [], "your_hand": []}
+    client = joined_client(state, 4)
+    sync = SyncRecorder(client)
+    card = {"type": "NUMBER", "color": "RED", "value": 1}
+
+    asyncio.run(
+        client._handle_game_state_delta(
+            {
+                "room_id": "room",
+                "seq": 5,
+                "base_seq": 4,
+                "changes": {"deck_count": 9},
+                "hand_added": [card],
+                "hand_removed": [],
+            }
+        )
+    )
+
+    assert sync.calls == 0
+    assert client.state_seq == 5
+    assert client.current_game_state == {
+        "deck_count": 9,
+        "players": [],
+        "your_hand": [card],
+    }
+
+
+@pytest.mark.parametrize(
+    "delta",
+    [
+        # Built on a version the client never saw
+        {"seq": 7, "base_seq": 6, "changes": {"deck_count": 9}},
+        # Removes a card the client does not hold
+        {
+            "seq": 5,
+            "base_seq": 4,
+            "hand_removed": [{"type": "NUMBER", "color": "RED", "value": 1}],
+        },
+    ],
+)
+def test_client_resyncs_instead_of_applying(delta):
+    state = {"deck_count": 10, "players": [], "your_hand": []}
+    client = joined_client(state, 4)
+    sync = SyncRecorder(client)
+
+    asyncio.run(client._handle_game_state_delta({"room_id": "room", **delta}))
+
+    assert sync.calls == 1
+    assert client.state_seq == 4
+    assert client.current_game_state is state
+
+
+def test_client_applies_deltas_after_a_resync():
+    client = joined_client(None, None)
+    sync = SyncRecorder(client)
+    delta = {"room_id": "room", "seq": 3, "base_seq": 2, "changes": {"x": 1}}
+
+    asyncio.run(client._handle_game_state_delta(delta))
+    assert sync.calls == 1
+
+    asyncio.run(
+        client._handle_game_state(
+            {"room_id": "room", "seq": 2, "state": {"x": 0, "your_hand": []}}
+        )
+    )
+    asyncio.run(client._handle_game_state_delta(delta))
+    assert sync.calls == 1
+    assert client.state_seq == 3
+    assert client.current_game_state["x"] == 1
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from common.simulator import (  # noqa: E402
+    FirstPlayablePolicy,
+    SimulationReport,
+    play_game,
+)
+from common.vector_engine import POLICY_NAME, VectorEngine, cross_check  # noqa: E402
+
+GAMES = 300
+
+
+@pytest.mark.parametrize("players", [2, 3, 4])
+def test_every_game_matches_the_scalar_engine(players):
+    result = VectorEngine(range(GAMES), players).run()
+    assert (result.winner_seat >= 0).all()
+    assert cross_check(result, GAMES) == []
+
+
+def test_turn_cap_matches_the_scalar_engine():
+    result = VectorEngine(range(GAMES), 4).run(max_turns=40)
+    assert (result.winner_seat < 0).any()
+    assert (result.turns <= 40).all()
+    assert cross_check(result, GAMES, max_turns=40) == []
+
+
+def test_mismatches_are_reported():
+    result = VectorEngine(range(10), 2).run()
+    result.turns[3] += 1
+    result.hand_scores[7, 0] += 1
+    assert sorted(cross_check(result, 10)) == [3, 7]
+
+
+def test_report_matches_the_scalar_simulator():
+    result = VectorEngine(range(GAMES), 3).run(max_turns=60)
+    expected = SimulationReport(policies=[POLICY_NAME] * 3)
+    policies = [FirstPlayablePolicy() for _ in range(3)]
+    for seed in range(GAMES):
+        expected.add(play_game(seed, policies, 60))
+
+    report = result.to_report()
+    assert report.capped_games > 0
+    assert report == expected